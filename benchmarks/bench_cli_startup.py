@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Wall time of CLI startup for cheap commands.
+
+Runs each command in a fresh interpreter several times and reports the
+median, so import-time cost dominates.
+
+    python benchmarks/bench_cli_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+COMMANDS = {
+    '--help': [sys.executable, '-m', 'src.cli', '--help'],
+    'info': [sys.executable, '-m', 'src.cli', 'info'],
+    'python (baseline)': [sys.executable, '-c', 'pass'],
+}
+
+
+def time_command(argv, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    for name, argv in COMMANDS.items():
+        print(f"{name:20s} {time_command(argv, runs) * 1000:7.1f} ms (median of {runs})")
+
+
+if __name__ == '__main__':
+    main()
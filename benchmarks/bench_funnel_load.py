@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the signup -> games -> reveal funnel.
+
+Starts the mock Messages API (benchmarks/mock_anthropic.py) and the Flask
+app on a threaded werkzeug server in this process, then replays
+concurrent user funnels over HTTP. Reports throughput, reveal latency
+percentiles, time until the model's answer replaces the provisional one,
+peak thread count and peak RSS.
+
+    python benchmarks/bench_funnel_load.py --users 200 --concurrency 50
+    python benchmarks/bench_funnel_load.py --latency lognormal:6,0.5 --rate-429 0.05 --json out.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from mock_anthropic import MockAnthropicServer, add_arguments, settings_from_args
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return round(ordered[index], 3)
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux), else peak RSS"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ResourceSampler:
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss = max(self.peak_rss, rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_funnel(base: str, user: int, think: float, answer_timeout: float) -> Dict[str, object]:
+    import requests
+    http = requests.Session()
+    result: Dict[str, object] = {'ok': False}
+    try:
+        http.get(f"{base}/signup")
+        signed_up = time.perf_counter()
+        response = http.post(f"{base}/signup", data={
+            'first_name': 'Load', 'last_name': f"User{user}", 'dob': '2003-05-17',
+            'location': 'Austin, TX', 'agree_terms': 'on', 'confirm_age': 'on'
+        }, allow_redirects=False)
+        if response.status_code != 302:
+            result['error'] = f"signup {response.status_code}"
+            return result
+        for game in (1, 2, 3):
+            http.get(f"{base}/game/{game}")
+            time.sleep(think)
+            http.post(f"{base}/game/{game}/complete", allow_redirects=False)
+
+        started = time.perf_counter()
+        response = http.get(f"{base}/reveal")
+        result['reveal'] = time.perf_counter() - started
+        if response.status_code != 200:
+            result['error'] = f"reveal {response.status_code}"
+            return result
+
+        deadline = time.perf_counter() + answer_timeout
+        while time.perf_counter() < deadline:
+            status = http.get(f"{base}/reveal/status").json()
+            if not status['provisional'] or not status['pending']:
+                result['answer'] = time.perf_counter() - signed_up
+                result['final'] = not status['provisional']
+                break
+            time.sleep(0.25)
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = type(e).__name__
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=25)
+    parser.add_argument('--think', type=float, default=1.0, help='Seconds spent in each game')
+    parser.add_argument('--answer-timeout', type=float, default=120.0)
+    parser.add_argument('--api-url', default=None, help='Use an already running mock instead of starting one')
+    parser.add_argument('--json', dest='json_path', default=None, help='Also write the report here')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    mock = None
+    if args.api_url is None:
+        mock = MockAnthropicServer(settings_from_args(args)).start()
+    workdir = tempfile.mkdtemp(prefix='funnel-load-')
+    os.environ.update({
+        'ANTHROPIC_API_URL': args.api_url or mock.url,
+        'ANTHROPIC_API_KEY': 'mock-key',
+        'ADMISSION_MAX_PER_IP': str(10 ** 9),
+        'JOB_QUEUE_PATH': os.path.join(workdir, 'jobs.db'),
+        'EVENT_LOG_DIR': os.path.join(workdir, 'events'),
+    })
+
+    import logging
+    from werkzeug.serving import make_server
+    from src.web_app import app
+    logging.disable(logging.CRITICAL)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    baseline_threads = threading.active_count()
+    started = time.perf_counter()
+    with ResourceSampler() as sampler, ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(
+            lambda user: run_funnel(base, user, args.think, args.answer_timeout),
+            range(args.users)
+        ))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    reveal = [r['reveal'] for r in results if 'reveal' in r]
+    answer = [r['answer'] for r in results if 'answer' in r]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if 'error' in r:
+            errors[r['error']] = errors.get(r['error'], 0) + 1
+    report = {
+        'users': args.users,
+        'concurrency': args.concurrency,
+        'seconds': round(elapsed, 2),
+        'funnels_per_second': round(sum(1 for r in results if r['ok']) / elapsed, 2),
+        'reveal_seconds': {p: percentile(reveal, p) for p in (50, 95, 99)},
+        'answer_seconds': {p: percentile(answer, p) for p in (50, 95, 99)},
+        'final_answers': sum(1 for r in results if r.get('final')),
+        'errors': errors,
+        'baseline_threads': baseline_threads,
+        'peak_threads': sampler.peak_threads,
+        'peak_rss_mb': round(sampler.peak_rss / 2 ** 20, 1),
+        'mock': mock.settings.counts if mock else None,
+    }
+
+    print(f"{report['users']} funnels at concurrency {report['concurrency']} in {report['seconds']}s "
+          f"({report['funnels_per_second']}/s)")
+    print(f"  reveal page   p50 {report['reveal_seconds'][50]}s  p95 {report['reveal_seconds'][95]}s  "
+          f"p99 {report['reveal_seconds'][99]}s")
+    print(f"  model answer  p50 {report['answer_seconds'][50]}s  p95 {report['answer_seconds'][95]}s  "
+          f"p99 {report['answer_seconds'][99]}s  ({report['final_answers']} final)")
+    print(f"  threads peak {report['peak_threads']} (baseline {report['baseline_threads']}), "
+          f"RSS peak {report['peak_rss_mb']} MB")
+    if errors:
+        print(f"  errors {errors}")
+    if mock:
+        print(f"  mock API {mock.settings.counts}")
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
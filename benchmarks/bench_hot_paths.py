@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for per-request hot paths: input sanitizing and
+validation, token hashing, model response parsing, response headers,
+and full test-client round trips for /signup and /circuit.
+
+Logging is disabled so the numbers are the code, not stderr.
+See benchmarks/microbench.py for saving and comparing runs.
+
+    python benchmarks/bench_hot_paths.py --save
+    python benchmarks/bench_hot_paths.py --compare benchmarks/results/<baseline>.json
+"""
+import logging
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+WORKDIR = tempfile.mkdtemp(prefix='bench-hot-paths-')
+os.environ.pop('ANTHROPIC_API_KEY', None)
+os.environ.update({
+    'ADMISSION_MAX_PER_IP': str(10 ** 9),
+    'JOB_QUEUE_PATH': os.path.join(WORKDIR, 'jobs.db'),
+    'EVENT_LOG_DIR': os.path.join(WORKDIR, 'events'),
+})
+
+from microbench import Suite, main
+from mock_anthropic import message_body
+from src import web_app
+from src.ai_search import ClaudeSearcher
+from src.validators import InputValidator
+
+logging.disable(logging.CRITICAL)
+
+suite = Suite('hot_paths')
+
+# Signup fields: typical, long (at the 200-char cut) and hostile
+FIELDS = {
+    'name': "Mary-Jane O'Connor",
+    'location': 'San Francisco, CA',
+    'long': ('Lorem ipsum dolor sit amet, consectetur adipiscing elit ' * 8)[:400],
+    'hostile': '<script>alert("x")</script>&\\\x00' * 12,
+}
+# LinkedIn output fields: a headline and a summary with stray control characters
+OUTPUTS = {
+    'headline': 'Senior Product Manager at Example Corp | Ex-Analyst | UT Austin alum',
+    'summary': ('I build data products.\tPreviously at a startup.\x07\n' * 40),
+}
+
+TOKEN = 'kq3Xv0b8nW1sYx5Jr7Tf2Lm9Pc4Hd6Ga0Ze3Ui8Ro1'
+DOB = date(1999, 7, 4)
+searcher = ClaudeSearcher('bench-key')
+RESPONSE = message_body('University of Texas at Austin', 62, web_searches=2, malformed=False)
+MALFORMED = message_body('University of Texas at Austin', 62, web_searches=2, malformed=True)
+ANSWER_TEXT = RESPONSE['content'][-1]['text']
+SOURCES = ['https://example.com/0/0', 'https://example.com/0/1']
+
+for label, text in FIELDS.items():
+    suite.add(f"sanitize[{label}]", lambda text=text: web_app.sanitize(text))
+for label, text in OUTPUTS.items():
+    suite.add(f"sanitize_output[{label}]", lambda text=text: InputValidator.sanitize_output(text))
+
+suite.add('hash_token', lambda: web_app.hash_token(TOKEN))
+suite.add('calculate_age', lambda: web_app.calculate_age(DOB))
+suite.add('validate_name', lambda: InputValidator.validate_name(FIELDS['name']))
+suite.add('parse_claude_response[web_search]',
+          lambda: searcher._parse_claude_response(RESPONSE, 'Jane Doe', 25, 'Austin, TX'))
+suite.add('parse_claude_response[malformed]',
+          lambda: searcher._parse_claude_response(MALFORMED, 'Jane Doe', 25, 'Austin, TX'))
+suite.add('extract_json', lambda: searcher._extract_json(ANSWER_TEXT, SOURCES, 'Jane Doe', 25, 'Austin, TX'))
+# The HTML case keeps the original name so baselines saved before the
+# middleware rewrite still compare against it
+suite.add('security_headers',
+          lambda: web_app.secure_headers.apply('/circuit', [('Content-Type', 'text/html; charset=utf-8')]))
+suite.add('security_headers[static]',
+          lambda: web_app.secure_headers.apply('/static/css/style.css', [('Content-Type', 'text/css; charset=utf-8')]))
+
+client = web_app.app.test_client()
+suite.add('round_trip[GET /circuit]', lambda: client.get('/circuit'))
+
+
+def signup():
+    # A fresh client per call, so each is a new session (and prediction)
+    response = web_app.app.test_client().post('/signup', data={
+        'first_name': 'Bench', 'last_name': 'User', 'dob': '1999-07-04',
+        'location': 'Austin, TX', 'agree_terms': 'on', 'confirm_age': 'on'
+    })
+    assert response.status_code == 302, response.status_code
+
+
+suite.add('round_trip[POST /signup]', signup)
+
+
+if __name__ == '__main__':
+    main(suite)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Bytes per cached prediction: raw searcher dicts vs PredictionRecord.
+
+Fills a cache the size of web_app.MAX_CACHE with realistic entries and
+measures the retained allocations with tracemalloc.
+
+    python benchmarks/bench_prediction_memory.py
+"""
+import os
+import random
+import string
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ai_search import ClaudeSearcher
+from src.prediction_record import PredictionRecord
+
+ENTRIES = 1000
+
+COLLEGES = [
+    'University of Texas at Austin', 'Rice University', 'UCLA', 'NYU',
+    'Georgia Tech', 'University of Washington', 'Boston University',
+]
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return ' '.join(
+        ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        for _ in range(count)
+    )
+
+
+def make_result(rng: random.Random) -> dict:
+    """A searcher result shaped like a real web-search response"""
+    reasoning = _words(rng, 40)
+    raw = (
+        _words(rng, 350) +
+        '\n```json\n{"college": "%s", "degree": "BS", "field": "Economics", '
+        '"career": "Analyst", "personality": "curious", "confidence": %d, '
+        '"source": "https://example.com/%s", "reasoning": "%s"}\n```'
+        % (rng.choice(COLLEGES), rng.randint(10, 90), _words(rng, 1), reasoning)
+    )
+    searcher = ClaudeSearcher('bench-key')
+    return searcher._extract_json(raw, [], 'Jane Doe', 25, 'Austin, TX')
+
+
+def measure(build) -> float:
+    """Bytes still allocated per entry once the cache is full"""
+    rng = random.Random(42)
+    keys = [f"{i:016x}" for i in range(ENTRIES)]
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    cache = {}
+    for key in keys:
+        cache[key] = build(make_result(rng))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(cache) == ENTRIES
+    return (after - before) / ENTRIES
+
+
+def main():
+    dict_bytes = measure(lambda result: result)
+    record_bytes = measure(PredictionRecord.from_result)
+    print(f"entries:            {ENTRIES}")
+    print(f"raw dict:           {dict_bytes:8.0f} bytes/entry")
+    print(f"PredictionRecord:   {record_bytes:8.0f} bytes/entry")
+    print(f"reduction:          {100 * (1 - record_bytes / dict_bytes):8.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Per-field cost of the shared sanitizers against the implementations they
+replaced (seven str.replace passes; a per-character generator join) and
+against a precomputed str.translate table, on typical, long and
+adversarial inputs.
+
+    python benchmarks/bench_sanitizers.py
+    python benchmarks/bench_sanitizers.py -k adversarial --save
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from microbench import Suite, main
+from src.sanitizers import CONTROL_CHARS, FORM_FIELD_CHARS, sanitize_form_field, strip_control_chars
+
+
+def replace_form_field(text: str) -> str:
+    for char in ['<', '>', '"', "'", '&', '\\', '\x00']:
+        text = text.replace(char, '')
+    return text.strip()[:200]
+
+
+def generator_control_chars(text: str) -> str:
+    return ''.join(char for char in text if ord(char) >= 32 or char == '\n').strip()
+
+
+FORM_FIELD_TABLE = str.maketrans('', '', FORM_FIELD_CHARS.decode())
+CONTROL_TABLE = str.maketrans('', '', CONTROL_CHARS.decode())
+
+
+def str_translate_form_field(text: str) -> str:
+    return text.translate(FORM_FIELD_TABLE).strip()[:200]
+
+
+def str_translate_control_chars(text: str) -> str:
+    return text.translate(CONTROL_TABLE).strip()
+
+
+# Signup fields (form sanitizer)
+FORM_FIELDS = {
+    'name': "Mary-Jane O'Connor",
+    'location': 'San Francisco, CA',
+    'long': ('Lorem ipsum dolor sit amet, consectetur adipiscing elit ' * 20)[:1000],
+    # Every character is one that gets dropped
+    'adversarial': '<>"\'&\\\x00' * 1500,
+    # A huge paste; only the first 200 characters survive
+    'oversized': 'x' * 100_000,
+}
+
+# LinkedIn output fields (control-character sanitizer)
+OUTPUT_FIELDS = {
+    'school': 'University of Texas at Austin',
+    'summary': 'I build data products. Previously at a startup.\n' * 40,
+    'adversarial': ''.join(chr(i) for i in range(32)) * 300,
+    'unicode': 'Zoë Çelik — 数据科学家, ŁÓDŹ 🚀\n' * 60,
+}
+
+suite = Suite('sanitizers')
+for label, text in FORM_FIELDS.items():
+    suite.add(f"form_field[{label}-replace]", lambda text=text: replace_form_field(text), group=f"form_field[{label}]")
+    suite.add(f"form_field[{label}-str_translate]", lambda text=text: str_translate_form_field(text),
+              group=f"form_field[{label}]")
+    suite.add(f"form_field[{label}-shared]", lambda text=text: sanitize_form_field(text), group=f"form_field[{label}]")
+for label, text in OUTPUT_FIELDS.items():
+    suite.add(f"control_chars[{label}-generator]", lambda text=text: generator_control_chars(text),
+              group=f"control_chars[{label}]")
+    suite.add(f"control_chars[{label}-str_translate]", lambda text=text: str_translate_control_chars(text),
+              group=f"control_chars[{label}]")
+    suite.add(f"control_chars[{label}-shared]", lambda text=text: strip_control_chars(text),
+              group=f"control_chars[{label}]")
+
+
+if __name__ == '__main__':
+    main(suite)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Requests/sec for GET /static and GET /circuit through the Flask test
+client (every middleware and after_request hook included), plus the cost
+of adding the security headers alone: per-header assignment on a
+Response (the old after_request hook) vs the precomputed WSGI set.
+
+    python benchmarks/bench_security_headers.py --save
+    python benchmarks/bench_security_headers.py --compare benchmarks/results/<baseline>.json
+"""
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+WORKDIR = tempfile.mkdtemp(prefix='bench-security-headers-')
+os.environ.update({
+    'JOB_QUEUE_PATH': os.path.join(WORKDIR, 'jobs.db'),
+    'EVENT_LOG_DIR': os.path.join(WORKDIR, 'events'),
+})
+
+from microbench import Suite, main
+from src import web_app
+
+logging.disable(logging.CRITICAL)
+
+
+def assign_headers(response):
+    """The after_request hook this replaced"""
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.headers['X-Frame-Options'] = 'DENY'
+    response.headers['X-XSS-Protection'] = '1; mode=block'
+    response.headers['Content-Security-Policy'] = (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline'; "
+        "style-src 'self' 'unsafe-inline' https://api.fontshare.com; "
+        "font-src 'self' https://cdn.fontshare.com; "
+        "connect-src 'self' http://ip-api.com"
+    )
+    return response
+
+
+client = web_app.app.test_client()
+
+
+def get(path):
+    response = client.get(path)
+    response.get_data()
+    response.close()
+
+
+suite = Suite('security_headers')
+suite.add('round_trip[GET /static]', lambda: get('/static/css/style.css'))
+suite.add('round_trip[GET /circuit]', lambda: get('/circuit'))
+suite.add('headers[assign]', lambda: assign_headers(web_app.app.response_class()), group='headers')
+if hasattr(web_app, 'secure_headers'):
+    headers = [('Content-Type', 'text/html; charset=utf-8'), ('Content-Length', '5120')]
+    suite.add('headers[precomputed]', lambda: web_app.secure_headers.apply('/circuit', list(headers)), group='headers')
+
+
+if __name__ == '__main__':
+    main(suite)
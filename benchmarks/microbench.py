@@ -0,0 +1,189 @@
+"""
+Small timing harness for the microbenchmarks in this directory.
+
+Works like pytest-benchmark without needing it: each case is calibrated
+so one round lasts about --min-time / --rounds seconds, then timed for
+--rounds rounds. Results are written in pytest-benchmark's JSON layout
+(benchmarks[].name/group/stats.{min,max,mean,median,stddev,ops}), so
+saved runs can be compared here with --compare, or with
+`pytest-benchmark compare` where that is installed.
+
+    python benchmarks/bench_hot_paths.py --save            # benchmarks/results/<stamp>_<commit>.json
+    python benchmarks/bench_hot_paths.py --compare benchmarks/results/<baseline>.json
+    python benchmarks/bench_hot_paths.py -k sanitize --fail-on-regression 20
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+class Suite:
+    """Named cases, each a zero-argument callable"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cases: Dict[str, Callable[[], object]] = {}
+        self.groups: Dict[str, str] = {}
+
+    def add(self, name: str, fn: Callable[[], object], group: Optional[str] = None):
+        if name in self.cases:
+            raise ValueError(f"Duplicate benchmark: {name}")
+        self.cases[name] = fn
+        self.groups[name] = group or name.split('[')[0]
+
+    def bench(self, name: str, group: Optional[str] = None):
+        def register(fn):
+            self.add(name, fn, group)
+            return fn
+        return register
+
+
+def calibrate(fn: Callable[[], object], target: float) -> int:
+    """Iterations per round so a round takes about target seconds"""
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= target or iterations >= 10 ** 7:
+            return iterations
+        iterations = max(iterations * 2, int(iterations * target / max(elapsed, 1e-9) * 1.1))
+
+
+def measure(fn: Callable[[], object], rounds: int, min_time: float) -> Dict[str, float]:
+    fn()  # warm-up: imports, caches, first-call costs
+    iterations = calibrate(fn, min_time / rounds)
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        samples.append((time.perf_counter() - started) / iterations)
+    mean = statistics.fmean(samples)
+    return {
+        'min': min(samples),
+        'max': max(samples),
+        'mean': mean,
+        'median': statistics.median(samples),
+        'stddev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'rounds': rounds,
+        'iterations': iterations,
+        'ops': 1 / mean if mean else 0.0,
+    }
+
+
+def commit_info() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=5).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, timeout=5).stdout.strip())
+    except (OSError, subprocess.SubprocessError):
+        commit, dirty = '', False
+    return {'id': commit, 'dirty': dirty}
+
+
+def machine_info() -> Dict[str, str]:
+    return {
+        'node': platform.node(),
+        'processor': platform.processor() or platform.machine(),
+        'machine': platform.machine(),
+        'python_implementation': platform.python_implementation(),
+        'python_version': platform.python_version(),
+        'system': platform.system(),
+        'release': platform.release(),
+    }
+
+
+def run(suite: Suite, keyword: Optional[str] = None, rounds: int = 7, min_time: float = 0.5) -> Dict[str, object]:
+    benchmarks = []
+    for name, fn in suite.cases.items():
+        if keyword and keyword not in name:
+            continue
+        stats = measure(fn, rounds, min_time)
+        benchmarks.append({'name': name, 'fullname': f"{suite.name}::{name}", 'group': suite.groups[name], 'stats': stats})
+        print(f"{name:<48} {format_time(stats['median']):>10}  ±{stats['stddev'] / stats['mean'] * 100 if stats['mean'] else 0:4.1f}%"
+              f"  {stats['ops']:>14,.0f} ops/s")
+    return {
+        'machine_info': machine_info(),
+        'commit_info': commit_info(),
+        'datetime': datetime.now().isoformat(timespec='seconds'),
+        'version': 'microbench-1',
+        'benchmarks': benchmarks,
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object]) -> List[Dict[str, object]]:
+    """Median change per benchmark present in both runs, as a fraction (+ is slower)"""
+    before = {b['name']: b['stats'] for b in baseline['benchmarks']}
+    rows = []
+    for bench in current['benchmarks']:
+        old = before.get(bench['name'])
+        if old is None:
+            continue
+        change = bench['stats']['median'] / old['median'] - 1 if old['median'] else 0.0
+        rows.append({'name': bench['name'], 'baseline': old['median'], 'current': bench['stats']['median'], 'change': change})
+    return rows
+
+
+def save_path(report: Dict[str, object]) -> str:
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+    commit = report['commit_info']['id'][:8] or 'nocommit'
+    if report['commit_info']['dirty']:
+        commit += '-dirty'
+    return os.path.join(RESULTS_DIR, f"{stamp}_{commit}.json")
+
+
+def main(suite: Suite, argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=f"Microbenchmarks: {suite.name}")
+    parser.add_argument('-k', dest='keyword', default=None, help='Only run benchmarks whose name contains this')
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.5, help='Seconds of timing per benchmark')
+    parser.add_argument('--json', dest='json_path', default=None, help='Write results to this file')
+    parser.add_argument('--save', action='store_true', help=f"Write results under {os.path.relpath(RESULTS_DIR)}/")
+    parser.add_argument('--compare', default=None, help='Baseline results file to compare medians against')
+    parser.add_argument('--fail-on-regression', type=float, default=None, metavar='PCT',
+                        help='Exit 1 if any median is this many percent slower than the baseline')
+    args = parser.parse_args(argv)
+
+    report = run(suite, args.keyword, args.rounds, args.min_time)
+
+    paths = [args.json_path] if args.json_path else []
+    if args.save:
+        paths.append(save_path(report))
+    for path in paths:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline)
+        print(f"\nAgainst {args.compare} (median):")
+        regressed = []
+        for row in rows:
+            print(f"  {row['name']:<46} {format_time(row['baseline']):>10} -> {format_time(row['current']):>10}"
+                  f"  {row['change'] * 100:+6.1f}%")
+            if args.fail_on_regression is not None and row['change'] * 100 > args.fail_on_regression:
+                regressed.append(row['name'])
+        if regressed:
+            print(f"Regressed more than {args.fail_on_regression}%: {', '.join(regressed)}")
+            sys.exit(1)
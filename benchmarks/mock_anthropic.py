@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic Messages API, for load tests that must
+not spend real API calls.
+
+Responses are shaped like web-search responses: server_tool_use and
+web_search_tool_result blocks followed by a text block with the JSON
+answer. Latency, 429/500 rates and malformed output are configurable.
+
+    python benchmarks/mock_anthropic.py --port 8787 --latency lognormal:8,0.5 --rate-429 0.05
+    ANTHROPIC_API_URL=http://127.0.0.1:8787/v1/messages python run_web.py
+
+Latency specs (seconds): fixed:S, uniform:A,B, lognormal:MEDIAN,SIGMA, exp:MEAN
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+COLLEGES = [
+    'University of Texas at Austin', 'Rice University', 'UCLA', 'NYU',
+    'Georgia Tech', 'University of Washington', 'Boston University',
+]
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Sampler for a latency spec like 'lognormal:8,0.5'"""
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(',')] if args else []
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    if kind == 'exp':
+        return lambda rng: rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+class MockSettings:
+    def __init__(
+        self,
+        latency: str = 'fixed:0',
+        rate_429: float = 0.0,
+        rate_500: float = 0.0,
+        malformed: float = 0.0,
+        web_searches: int = 2,
+        seed: Optional[int] = None
+    ):
+        self.sample_latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.malformed = malformed
+        self.web_searches = web_searches
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, '200': 0, '429': 0, '500': 0, 'malformed': 0}
+
+    def draw(self):
+        """(latency, outcome) for one request"""
+        with self.lock:
+            self.counts['requests'] += 1
+            latency = max(0.0, self.sample_latency(self.rng))
+            roll = self.rng.random()
+            if roll < self.rate_429:
+                outcome = '429'
+            elif roll < self.rate_429 + self.rate_500:
+                outcome = '500'
+            elif self.rng.random() < self.malformed:
+                outcome = 'malformed'
+            else:
+                outcome = '200'
+            self.counts[outcome] += 1
+            college = self.rng.choice(COLLEGES)
+            confidence = self.rng.randint(20, 90)
+        return latency, outcome, college, confidence
+
+
+def message_body(college: str, confidence: int, web_searches: int, malformed: bool) -> dict:
+    content = []
+    for i in range(web_searches):
+        tool_id = f"srvtoolu_{i:04d}"
+        content.append({
+            'type': 'server_tool_use', 'id': tool_id, 'name': 'web_search',
+            'input': {'query': f"{college} alumni {i}"}
+        })
+        content.append({
+            'type': 'web_search_tool_result', 'tool_use_id': tool_id,
+            'content': [
+                {'type': 'web_search_result', 'url': f"https://example.com/{i}/{j}",
+                 'title': f"Result {j}", 'encrypted_content': 'x' * 200}
+                for j in range(3)
+            ]
+        })
+    answer = {
+        'college': college, 'degree': 'BS', 'field': 'Economics', 'career': 'Analyst',
+        'personality': 'curious', 'confidence': confidence,
+        'source': 'https://example.com/profile', 'reasoning': 'Mock answer for load testing'
+    }
+    text = f"Here is what I found.\n```json\n{json.dumps(answer)}\n```"
+    if malformed:
+        text = text[:len(text) // 2]
+    content.append({'type': 'text', 'text': text})
+    return {
+        'id': 'msg_mock', 'type': 'message', 'role': 'assistant', 'model': 'mock',
+        'content': content, 'stop_reason': 'end_turn',
+        'usage': {'input_tokens': 1200, 'output_tokens': 300}
+    }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'MockAnthropicServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        settings = self.server.settings
+        latency, outcome, college, confidence = settings.draw()
+        time.sleep(latency)
+
+        headers = {
+            'anthropic-ratelimit-requests-limit': '1000',
+            'anthropic-ratelimit-requests-remaining': str(settings.rng.randint(100, 1000)),
+        }
+        if outcome == '429':
+            headers['retry-after'] = '1'
+            self._send(429, {'type': 'error', 'error': {'type': 'rate_limit_error', 'message': 'mock'}}, headers)
+        elif outcome == '500':
+            self._send(500, {'type': 'error', 'error': {'type': 'api_error', 'message': 'mock'}}, headers)
+        else:
+            body = message_body(college, confidence, settings.web_searches, outcome == 'malformed')
+            self._send(200, body, headers)
+
+    def _send(self, status: int, body: dict, headers: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockAnthropicServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, settings: MockSettings, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), MockHandler)
+        self.settings = settings
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/messages"
+
+    def start(self) -> 'MockAnthropicServer':
+        threading.Thread(target=self.serve_forever, name='mock-anthropic', daemon=True).start()
+        return self
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--latency', default='lognormal:6,0.5', help='Latency spec (seconds)')
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-500', type=float, default=0.0)
+    parser.add_argument('--malformed', type=float, default=0.0, help='Share of 200s with truncated JSON')
+    parser.add_argument('--web-searches', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def settings_from_args(args) -> MockSettings:
+    return MockSettings(args.latency, args.rate_429, args.rate_500, args.malformed, args.web_searches, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockAnthropicServer(settings_from_args(args), args.host, args.port)
+    print(f"Mock Messages API on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{server.settings.counts}")
+
+
+if __name__ == '__main__':
+    main()
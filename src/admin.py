@@ -0,0 +1,18 @@
+"""
+Admin Access
+Shared-secret check for operator-only hooks (profiling, diagnostics).
+SECURITY: Disabled unless ADMIN_TOKEN is set; compared in constant time.
+"""
+import hmac
+from typing import Optional
+from .config import config
+
+HEADER = 'X-Admin-Token'
+ENVIRON_KEY = 'HTTP_X_ADMIN_TOKEN'
+
+
+def check_admin_token(supplied: Optional[str]) -> bool:
+    expected = config.admin_token
+    if not expected or not supplied:
+        return False
+    return hmac.compare_digest(supplied.encode(), expected.encode())
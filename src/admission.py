@@ -0,0 +1,92 @@
+"""
+Admission Control
+Per-client sliding-window limits for endpoints that start expensive work.
+"""
+import time
+import threading
+import logging
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Optional
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowLimiter:
+    """
+    At most `limit` admissions per key in any `window` seconds.
+
+    Keys are kept in least-recently-seen order so idle clients are evicted
+    from the front in amortised O(1), and the key count is capped at
+    max_keys. Memory is bounded by max_keys * limit timestamps.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        window: float,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hits: 'OrderedDict[str, deque]' = OrderedDict()
+
+    def acquire(self, key: str) -> Optional[float]:
+        """
+        Try to admit one request for key.
+
+        Returns:
+            None if admitted, otherwise seconds until the next slot frees up
+        """
+        now = self._clock()
+        cutoff = now - self.window
+        with self._lock:
+            self._evict_idle(cutoff)
+
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = self._hits[key] = deque()
+                if len(self._hits) > self.max_keys:
+                    self._hits.popitem(last=False)
+            else:
+                self._hits.move_to_end(key)
+
+            while hits and hits[0] <= cutoff:
+                hits.popleft()
+
+            if len(hits) >= self.limit:
+                retry_after = hits[0] + self.window - now
+                metrics.incr(f'admission.{self.name}.rejected')
+                return max(retry_after, 0.0)
+
+            hits.append(now)
+            return None
+
+    def release(self, key: str):
+        """Give back the latest admission for key (the request was refused elsewhere)"""
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits:
+                hits.pop()
+
+    def _evict_idle(self, cutoff: float):
+        while self._hits:
+            key, hits = next(iter(self._hits.items()))
+            if hits and hits[-1] > cutoff:
+                break
+            self._hits.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Tracked keys and total stored timestamps"""
+        with self._lock:
+            return {'keys': len(self._hits), 'entries': sum(len(hits) for hits in self._hits.values())}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._hits)
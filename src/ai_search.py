@@ -3,26 +3,81 @@ import requests
 import logging
 import json
 import re
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
+from .cancellation import AbortableAdapter, CancelToken
+from .circuit_breaker import CircuitBreaker
+from .config import config
+from .degradation import Tier, FULL, LOCATION_ONLY, upstream_headroom
+from .metrics import metrics
+from .retry import RetryPolicy, parse_retry_after
+from .server_timing import add_span
+
 logger = logging.getLogger(__name__)
 
-ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_API_URL = config.anthropic_api_url
 CLAUDE_MODEL = "claude-sonnet-4-20250514"
 
+# Per-attempt ceiling; the retry policy's deadline bounds the total
+REQUEST_TIMEOUT = 90
+
+CANCELLED = "Prediction cancelled"
+
+# Shared by every searcher so all workers see the same upstream health
+model_breaker = CircuitBreaker('model_api')
+
 
 class ClaudeSearcher:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        cancel_token: Optional[CancelToken] = None
+    ):
         self.api_key = api_key
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or model_breaker
+        self.cancel_token = cancel_token
+        self._session: Optional[requests.Session] = None
+        if cancel_token is not None:
+            # Own session so cancelling can shut down the in-flight socket
+            adapter = AbortableAdapter()
+            self._session = requests.Session()
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+            cancel_token.on_cancel(adapter.abort)
         self.headers = {
             'x-api-key': api_key,
             'anthropic-version': '2023-06-01',
             'Content-Type': 'application/json'
         }
         
-    def search_person(self, name: str, age: Optional[int] = None, location: Optional[str] = None) -> Dict[str, Any]:
-        logger.info(f"Searching: {name}, age: {age}, location: {location}")
+    def search_person(
+        self,
+        name: str,
+        age: Optional[int] = None,
+        location: Optional[str] = None,
+        tier: Tier = FULL
+    ) -> Dict[str, Any]:
+        logger.info(f"Searching: {name}, age: {age}, location: {location}, tier: {tier.name}")
+        metrics.incr(f'prediction.tier.{tier.name}')
+        
+        if not tier.calls_api:
+            if location:
+                result = self._location_based_prediction(name, age, location, None)
+            else:
+                result = self._error_result("AI service busy - try again shortly")
+            result['tier'] = tier.name
+            return result
+        
+        if not self.breaker.allow_request():
+            logger.warning("Model API circuit open - using location fallback")
+            result = self._circuit_open_result(name, age, location)
+            result['tier'] = LOCATION_ONLY.name
+            return result
         
         current_year = datetime.now().year
         grad_year = (current_year - age + 22) if age else None
@@ -82,52 +137,136 @@ CRITICAL RULES:
 3. Set confidence 10-30 for guesses, 40-70 for partial info, 80+ for confirmed finds
 4. NEVER return null for college - always make a prediction"""
 
-        try:
-            logger.info("Calling Claude API with web search...")
-            response = requests.post(
-                ANTHROPIC_API_URL,
-                headers=self.headers,
-                json={
-                    'model': CLAUDE_MODEL,
-                    'max_tokens': 4096,
-                    'messages': [{'role': 'user', 'content': prompt}],
-                    'tools': [{
-                        'type': 'web_search_20250305',
-                        'name': 'web_search',
-                        'max_uses': 10
-                    }]
-                },
-                timeout=90
-            )
+        payload = {
+            'model': CLAUDE_MODEL,
+            'max_tokens': tier.max_tokens,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'tools': [{
+                'type': 'web_search_20250305',
+                'name': 'web_search',
+                'max_uses': tier.max_web_searches
+            }]
+        }
+        
+        result, error = self._call_api(payload)
+        if error:
+            prediction = self._error_result(error)
+        else:
+            prediction = self._parse_claude_response(result, name, age, location)
+        prediction['tier'] = tier.name
+        return prediction
+    
+    def _call_api(self, payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        POST to the Messages API, retrying transient failures within the deadline.
+        
+        Returns:
+            (response JSON, None) on success, (None, error message) otherwise
+        """
+        deadline = self.retry_policy.start()
+        attempt = 0
+        error = None
+        
+        post = self._session.post if self._session else requests.post
+        
+        while True:
+            attempt += 1
+            if self._cancelled():
+                return None, CANCELLED
+            if attempt > 1 and not self.breaker.allow_request():
+                logger.warning("Model API circuit opened - not retrying")
+                return None, error
+            retry_after = None
+            started = time.monotonic()
             
-            logger.info(f"Claude API Status: {response.status_code}")
+            try:
+                logger.info(f"Calling Claude API with web search (attempt {attempt})...")
+                response = post(
+                    ANTHROPIC_API_URL,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=min(REQUEST_TIMEOUT, max(deadline.remaining(), 1.0))
+                )
+                
+                logger.info(f"Claude API Status: {response.status_code}")
+                upstream_headroom.update(response.headers)
+                
+                if response.status_code == 200:
+                    self._record_attempt('ok', started, healthy=True)
+                    result = response.json()
+                    logger.info(f"Claude response: {json.dumps(result, indent=2)[:1000]}")
+                    return result, None
+                elif response.status_code == 401:
+                    self._record_attempt('http_401', started, healthy=True)
+                    logger.error(f"Claude auth error: Invalid API key")
+                    return None, "Invalid API key - check ANTHROPIC_API_KEY"
+                elif self.retry_policy.is_retryable_status(response.status_code):
+                    self._record_attempt(f'http_{response.status_code}', started, healthy=False)
+                    retry_after = parse_retry_after(response.headers.get('retry-after'))
+                    if response.status_code == 429:
+                        logger.warning(f"Claude rate limit hit")
+                        error = "Rate limit exceeded - try again in a minute"
+                    else:
+                        logger.warning(f"Claude server error: {response.status_code} - {response.text[:200]}")
+                        error = "AI service temporarily unavailable"
+                else:
+                    self._record_attempt(f'http_{response.status_code}', started, healthy=True)
+                    logger.error(f"Claude error: {response.status_code} - {response.text[:500]}")
+                    return None, f"API error (code {response.status_code})"
+                    
+            except requests.exceptions.Timeout:
+                self._record_attempt('timeout', started, healthy=False)
+                logger.error("Claude request timed out")
+                error = "Request timed out - AI took too long"
+            except requests.exceptions.ConnectionError:
+                if self._cancelled():
+                    return self._aborted()
+                self._record_attempt('connection_error', started, healthy=False)
+                logger.error("Could not connect to Claude API")
+                error = "Could not connect to AI service"
+            except Exception as e:
+                if self._cancelled():
+                    return self._aborted()
+                self._record_attempt('exception', started, healthy=False)
+                logger.error(f"Claude exception: {e}", exc_info=True)
+                return None, f"Unexpected error: {str(e)}"
+            
+            delay = self.retry_policy.next_delay(attempt, deadline, retry_after)
+            if delay is None:
+                metrics.incr('model_api.gave_up')
+                return None, error
             
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Claude response: {json.dumps(result, indent=2)[:1000]}")
-                return self._parse_claude_response(result, name, age, location)
-            elif response.status_code == 401:
-                logger.error(f"Claude auth error: Invalid API key")
-                return self._error_result("Invalid API key - check ANTHROPIC_API_KEY")
-            elif response.status_code == 429:
-                logger.error(f"Claude rate limit hit")
-                return self._error_result("Rate limit exceeded - try again in a minute")
-            elif response.status_code == 500:
-                logger.error(f"Claude server error: {response.text[:200]}")
-                return self._error_result("AI service temporarily unavailable")
+            metrics.incr('model_api.retries')
+            logger.info(f"Retrying Claude API in {delay:.1f}s")
+            if self.cancel_token is not None:
+                if self.cancel_token.wait(delay):
+                    return None, CANCELLED
             else:
-                logger.error(f"Claude error: {response.status_code} - {response.text[:500]}")
-                return self._error_result(f"API error (code {response.status_code})")
-                
-        except requests.exceptions.Timeout:
-            logger.error("Claude request timed out")
-            return self._error_result("Request timed out - AI took too long")
-        except requests.exceptions.ConnectionError:
-            logger.error("Could not connect to Claude API")
-            return self._error_result("Could not connect to AI service")
-        except Exception as e:
-            logger.error(f"Claude exception: {e}", exc_info=True)
-            return self._error_result(f"Unexpected error: {str(e)}")
+                time.sleep(delay)
+    
+    def _cancelled(self) -> bool:
+        return self.cancel_token is not None and self.cancel_token.cancelled
+    
+    def _aborted(self) -> Tuple[None, str]:
+        """In-flight request was torn down by cancellation; not an upstream failure."""
+        metrics.incr('model_api.cancelled')
+        logger.info("Claude request aborted by cancellation")
+        return None, CANCELLED
+    
+    def _record_attempt(self, outcome: str, started: float, healthy: bool):
+        """Report one attempt to metrics and the circuit breaker.
+        
+        Client errors (4xx other than 408/429) mean upstream is reachable,
+        so they count as healthy for the breaker.
+        """
+        elapsed = time.monotonic() - started
+        metrics.incr(f'model_api.attempt.{outcome}')
+        metrics.observe('model_api.attempt_seconds', elapsed)
+        add_span('model-api', elapsed)
+        if healthy:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
     
     def _parse_claude_response(self, response: Dict, name: str, age: Optional[int], location: Optional[str]) -> Dict[str, Any]:
         content_blocks = response.get('content', [])
@@ -207,7 +346,33 @@ CRITICAL RULES:
                 return self._location_based_prediction(name, age, location, text)
             return self._fallback_result(name, age, location)
     
-    def _infer_college_from_location(self, location: str) -> Optional[str]:
+    @classmethod
+    def provisional_prediction(cls, name: str, age: Optional[int], location: Optional[str]) -> Dict[str, Any]:
+        """Instant guess from the user's own inputs, shown while the web search runs."""
+        college = None
+        if location:
+            college = cls._infer_college_from_location(location) or f"Local university near {location}"
+        grad_year = (datetime.now().year - age + 22) if age else None
+        reasoning = f'Based on location: {location}' if location else ''
+        if grad_year:
+            reasoning += f', likely class of {grad_year}'
+        
+        return {
+            'found': bool(college),
+            'college': college,
+            'degree': "Bachelor's degree",
+            'field': "Unknown",
+            'career': "Unknown",
+            'personality': "Unknown",
+            'confidence': 10,
+            'source': 'inference from location',
+            'reasoning': reasoning,
+            'provisional': True,
+            'raw_response': None
+        }
+    
+    @staticmethod
+    def _infer_college_from_location(location: str) -> Optional[str]:
         """Infer most likely college based on location."""
         location_lower = location.lower()
         
@@ -254,6 +419,14 @@ CRITICAL RULES:
             'raw_response': raw_text
         }
     
+    def _circuit_open_result(self, name: str, age: Optional[int], location: Optional[str]) -> Dict[str, Any]:
+        """Skip the API entirely while the circuit is open."""
+        if location:
+            result = self._location_based_prediction(name, age, location, None)
+            result['source'] = 'inference from location (AI service unavailable)'
+            return result
+        return self._error_result("AI service temporarily unavailable")
+    
     def _error_result(self, error_msg: str) -> Dict[str, Any]:
         """Return clear error state when API fails."""
         return {
@@ -0,0 +1,163 @@
+"""
+Analyze Proxy
+Server-side forwarding for the emotion-analysis API used by the circuit pages.
+
+Browsers call /api/analyze-text on this origin; the bearer token stays
+here. Upstream calls go over one pooled keep-alive session, answers are
+cached by content hash, and concurrent requests for the same text share
+one upstream call.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Result = Tuple[int, Dict[str, Any]]
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class AnalyzeProxy:
+    """
+    Forwards analysis requests upstream.
+
+    Successful text analyses are kept for `ttl` seconds, at most
+    `max_entries` of them (least recently used evicted first). Errors
+    are not cached.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        token: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.base_url = (base_url or config.analyze_api_url).rstrip('/')
+        self.token = token if token is not None else config.analyze_api_token
+        self.ttl = ttl if ttl is not None else config.analyze_cache_ttl
+        self.max_entries = max_entries if max_entries is not None else config.analyze_cache_max
+        self.timeout = timeout if timeout is not None else config.analyze_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+
+        # Persistent pooled session so calls reuse a warm TLS connection
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or config.analyze_pool_size))
+        if self.token:
+            self.session.headers['Authorization'] = f"Bearer {self.token}"
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.token)
+
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+
+    def cache_size(self) -> int:
+        return len(self._cache)
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached body for key, or None; caller holds _lock"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, body = entry
+        if expires <= self._clock():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return body
+
+    def is_cached(self, text: str) -> bool:
+        with self._lock:
+            return self._cached(text_key(text)) is not None
+
+    def analyze_text(self, text: str) -> Result:
+        """(status, JSON body) for POST /analyze-text with this text"""
+        key = text_key(text)
+        with self._lock:
+            body = self._cached(key)
+            if body is not None:
+                metrics.incr('analyze.cache_hit')
+                return 200, body
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            metrics.incr('analyze.coalesced')
+            try:
+                return future.result(timeout=self.timeout + 5)
+            except FutureTimeout:
+                return 504, {'success': False, 'error': 'Analysis timed out'}
+
+        metrics.incr('analyze.cache_miss')
+        result = (502, {'success': False, 'error': 'Analysis failed'})
+        try:
+            result = self._post_text(text)
+        finally:
+            with self._lock:
+                if result[0] == 200:
+                    self._cache[key] = (self._clock() + self.ttl, result[1])
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+                del self._inflight[key]
+            future.set_result(result)
+        return result
+
+    def _post_text(self, text: str) -> Result:
+        started = time.monotonic()
+        try:
+            response = self.session.post(f"{self.base_url}/analyze-text", json={'text': text}, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.error(f"Analyze request failed: {e}")
+            metrics.incr('analyze.upstream_error')
+            return 502, {'success': False, 'error': 'Analysis service unavailable'}
+        finally:
+            metrics.observe('analyze.upstream_seconds', time.monotonic() - started)
+
+        try:
+            body = response.json()
+        except ValueError:
+            logger.error(f"Analyze returned non-JSON ({response.status_code})")
+            metrics.incr('analyze.upstream_error')
+            return 502, {'success': False, 'error': 'Analysis failed'}
+        if response.status_code != 200:
+            logger.warning(f"Analyze returned {response.status_code}")
+            metrics.incr('analyze.upstream_error')
+            # The browser must not read upstream auth failures as its own
+            status = 502 if response.status_code in (401, 403) else response.status_code
+            return status, body if isinstance(body, dict) else {'success': False, 'error': 'Analysis failed'}
+        return 200, body
+
+    def forward(self, path: str, data: bytes, content_type: Optional[str]) -> Tuple[int, bytes, str]:
+        """Uncached pass-through (e.g. audio uploads); (status, body, content type)"""
+        headers = {'Content-Type': content_type} if content_type else {}
+        try:
+            response = self.session.post(f"{self.base_url}/{path}", data=data, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.error(f"Analyze request failed: {e}")
+            metrics.incr('analyze.upstream_error')
+            return 502, b'{"success": false, "error": "Analysis service unavailable"}', 'application/json'
+        status = 502 if response.status_code in (401, 403) else response.status_code
+        return status, response.content, response.headers.get('Content-Type', 'application/json')
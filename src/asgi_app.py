@@ -0,0 +1,301 @@
+"""
+ASGI Entry Point
+Serves the web app under an ASGI server:
+
+    uvicorn src.asgi_app:app
+
+Waiting on a prediction (the /reveal wait and the /reveal/stream event
+feed) runs as coroutines woken by web_app.prediction_listeners, so an idle
+waiter costs a few small objects rather than an OS thread. Every other
+request goes to the unchanged Flask app on a bounded thread pool.
+"""
+import asyncio
+import io
+import json
+import sys
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from .config import config
+from .memory_diagnostics import diagnostics
+from .metrics import metrics
+from .server_timing import ENVIRON_SPANS
+from . import web_app
+from .web_app import STREAM_FLAG, WAITED_FLAG
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionWaiters:
+    """asyncio.Events per token hash, set from prediction threads"""
+
+    def __init__(self):
+        self._events: Dict[str, Set[asyncio.Event]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        if self._loop is None:
+            self._loop = loop
+            web_app.prediction_listeners.append(self.notify)
+
+    def notify(self, token_hash: str):
+        """Thread-safe; called by web_app whenever a prediction changes"""
+        if self._loop is not None and token_hash in self._events:
+            self._loop.call_soon_threadsafe(self._wake, token_hash)
+
+    def _wake(self, token_hash: str):
+        for event in self._events.get(token_hash, ()):
+            event.set()
+
+    @contextmanager
+    def watch(self, token_hash: str) -> Iterator[asyncio.Event]:
+        event = asyncio.Event()
+        self._events.setdefault(token_hash, set()).add(event)
+        try:
+            yield event
+        finally:
+            events = self._events.get(token_hash)
+            if events is not None:
+                events.discard(event)
+                if not events:
+                    del self._events[token_hash]
+
+    def __len__(self) -> int:
+        return sum(len(events) for events in self._events.values())
+
+
+def build_environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """WSGI environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        # The body is fully read, so Flask may read a chunked upload with no Content-Length
+        'wsgi.input_terminated': True,
+        STREAM_FLAG: True,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class AsgiApp:
+    """ASGI application wrapping the Flask app"""
+
+    STREAM_PATH = '/reveal/stream'
+    # Same budget as the WSGI /reveal route's polling loop, which WAITED_FLAG skips
+    REVEAL_WAIT = 5.0
+    # Same budget as reveal.html's polling deadline
+    STREAM_TIMEOUT = 90.0
+    # Keepalive interval; the stream also re-reads the store then, for answers
+    # finished by other processes (this process's answers wake it at once)
+    HEARTBEAT = 15.0
+
+    def __init__(self, flask_app, threads: Optional[int] = None):
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads or config.asgi_threads,
+            thread_name_prefix='wsgi'
+        )
+        self.waiters = PredictionWaiters()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        self.waiters.bind(asyncio.get_running_loop())
+
+        if scope['path'] == self.STREAM_PATH:
+            await self._stream(scope, receive, send)
+            return
+        extra = {}
+        if scope['path'] == '/reveal' and scope['method'] == 'GET':
+            token_hash = self._token_hash(scope)
+            if token_hash:
+                started = time.perf_counter()
+                await self._wait_for_prediction(token_hash)
+                waited = time.perf_counter() - started
+                metrics.observe('reveal.wait_seconds', waited)
+                extra = {WAITED_FLAG: True, ENVIRON_SPANS: [('reveal-wait-async', waited)]}
+        await self._call_wsgi(scope, receive, send, extra)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _run(self, fn: Callable, *args) -> 'asyncio.Future':
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _token_hash(self, scope: Dict[str, Any]) -> Optional[str]:
+        """Session token hash from the signed session cookie (no I/O)"""
+        request = self.flask_app.request_class(build_environ(scope, b''))
+        session = self.flask_app.session_interface.open_session(self.flask_app, request)
+        token = session.get('session_token') if session is not None else None
+        return web_app.hash_token(token) if token else None
+
+    async def _wait_for_prediction(self, token_hash: str):
+        """
+        Park until a prediction is stored for the session, up to REVEAL_WAIT.
+        The store is read once up front and again on each wake-up; the
+        Flask route reads it once more after the deadline.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.REVEAL_WAIT
+        with self.waiters.watch(token_hash) as event:
+            while True:
+                event.clear()
+                if await self._run(web_app.get_prediction, token_hash) is not None:
+                    return
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return
+
+    def _status(self, token_hash: str) -> Dict[str, Any]:
+        with self.flask_app.app_context():
+            return web_app.prediction_status(token_hash)
+
+    async def _stream(self, scope, receive, send):
+        """
+        Server-sent events: one 'prediction' event (the /reveal/status body)
+        once the answer is final, no job is pending, or STREAM_TIMEOUT passes.
+        """
+        token_hash = self._token_hash(scope)
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-content-type-options', b'nosniff'),
+                (b'x-accel-buffering', b'no'),
+            ]
+        })
+
+        status = {'provisional': False, 'pending': False, 'html': None}
+        if token_hash:
+            disconnected = asyncio.ensure_future(self._until_disconnect(receive))
+            try:
+                status = await self._follow(token_hash, send, disconnected)
+            finally:
+                disconnected.cancel()
+            if status is None:
+                return
+
+        data = json.dumps(status)
+        await send({
+            'type': 'http.response.body',
+            'body': f"event: prediction\ndata: {data}\n\n".encode('utf-8'),
+            'more_body': False
+        })
+
+    async def _follow(self, token_hash: str, send, disconnected: 'asyncio.Future') -> Optional[Dict[str, Any]]:
+        """Wait for a final status; None if the client went away"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.STREAM_TIMEOUT
+        last_sent = loop.time()
+        with self.waiters.watch(token_hash) as event:
+            while True:
+                event.clear()
+                web_app.prediction_jobs.touch(token_hash)
+                status = await self._run(self._status, token_hash)
+                now = loop.time()
+                if not status['provisional'] or not status['pending'] or now >= deadline:
+                    return status
+
+                # Idle until the prediction changes, the next heartbeat or the deadline;
+                # only then is the store read again
+                wake = asyncio.ensure_future(event.wait())
+                timeout = min(deadline - now, self.HEARTBEAT - (now - last_sent))
+                await asyncio.wait({wake, disconnected}, timeout=max(timeout, 0), return_when=asyncio.FIRST_COMPLETED)
+                wake.cancel()
+                if disconnected.done():
+                    return None
+                if loop.time() - last_sent >= self.HEARTBEAT:
+                    await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+                    last_sent = loop.time()
+
+    @staticmethod
+    async def _until_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def _read_body(self, receive) -> bytes:
+        """The request body, cut off once it passes MAX_CONTENT_LENGTH (Flask then answers 413)"""
+        limit = self.flask_app.config.get('MAX_CONTENT_LENGTH')
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            size += len(chunks[-1])
+            if not message.get('more_body') or (limit is not None and size > limit):
+                break
+        return b''.join(chunks)
+
+    async def _call_wsgi(self, scope, receive, send, extra: Optional[Dict[str, Any]] = None):
+        environ = build_environ(scope, await self._read_body(receive))
+        if extra:
+            environ.update(extra)
+        started: List[Any] = []
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+            started[:] = [status, headers]
+
+        def run() -> bytes:
+            result = self.flask_app(environ, start_response)
+            try:
+                return b''.join(result)
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+
+        body = await self._run(run)
+        status, headers = started
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        })
+        await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+
+
+app = AsgiApp(web_app.app)
+diagnostics.register('asgi_waiters', lambda: len(app.waiters))
@@ -7,6 +7,7 @@ import json
 from .config import config
 from .rate_limiter import RateLimiter
 from .exceptions import AuthenticationError, RateLimitError
+from .token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +18,19 @@ class LinkedInAuth:
     AUTHORIZATION_URL = "https://www.linkedin.com/oauth/v2/authorization"
     TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
     
-    def __init__(self):
+    # Tokens are treated as expired this long before their real expiry...
+    EXPIRY_MARGIN = timedelta(minutes=5)
+    # ...and refreshed proactively once they are this close to it
+    REFRESH_AHEAD = timedelta(minutes=15)
+    
+    def __init__(self, token_cache: Optional[TokenCache] = None):
         self.client_id = config.client_id
         self.client_secret = config.client_secret
         self.redirect_uri = config.redirect_uri
         self.access_token: Optional[str] = None
         self.token_expiry: Optional[datetime] = None
+        self.refresh_token: Optional[str] = None
+        self.token_cache = token_cache
         self.rate_limiter = RateLimiter()
         
     def get_authorization_url(self, scopes: list[str] = None) -> str:
@@ -45,20 +53,33 @@ class LinkedInAuth:
     
     def exchange_code_for_token(self, authorization_code: str) -> Dict[str, Any]:
         """Trade authorization code for access token."""
-        if not self.rate_limiter.check_limit():
-            raise RateLimitError("Rate limit exceeded")
-        
-        data = {
+        token_data = self._request_token({
             'grant_type': 'authorization_code',
             'code': authorization_code,
             'redirect_uri': self.redirect_uri,
             'client_id': self.client_id,
             'client_secret': self.client_secret
-        }
+        })
+        self._save_to_cache()
+        return token_data
+    
+    def refresh_access_token(self) -> Dict[str, Any]:
+        """Use the refresh token to get a new access token."""
+        if not self.refresh_token:
+            raise AuthenticationError("No refresh token available")
+        
+        return self._request_token({
+            'grant_type': 'refresh_token',
+            'refresh_token': self.refresh_token,
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        })
+    
+    def _request_token(self, data: Dict[str, str]) -> Dict[str, Any]:
+        if not self.rate_limiter.acquire():
+            raise RateLimitError("Rate limit exceeded")
         
         try:
-            self.rate_limiter.record_call()
-            
             response = requests.post(
                 self.TOKEN_URL,
                 data=data,
@@ -67,29 +88,96 @@ class LinkedInAuth:
             )
             
             if response.status_code != 200:
-                logger.error(f"Token exchange failed: {response.status_code}")
+                logger.error(f"Token request ({data['grant_type']}) failed: {response.status_code}")
                 raise AuthenticationError(f"Token exchange failed: {response.text}")
             
             token_data = response.json()
-            
-            self.access_token = token_data['access_token']
-            expires_in = token_data.get('expires_in', 3600)
-            self.token_expiry = datetime.now() + timedelta(seconds=expires_in)
-            
+            self._apply_token_data(token_data)
             return token_data
             
         except requests.RequestException as e:
             logger.error(f"Network error: {e}")
             raise AuthenticationError(f"Network error: {e}")
     
+    def _apply_token_data(self, token_data: Dict[str, Any]):
+        self.access_token = token_data['access_token']
+        expires_in = token_data.get('expires_in', 3600)
+        self.token_expiry = datetime.now() + timedelta(seconds=expires_in)
+        if token_data.get('refresh_token'):
+            self.refresh_token = token_data['refresh_token']
+    
+    def _save_to_cache(self):
+        if self.token_cache is None or not self.access_token:
+            return
+        try:
+            self.token_cache.save({
+                'access_token': self.access_token,
+                'expires_at': self.token_expiry.isoformat(),
+                'refresh_token': self.refresh_token
+            })
+        except OSError as e:
+            logger.warning(f"Could not write token cache: {e}")
+    
+    def load_cached_token(self) -> bool:
+        """Load a token saved by an earlier process. Returns True if one was loaded."""
+        if self.token_cache is None:
+            return False
+        data = self.token_cache.load()
+        if not data or not data.get('access_token'):
+            return False
+        try:
+            expiry = datetime.fromisoformat(data['expires_at'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if self.token_expiry is not None and expiry <= self.token_expiry:
+            return False
+        self.access_token = data['access_token']
+        self.token_expiry = expiry
+        self.refresh_token = data.get('refresh_token') or self.refresh_token
+        return True
+    
     def is_token_valid(self) -> bool:
         if not self.access_token or not self.token_expiry:
             return False
-        return datetime.now() < (self.token_expiry - timedelta(minutes=5))
+        return datetime.now() < (self.token_expiry - self.EXPIRY_MARGIN)
+    
+    def _needs_refresh(self) -> bool:
+        if not self.access_token or not self.token_expiry:
+            return True
+        return datetime.now() >= (self.token_expiry - self.REFRESH_AHEAD)
+    
+    def _ensure_fresh_token(self):
+        """
+        Pick up a newer token from the cache, refreshing it over the network
+        only when it is close to expiry. The cache lock keeps concurrent
+        processes from refreshing the same token twice.
+        """
+        if self.token_cache is None:
+            if self.refresh_token:
+                self._try_refresh()
+            return
+        
+        with self.token_cache.locked():
+            self.load_cached_token()
+            if self._needs_refresh() and self.refresh_token:
+                if self._try_refresh():
+                    self._save_to_cache()
+    
+    def _try_refresh(self) -> bool:
+        try:
+            self.refresh_access_token()
+            logger.info("Access token refreshed")
+            return True
+        except (AuthenticationError, RateLimitError) as e:
+            # A still-valid token keeps working; only fail once it's unusable
+            logger.warning(f"Token refresh failed: {e}")
+            return False
     
     def get_access_token(self) -> str:
+        if self._needs_refresh():
+            self._ensure_fresh_token()
         if not self.is_token_valid():
-            raise AuthenticationError("No valid token")
+            raise AuthenticationError("No valid access token")
         return self.access_token
     
     def _generate_state(self) -> str:
@@ -99,4 +187,7 @@ class LinkedInAuth:
     def revoke_token(self):
         self.access_token = None
         self.token_expiry = None
+        self.refresh_token = None
+        if self.token_cache is not None:
+            self.token_cache.clear()
 
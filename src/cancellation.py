@@ -0,0 +1,122 @@
+"""
+Cancellation
+Cooperative cancel tokens and a requests adapter whose in-flight
+connections can be torn down from another thread.
+"""
+import socket
+import threading
+import logging
+import weakref
+from typing import Callable, List, Optional
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+logger = logging.getLogger(__name__)
+
+
+class CancelToken:
+    """
+    One-shot cancellation flag shared between a job and whoever owns it.
+
+    Callbacks registered with on_cancel run once, in the cancelling thread.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = 'cancelled') -> bool:
+        """
+        Cancel the token.
+
+        Returns:
+            True if this call cancelled it, False if it already was
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancel callback failed: {e}")
+        return True
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """Run callback on cancel, or immediately if already cancelled"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds; True if cancelled meanwhile"""
+        return self._event.wait(timeout)
+
+
+def _tracking_pool(base, track):
+    class TrackingPool(base):
+        def _new_conn(self):
+            conn = super()._new_conn()
+            track(conn)
+            return conn
+    TrackingPool.__name__ = f"Tracking{base.__name__}"
+    return TrackingPool
+
+
+class AbortableAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that remembers its connections so abort() can shut down
+    their sockets, unblocking a thread waiting on a response.
+
+    The blocked request then fails with a ConnectionError, and any request
+    sent after abort() fails immediately.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._connections = weakref.WeakSet()
+        self._track_lock = threading.Lock()
+        self._aborted = False
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _tracking_pool(cls, self._track)
+            for scheme, cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def _track(self, conn):
+        with self._track_lock:
+            self._connections.add(conn)
+
+    def send(self, request, *args, **kwargs):
+        if self._aborted:
+            raise RequestsConnectionError("Request aborted", request=request)
+        return super().send(request, *args, **kwargs)
+
+    def abort(self):
+        self._aborted = True
+        with self._track_lock:
+            connections = list(self._connections)
+        for conn in connections:
+            sock = getattr(conn, 'sock', None)
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.close()
@@ -0,0 +1,109 @@
+"""
+Circuit Breaker
+Stops sending requests to an upstream that keeps failing, and probes it
+periodically to detect recovery.
+"""
+import time
+import threading
+import logging
+from typing import Callable, Dict, Any, Optional
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker.
+
+    - closed: requests flow; consecutive failures are counted
+    - open: requests are refused until reset_timeout has elapsed
+    - half_open: a single probe request is let through; its outcome
+      closes the circuit or re-opens it for another reset_timeout
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold if failure_threshold is not None else config.breaker_failure_threshold
+        self.reset_timeout = reset_timeout if reset_timeout is not None else config.breaker_reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        if state != self._state:
+            logger.warning(f"Circuit '{self.name}': {self._state} -> {state}")
+            metrics.incr(f'breaker.{self.name}.{state}')
+            self._state = state
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may go upstream now.
+
+        In half-open state only one caller gets True (the probe); a probe
+        that never reports back is abandoned after reset_timeout.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN:
+                now = self._clock()
+                if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                    self._probe_started = now
+                    return True
+            metrics.incr(f'breaker.{self.name}.rejected')
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_started = None
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._probe_started = None
+                self._transition(self.OPEN)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (self._clock() - self._opened_at)), 1)
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'retry_in': retry_in
+            }
@@ -4,31 +4,49 @@ Provides interactive CLI for LinkedIn profile searching.
 """
 import click
 import logging
+import os
 import sys
 from typing import Optional
-from .auth import LinkedInAuth
-from .profile_searcher import ProfileSearcher
-from .exceptions import LinkedInAPIError, ValidationError
+from .exceptions import AuthenticationError, LinkedInAPIError, ValidationError
 from .config import config
-import json
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, config.log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/linkedin_search.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+
+# Command dependencies (auth, requests, cryptography) are imported inside
+# each command so that --help and info start without loading them.
 
 logger = logging.getLogger(__name__)
 
 
+def setup_logging():
+    """Attach file and console handlers; called once a command actually runs"""
+    os.makedirs('logs', exist_ok=True)
+    logging.basicConfig(
+        level=getattr(logging, config.log_level),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('logs/linkedin_search.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+
+def cached_auth():
+    """LinkedInAuth holding the token saved by 'auth', or None if there is none"""
+    from .auth import LinkedInAuth
+    from .token_cache import TokenCache
+    
+    try:
+        token_cache = TokenCache()
+    except AuthenticationError as e:
+        logger.info(f"Token cache unavailable: {e}")
+        return None
+    linkedin_auth = LinkedInAuth(token_cache=token_cache)
+    return linkedin_auth if linkedin_auth.load_cached_token() else None
+
+
 @click.group()
 def cli():
     """LinkedIn Profile Search Tool"""
-    pass
+    setup_logging()
 
 
 @cli.command()
@@ -37,8 +55,11 @@ def auth():
     Start OAuth authentication flow.
     This will generate an authorization URL for you to visit.
     """
+    from .auth import LinkedInAuth
+    from .token_cache import TokenCache
+    
     try:
-        linkedin_auth = LinkedInAuth()
+        linkedin_auth = LinkedInAuth(token_cache=TokenCache())
         auth_url = linkedin_auth.get_authorization_url()
         
         click.echo("\n" + "="*70)
@@ -55,6 +76,7 @@ def auth():
         
         click.echo("\n✓ Authentication successful!")
         click.echo(f"Access token expires in: {token_data.get('expires_in', 'unknown')} seconds")
+        click.echo("Token saved (encrypted) for later commands.")
         click.echo("\nYou can now use the search command.")
         
     except Exception as e:
@@ -76,6 +98,9 @@ def search(name: str, age: int, max_results: int, output: Optional[str]):
     Example:
         linkedin-search search --name "John Doe" --age 25
     """
+    import json
+    from .profile_searcher import ProfileSearcher
+    
     try:
         click.echo(f"\nSearching for: {name}, age {age}")
         click.echo("="*70)
@@ -83,10 +108,13 @@ def search(name: str, age: int, max_results: int, output: Optional[str]):
         # Initialize searcher
         searcher = ProfileSearcher()
         
-        # Note: You need to complete OAuth authentication first
-        # The auth token would be loaded here from a secure storage
-        click.echo("\n⚠️  Authentication Required:")
-        click.echo("Please run 'python main.py auth' first to authenticate.")
+        # Reuse the token saved by 'auth' - no network round trip needed
+        linkedin_auth = cached_auth()
+        if linkedin_auth is not None:
+            searcher.authenticate(linkedin_auth)
+        else:
+            click.echo("\n⚠️  Authentication Required:")
+            click.echo("Please run 'python main.py auth' first to authenticate.")
         click.echo("\nAttempting search...\n")
         
         # Attempt the search
@@ -136,21 +164,69 @@ def test_connection():
     Test LinkedIn API connection by fetching your own profile.
     This IS supported by the standard LinkedIn API.
     """
+    from .profile_searcher import ProfileSearcher
+    
     try:
         click.echo("\nTesting LinkedIn API connection...")
         click.echo("="*70)
         
-        # Note: Requires authentication
-        click.echo("\n⚠️  This command requires authentication.")
-        click.echo("Please run 'auth' command first.\n")
+        linkedin_auth = cached_auth()
+        if linkedin_auth is None:
+            click.echo("\n⚠️  This command requires authentication.")
+            click.echo("Please run 'auth' command first.\n")
+            return
         
-        # In a full implementation, you would load saved auth token here
+        searcher = ProfileSearcher()
+        searcher.authenticate(linkedin_auth)
+        profile = searcher.client.get_my_profile()
+        name = searcher.client._extract_name(profile)
+        click.echo(f"\n✓ Connected as: {name}")
         
     except Exception as e:
         click.echo(f"\n✗ Connection test failed: {str(e)}", err=True)
         sys.exit(1)
 
 
+@cli.command()
+@click.option('--log-dir', '-d', default=None, type=click.Path(), help='Event log directory (default: EVENT_LOG_DIR)')
+@click.option('--workers', '-w', default=1, type=int, help='Summarise files in parallel processes')
+@click.option('--json', 'as_json', is_flag=True, help='Print the summary as JSON')
+def funnel(log_dir: Optional[str], workers: int, as_json: bool):
+    """
+    Summarise the game funnel from the event log.
+    Streams rotated log files, so memory use does not grow with log size.
+    """
+    import json
+    from .funnel_analytics import log_files, summarize
+
+    log_dir = log_dir or config.event_log_dir
+    paths = log_files(log_dir)
+    if not paths:
+        click.echo(f"\n✗ No event logs found in {log_dir}", err=True)
+        sys.exit(1)
+
+    summary = summarize(paths, workers=workers).to_dict()
+    if as_json:
+        click.echo(json.dumps(summary, indent=2))
+        return
+
+    click.echo("\n" + "="*70)
+    click.echo(f"Funnel ({len(paths)} files, {summary['events']} events)")
+    click.echo("="*70)
+    for step in summary['funnel']:
+        rate = f"{step['from_previous']:.1%}" if step['from_previous'] is not None else ''
+        click.echo(f"   {step['stage']:<8} {step['count']:>10}   {rate}")
+
+    latency = summary['prediction_latency']
+    click.echo(f"\n⏱  Prediction latency ({latency['count']} predictions, {latency['errors']} errors):")
+    click.echo(f"   p50 {latency['p50']}s   p90 {latency['p90']}s   p99 {latency['p99']}s")
+
+    click.echo("\n🎯 Feedback accuracy by confidence:")
+    for band in summary['accuracy_by_confidence']:
+        click.echo(f"   {band['band']:<8} {band['correct']:>6}/{band['total']:<6} {band['accuracy']:.1%}")
+    click.echo("")
+
+
 @cli.command()
 def info():
     """
@@ -196,9 +272,5 @@ def info():
 
 
 if __name__ == '__main__':
-    # Create logs directory if it doesn't exist
-    import os
-    os.makedirs('logs', exist_ok=True)
-    
     cli()
 
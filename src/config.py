@@ -10,7 +10,108 @@ class Config:
         self.app_env = os.getenv('APP_ENV', 'development')
         self.debug = os.getenv('DEBUG', 'true').lower() == 'true'
         self.log_level = os.getenv('LOG_LEVEL', 'DEBUG')
-    
+        
+        # Messages API endpoint; point at benchmarks/mock_anthropic.py for load tests
+        self.anthropic_api_url = os.getenv('ANTHROPIC_API_URL', 'https://api.anthropic.com/v1/messages')
+        
+        # Model API retry policy
+        self.model_max_attempts = int(os.getenv('MODEL_MAX_ATTEMPTS', '4'))
+        self.model_retry_base_delay = float(os.getenv('MODEL_RETRY_BASE_DELAY', '1.0'))
+        self.model_retry_max_delay = float(os.getenv('MODEL_RETRY_MAX_DELAY', '20'))
+        self.prediction_deadline = float(os.getenv('PREDICTION_DEADLINE_SECONDS', '90'))
+        
+        # Model API circuit breaker
+        self.breaker_failure_threshold = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+        self.breaker_reset_timeout = float(os.getenv('BREAKER_RESET_TIMEOUT', '30'))
+        
+        # Cancel a prediction when its session shows no activity for this long. Open
+        # game and reveal pages report activity every SESSION_ACTIVITY_INTERVAL_SECONDS,
+        # so this stays well under the prediction deadline
+        self.prediction_idle_timeout = float(os.getenv('PREDICTION_IDLE_TIMEOUT', '45'))
+        self.session_activity_interval = float(os.getenv('SESSION_ACTIVITY_INTERVAL_SECONDS', '15'))
+        
+        # Load-adaptive degradation: thresholds for the reduced and location-only tiers
+        self.tier_reduced_queue_depth = int(os.getenv('TIER_REDUCED_QUEUE_DEPTH', '20'))
+        self.tier_location_queue_depth = int(os.getenv('TIER_LOCATION_QUEUE_DEPTH', '50'))
+        self.tier_reduced_p95 = float(os.getenv('TIER_REDUCED_P95_SECONDS', '45'))
+        self.tier_location_p95 = float(os.getenv('TIER_LOCATION_P95_SECONDS', '75'))
+        self.tier_reduced_headroom = float(os.getenv('TIER_REDUCED_HEADROOM', '0.2'))
+        self.tier_location_headroom = float(os.getenv('TIER_LOCATION_HEADROOM', '0.05'))
+        
+        # Admission control for endpoints that start model calls
+        self.admission_window = float(os.getenv('ADMISSION_WINDOW_SECONDS', '600'))
+        self.admission_max_per_ip = int(os.getenv('ADMISSION_MAX_PER_IP', '10'))
+        self.admission_max_per_session = int(os.getenv('ADMISSION_MAX_PER_SESSION', '3'))
+        self.admission_max_clients = int(os.getenv('ADMISSION_MAX_CLIENTS', '10000'))
+        self.trust_proxy_headers = os.getenv('TRUST_PROXY_HEADERS', 'false').lower() == 'true'
+        
+        # Encrypted LinkedIn OAuth token cache shared by CLI runs
+        self.token_cache_path = os.getenv(
+            'LINKEDIN_TOKEN_CACHE',
+            os.path.join(os.path.expanduser('~'), '.cache', 'linkedin-search', 'token.bin')
+        )
+        self.token_cache_key = os.getenv('TOKEN_CACHE_KEY')
+        
+        # Keep the model's raw text (spilled under logs/predictions/) for debugging
+        self.prediction_debug = os.getenv('PREDICTION_DEBUG', 'false').lower() == 'true'
+
+        # Buffered funnel/feedback event log (JSON lines, rotated by size)
+        self.event_log_dir = os.getenv('EVENT_LOG_DIR', os.path.join('logs', 'events'))
+        self.event_flush_size = int(os.getenv('EVENT_FLUSH_SIZE', '200'))
+        self.event_flush_interval = float(os.getenv('EVENT_FLUSH_INTERVAL_SECONDS', '2'))
+        self.event_log_max_bytes = int(os.getenv('EVENT_LOG_MAX_BYTES', str(50 * 1024 * 1024)))
+        self.event_buffer_max = int(os.getenv('EVENT_BUFFER_MAX', '10000'))
+
+        # Durable prediction job queue (SQLite); rows are deleted after the TTL
+        self.job_queue_path = os.getenv('JOB_QUEUE_PATH', os.path.join('data', 'prediction_jobs.db'))
+        self.job_queue_ttl = float(os.getenv('JOB_QUEUE_TTL_SECONDS', '3600'))
+        self.job_queue_lease = float(os.getenv('JOB_QUEUE_LEASE_SECONDS', str(self.prediction_deadline + 30)))
+        self.job_queue_max_attempts = int(os.getenv('JOB_QUEUE_MAX_ATTEMPTS', '3'))
+        self.job_queue_poll_interval = float(os.getenv('JOB_QUEUE_POLL_SECONDS', '15'))
+
+        # Threads the ASGI entry point uses to run ordinary (WSGI) requests
+        self.asgi_threads = int(os.getenv('ASGI_THREADS', '32'))
+
+        # Report handler/render/session/wait timings in a Server-Timing header
+        self.server_timing = os.getenv('SERVER_TIMING', 'true').lower() == 'true'
+
+        # Operator-only hooks require this token in X-Admin-Token; unset disables them
+        self.admin_token = os.getenv('ADMIN_TOKEN')
+
+        # Per-request profiling for admin requests (off by default)
+        self.profiling_enabled = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+        self.profile_max_per_hour = int(os.getenv('PROFILE_MAX_PER_HOUR', '20'))
+        self.profile_max_files = int(os.getenv('PROFILE_MAX_FILES', '50'))
+        self.profile_sample_interval = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.005'))
+
+        # Trace allocations from startup (otherwise from the first diagnostics call)
+        self.memory_tracing = os.getenv('MEMORY_TRACING', 'false').lower() == 'true'
+        # Tracing started by a diagnostics call stops again after this long
+        self.memory_tracing_window = float(os.getenv('MEMORY_TRACING_WINDOW_SECONDS', '900'))
+
+        # Content-Security-Policy for HTML responses
+        self.content_security_policy = os.getenv('CONTENT_SECURITY_POLICY', (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline'; "
+            "style-src 'self' 'unsafe-inline' https://api.fontshare.com; "
+            "font-src 'self' https://cdn.fontshare.com; "
+            "connect-src 'self' http://ip-api.com"
+        ))
+
+        # Browser caching for versioned static files
+        self.static_max_age = int(os.getenv('STATIC_MAX_AGE_SECONDS', str(365 * 24 * 3600)))
+
+        # Emotion-analysis API behind /api/analyze-text; unset token disables the proxy
+        self.analyze_api_url = os.getenv('ANALYZE_API_URL', 'https://vdp-peach.vercel.app/api')
+        self.analyze_api_token = os.getenv('ANALYZE_API_TOKEN')
+        self.analyze_timeout = float(os.getenv('ANALYZE_TIMEOUT_SECONDS', '30'))
+        self.analyze_pool_size = int(os.getenv('ANALYZE_POOL_SIZE', '10'))
+        self.analyze_cache_ttl = float(os.getenv('ANALYZE_CACHE_TTL_SECONDS', '3600'))
+        self.analyze_cache_max = int(os.getenv('ANALYZE_CACHE_MAX', '2000'))
+        self.analyze_max_text = int(os.getenv('ANALYZE_MAX_TEXT', '5000'))
+        self.analyze_max_upload = int(os.getenv('ANALYZE_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+        self.analyze_max_per_ip = int(os.getenv('ANALYZE_MAX_PER_IP', '60'))
+
     def is_production(self) -> bool:
         return self.app_env == 'production'
 
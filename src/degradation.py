@@ -0,0 +1,131 @@
+"""
+Degradation Tiers
+Picks how much work a prediction may ask of the model based on current load.
+"""
+import time
+import threading
+import logging
+from typing import Dict, Optional, Mapping
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Tier:
+    """A model request profile. max_tokens == 0 means skip the API."""
+
+    __slots__ = ('name', 'max_tokens', 'max_web_searches')
+
+    def __init__(self, name: str, max_tokens: int, max_web_searches: int):
+        self.name = name
+        self.max_tokens = max_tokens
+        self.max_web_searches = max_web_searches
+
+    @property
+    def calls_api(self) -> bool:
+        return self.max_tokens > 0
+
+    def __repr__(self) -> str:
+        return f"Tier({self.name!r})"
+
+
+FULL = Tier('full', 4096, 10)
+REDUCED = Tier('reduced', 2048, 3)
+LOCATION_ONLY = Tier('location_only', 0, 0)
+
+TIERS: Dict[str, Tier] = {tier.name: tier for tier in (FULL, REDUCED, LOCATION_ONLY)}
+
+
+class UpstreamHeadroom:
+    """
+    Remaining share of the model API's rate limit, from the
+    anthropic-ratelimit-* headers on the most recent response.
+    """
+
+    PREFIX = 'anthropic-ratelimit-'
+    STALE_AFTER = 60.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fraction: Optional[float] = None
+        self._updated = 0.0
+
+    def update(self, headers: Mapping[str, str]):
+        fractions = []
+        for kind in ('requests', 'tokens', 'input-tokens', 'output-tokens'):
+            remaining = headers.get(f'{self.PREFIX}{kind}-remaining')
+            limit = headers.get(f'{self.PREFIX}{kind}-limit')
+            try:
+                if remaining is not None and limit and int(limit) > 0:
+                    fractions.append(int(remaining) / int(limit))
+            except ValueError:
+                continue
+        if fractions:
+            with self._lock:
+                self._fraction = min(fractions)
+                self._updated = time.monotonic()
+
+    def fraction(self) -> Optional[float]:
+        """Remaining fraction in [0, 1], or None if unknown or stale"""
+        with self._lock:
+            if self._fraction is None or time.monotonic() - self._updated > self.STALE_AFTER:
+                return None
+            return self._fraction
+
+
+upstream_headroom = UpstreamHeadroom()
+
+
+class TierSelector:
+    """
+    Chooses the most degraded tier any load signal calls for.
+
+    Signals: prediction queue depth, p95 model latency over the last
+    LATENCY_WINDOW seconds and the upstream rate-limit headroom.
+    """
+
+    def __init__(
+        self,
+        reduced_queue_depth: Optional[int] = None,
+        location_queue_depth: Optional[int] = None,
+        reduced_p95: Optional[float] = None,
+        location_p95: Optional[float] = None,
+        reduced_headroom: Optional[float] = None,
+        location_headroom: Optional[float] = None
+    ):
+        self.reduced_queue_depth = reduced_queue_depth if reduced_queue_depth is not None else config.tier_reduced_queue_depth
+        self.location_queue_depth = location_queue_depth if location_queue_depth is not None else config.tier_location_queue_depth
+        self.reduced_p95 = reduced_p95 if reduced_p95 is not None else config.tier_reduced_p95
+        self.location_p95 = location_p95 if location_p95 is not None else config.tier_location_p95
+        self.reduced_headroom = reduced_headroom if reduced_headroom is not None else config.tier_reduced_headroom
+        self.location_headroom = location_headroom if location_headroom is not None else config.tier_location_headroom
+
+    def choose(self, queue_depth: int, p95: Optional[float], headroom: Optional[float]) -> Tier:
+        if (queue_depth >= self.location_queue_depth
+                or (p95 is not None and p95 >= self.location_p95)
+                or (headroom is not None and headroom <= self.location_headroom)):
+            return LOCATION_ONLY
+        if (queue_depth >= self.reduced_queue_depth
+                or (p95 is not None and p95 >= self.reduced_p95)
+                or (headroom is not None and headroom <= self.reduced_headroom)):
+            return REDUCED
+        return FULL
+
+
+tier_selector = TierSelector()
+
+# Latency samples older than this are ignored. Location-only predictions make
+# no API call and add no samples, so without a time limit a slow spell would
+# keep p95 high, and the app degraded, until restart.
+LATENCY_WINDOW = 300.0
+
+
+def choose_tier(queue_depth: int) -> Tier:
+    """Tier for a new prediction given how many are already in flight"""
+    p95 = metrics.percentile('model_api.attempt_seconds', 95, window=LATENCY_WINDOW)
+    headroom = upstream_headroom.fraction()
+    tier = tier_selector.choose(queue_depth, p95, headroom)
+    if tier is not FULL:
+        logger.info(f"Degrading to {tier.name}: queue={queue_depth}, p95={p95}, headroom={headroom}")
+    return tier
@@ -0,0 +1,150 @@
+"""
+Event Log
+Append-only JSON-lines event sink with an in-memory buffer and a
+background writer, so request handlers never touch the disk.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FILE = 'events.jsonl'
+
+
+class EventSink:
+    """
+    Buffered event writer.
+
+    emit() only appends to an in-memory list. A daemon thread serialises
+    and writes the buffer when it reaches flush_size records or every
+    flush_interval seconds, whichever comes first, and rotates the active
+    file to events-<timestamp>.jsonl once it passes max_bytes. There is no
+    fsync; a crash can lose at most the last unflushed interval.
+
+    Records look like {"t": 1700000000.123, "e": "signup", "s": "<hash>", ...}.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        flush_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        max_buffer: Optional[int] = None
+    ):
+        self.directory = directory or config.event_log_dir
+        self.flush_size = flush_size or config.event_flush_size
+        self.flush_interval = flush_interval or config.event_flush_interval
+        self.max_bytes = max_bytes or config.event_log_max_bytes
+        self.max_buffer = max_buffer or config.event_buffer_max
+        self._cond = threading.Condition()
+        self._buffer: List[Tuple[float, str, Dict[str, Any]]] = []
+        self._writer: Optional[threading.Thread] = None
+        self._file = None
+        self._closed = False
+        # Serialises flushes from the writer thread and explicit flush()/close()
+        self._io_lock = threading.Lock()
+
+    @property
+    def active_path(self) -> str:
+        return os.path.join(self.directory, ACTIVE_FILE)
+
+    def emit(self, event: str, **fields: Any):
+        """Queue an event; never blocks on I/O"""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._buffer) >= self.max_buffer:
+                metrics.incr('events.dropped')
+                return
+            self._buffer.append((time.time(), event, fields))
+            if self._writer is None:
+                self._start_writer()
+            elif len(self._buffer) >= self.flush_size:
+                self._cond.notify()
+
+    def _start_writer(self):
+        self._writer = threading.Thread(target=self._run, name='event-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buffer) < self.flush_size:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def _take(self) -> List[Tuple[float, str, Dict[str, Any]]]:
+        with self._cond:
+            batch, self._buffer = self._buffer, []
+        return batch
+
+    def flush(self):
+        """Write everything buffered so far"""
+        with self._io_lock:
+            batch = self._take()
+            if not batch:
+                return
+            lines = []
+            for ts, event, fields in batch:
+                record = {'t': round(ts, 3), 'e': event}
+                record.update(fields)
+                lines.append(json.dumps(record, separators=(',', ':'), default=str))
+            data = '\n'.join(lines) + '\n'
+            try:
+                self._write(data)
+                metrics.incr('events.written', len(batch))
+            except OSError as e:
+                metrics.incr('events.dropped', len(batch))
+                logger.error(f"Event log write failed: {e}")
+
+    def _write(self, data: str):
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(self.active_path, 'a', encoding='utf-8')
+        if self._file.tell() and self._file.tell() + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        os.replace(self.active_path, os.path.join(self.directory, f"events-{stamp}.jsonl"))
+        self._file = open(self.active_path, 'a', encoding='utf-8')
+        logger.info("Rotated event log")
+
+    def close(self):
+        """Flush remaining events and stop the writer"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            writer = self._writer
+            self._cond.notify()
+        if writer is not None and writer is not threading.current_thread():
+            writer.join(timeout=5)
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._buffer)
+
+
+events = EventSink()
@@ -0,0 +1,210 @@
+"""
+Funnel Analytics
+Streams the event log (see event_log.py) through a generator pipeline and
+summarises it in constant memory: per-stage drop-off, prediction latency
+percentiles and feedback accuracy by confidence band.
+"""
+import glob
+import gzip
+import json
+import logging
+import math
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('signup', 'game1', 'game2', 'game3', 'reveal')
+
+# Upper bounds (inclusive) of the confidence bands feedback is grouped into
+CONFIDENCE_BANDS = ((24, '0-24'), (49, '25-49'), (74, '50-74'), (100, '75-100'))
+
+
+def log_files(directory: str) -> List[str]:
+    """Rotated files oldest first, then the active file"""
+    rotated = sorted(glob.glob(os.path.join(directory, 'events-*.jsonl*')))
+    active = os.path.join(directory, 'events.jsonl')
+    return rotated + ([active] if os.path.exists(active) else [])
+
+
+def read_lines(path: str) -> Iterator[str]:
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            yield line
+
+
+def parse_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Decode JSON lines, skipping blank or truncated ones"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and 'e' in record:
+            yield record
+
+
+def stage_of(record: Dict[str, Any]) -> Optional[str]:
+    event = record['e']
+    if event == 'game_complete':
+        return f"game{record.get('game')}"
+    if event in ('signup', 'reveal'):
+        return event
+    return None
+
+
+def confidence_band(confidence: Any) -> str:
+    try:
+        value = int(confidence)
+    except (TypeError, ValueError):
+        return 'unknown'
+    for upper, label in CONFIDENCE_BANDS:
+        if value <= upper:
+            return label
+    return CONFIDENCE_BANDS[-1][1]
+
+
+class LatencyHistogram:
+    """
+    Log-spaced bucket counts; percentiles are accurate to one bucket
+    (about 6% at 40 buckets per decade) and histograms merge by addition.
+    """
+
+    MIN_SECONDS = 0.01
+    BUCKETS_PER_DECADE = 40
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        return int(math.log10(seconds / self.MIN_SECONDS) * self.BUCKETS_PER_DECADE) + 1
+
+    def _upper_bound(self, bucket: int) -> float:
+        return self.MIN_SECONDS * 10 ** (bucket / self.BUCKETS_PER_DECADE)
+
+    def add(self, seconds: float):
+        bucket = self._bucket(seconds)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+
+    def merge(self, other: 'LatencyHistogram'):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(self.total * pct / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return round(self._upper_bound(bucket), 3)
+        return None
+
+
+class FunnelStats:
+    """
+    Mergeable counters for one or more log files.
+
+    Stage counts are event counts, not distinct sessions: deduplicating
+    sessions would need memory proportional to traffic.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self.stages: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self.latency = LatencyHistogram()
+        self.prediction_errors = 0
+        self.feedback: Dict[str, List[int]] = {}
+
+    def add(self, record: Dict[str, Any]):
+        self.events += 1
+        event = record['e']
+        stage = stage_of(record)
+        if stage in self.stages:
+            self.stages[stage] += 1
+        elif event == 'prediction':
+            seconds = record.get('seconds')
+            if isinstance(seconds, (int, float)):
+                self.latency.add(seconds)
+            if record.get('error'):
+                self.prediction_errors += 1
+        elif event == 'feedback':
+            band = self.feedback.setdefault(confidence_band(record.get('confidence')), [0, 0])
+            band[0] += bool(record.get('correct'))
+            band[1] += 1
+
+    def merge(self, other: 'FunnelStats') -> 'FunnelStats':
+        self.events += other.events
+        for stage, count in other.stages.items():
+            self.stages[stage] += count
+        self.latency.merge(other.latency)
+        self.prediction_errors += other.prediction_errors
+        for band, (correct, total) in other.feedback.items():
+            mine = self.feedback.setdefault(band, [0, 0])
+            mine[0] += correct
+            mine[1] += total
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        funnel = []
+        previous = None
+        for stage in STAGES:
+            count = self.stages[stage]
+            funnel.append({
+                'stage': stage,
+                'count': count,
+                'from_previous': round(count / previous, 3) if previous else None
+            })
+            previous = count
+        order = [label for _, label in CONFIDENCE_BANDS] + ['unknown']
+        return {
+            'events': self.events,
+            'funnel': funnel,
+            'prediction_latency': {
+                'count': self.latency.total,
+                'errors': self.prediction_errors,
+                'p50': self.latency.percentile(50),
+                'p90': self.latency.percentile(90),
+                'p99': self.latency.percentile(99)
+            },
+            'accuracy_by_confidence': [
+                {
+                    'band': band,
+                    'correct': self.feedback[band][0],
+                    'total': self.feedback[band][1],
+                    'accuracy': round(self.feedback[band][0] / self.feedback[band][1], 3)
+                }
+                for band in order if band in self.feedback
+            ]
+        }
+
+
+def summarize_file(path: str) -> FunnelStats:
+    stats = FunnelStats()
+    for record in parse_events(read_lines(path)):
+        stats.add(record)
+    return stats
+
+
+def summarize(paths: List[str], workers: int = 1) -> FunnelStats:
+    """Summarise files one at a time, or across a process pool when workers > 1"""
+    total = FunnelStats()
+    if workers > 1 and len(paths) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for stats in pool.map(summarize_file, paths):
+                total.merge(stats)
+    else:
+        for path in paths:
+            total.merge(summarize_file(path))
+    return total
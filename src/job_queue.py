@@ -0,0 +1,284 @@
+"""
+Job Queue
+SQLite-backed record of prediction jobs so a restart does not lose them.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    token_hash TEXT PRIMARY KEY,
+    key TEXT,
+    payload TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    result TEXT
+)
+"""
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueue:
+    """
+    Durable prediction jobs keyed by session token hash.
+
+    A job is claimed by moving it to 'running' with a lease inside a
+    BEGIN IMMEDIATE transaction, so two workers (threads or processes)
+    can never claim the same job. A running job whose lease has lapsed,
+    because its process died, can be claimed again until max_attempts.
+
+    Completing a job stores the prediction record and drops its inputs.
+    Every row is deleted ttl seconds after its last update.
+
+    Each thread keeps one connection open, in WAL mode with
+    synchronous=NORMAL: a commit is an append to the WAL with no fsync,
+    which can lose the last few jobs on power loss but not corrupt the
+    database.
+
+    The queue is best-effort: SQLite errors are logged and counted, and
+    callers fall back to in-memory behaviour.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        lease: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.path = path or config.job_queue_path
+        self.ttl = ttl or config.job_queue_ttl
+        self.lease = lease or config.job_queue_lease
+        self.max_attempts = max_attempts or config.job_queue_max_attempts
+        self._clock = clock
+        self._initialised = False
+        self._local = threading.local()
+
+    def _open(self) -> sqlite3.Connection:
+        if not self._initialised:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA synchronous=NORMAL')
+            if not self._initialised:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(SCHEMA)
+                self._initialised = True
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """The calling thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        try:
+            yield conn
+        except BaseException:
+            # Never reuse a connection left in an unknown state
+            self.close()
+            raise
+
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def _safely(self, operation: str, fn: Callable[[sqlite3.Connection], Any], default: Any = None) -> Any:
+        try:
+            with self._connect() as conn:
+                return fn(conn)
+        except (sqlite3.Error, OSError) as e:
+            metrics.incr('job_queue.errors')
+            logger.error(f"Job queue {operation} failed: {e}")
+            return default
+
+    def enqueue(self, token_hash: str, key: str, payload: Dict[str, Any]) -> bool:
+        """
+        Record a pending job, replacing any job for the session with other inputs.
+
+        Returns:
+            False if a job with the same key is already pending, running or done
+        """
+        def op(conn):
+            now = self._clock()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT key, status FROM jobs WHERE token_hash = ?', (token_hash,)).fetchone()
+                if row is not None and row['key'] == key and row['status'] in (PENDING, RUNNING, DONE):
+                    conn.execute('COMMIT')
+                    return False
+                conn.execute(
+                    'INSERT OR REPLACE INTO jobs (token_hash, key, payload, status, attempts, lease_until, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, 0, 0, ?, ?)',
+                    (token_hash, key, json.dumps(payload), PENDING, now, now)
+                )
+                conn.execute('COMMIT')
+                return True
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return self._safely('enqueue', op, False)
+
+    def enqueue_claimed(self, token_hash: str, key: str, payload: Dict[str, Any]) -> bool:
+        """
+        Record a job as already claimed by the caller, in one transaction.
+
+        Unlike enqueue() then claim(), no other claimer (the recovery loop
+        in this or another process) can take the job in between.
+
+        Returns:
+            False if the same job is done, or running under another
+            claimer's live lease; True otherwise, including when the
+            queue is unavailable
+        """
+        def op(conn):
+            now = self._clock()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT key, status, lease_until FROM jobs WHERE token_hash = ?', (token_hash,)
+                ).fetchone()
+                if row is not None and row['key'] == key and row['status'] != FAILED:
+                    if row['status'] == DONE or (row['status'] == RUNNING and row['lease_until'] >= now):
+                        conn.execute('COMMIT')
+                        return False
+                    conn.execute(
+                        'UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE token_hash = ?',
+                        (RUNNING, now + self.lease, now, token_hash)
+                    )
+                else:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO jobs (token_hash, key, payload, status, attempts, lease_until, created_at, updated_at) '
+                        'VALUES (?, ?, ?, ?, 1, ?, ?, ?)',
+                        (token_hash, key, json.dumps(payload), RUNNING, now + self.lease, now, now)
+                    )
+                conn.execute('COMMIT')
+                return True
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return self._safely('enqueue_claimed', op, True)
+
+    def claim(self, token_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest claimable job (or the given session's).
+
+        Returns:
+            {'token_hash', 'key', 'payload', 'attempts'} or None
+        """
+        def op(conn):
+            now = self._clock()
+            query = (
+                'SELECT token_hash, key, payload, attempts FROM jobs '
+                'WHERE (status = ? OR (status = ? AND lease_until < ?)) AND attempts < ?'
+            )
+            params = [PENDING, RUNNING, now, self.max_attempts]
+            if token_hash is not None:
+                query += ' AND token_hash = ?'
+                params.append(token_hash)
+            query += ' ORDER BY created_at LIMIT 1'
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(query, params).fetchone()
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+                conn.execute(
+                    'UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE token_hash = ?',
+                    (RUNNING, now + self.lease, now, row['token_hash'])
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            return {
+                'token_hash': row['token_hash'],
+                'key': row['key'],
+                'payload': json.loads(row['payload']) if row['payload'] else {},
+                'attempts': row['attempts'] + 1
+            }
+        return self._safely('claim', op)
+
+    def complete(self, token_hash: str, key: str, result: Dict[str, Any]) -> bool:
+        """Store the result and drop the job inputs"""
+        def op(conn):
+            cur = conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, payload = NULL, updated_at = ? WHERE token_hash = ? AND key = ?',
+                (DONE, json.dumps(result), self._clock(), token_hash, key)
+            )
+            return cur.rowcount > 0
+        return self._safely('complete', op, False)
+
+    def fail(self, token_hash: str, key: str) -> bool:
+        """Release a claimed job for retry, or mark it failed once out of attempts"""
+        def op(conn):
+            cur = conn.execute(
+                'UPDATE jobs SET status = CASE WHEN attempts < ? THEN ? ELSE ? END, lease_until = 0, updated_at = ? '
+                'WHERE token_hash = ? AND key = ? AND status = ?',
+                (self.max_attempts, PENDING, FAILED, self._clock(), token_hash, key, RUNNING)
+            )
+            return cur.rowcount > 0
+        return self._safely('fail', op, False)
+
+    def delete(self, token_hash: str, key: Optional[str] = None) -> bool:
+        def op(conn):
+            if key is None:
+                cur = conn.execute('DELETE FROM jobs WHERE token_hash = ?', (token_hash,))
+            else:
+                cur = conn.execute('DELETE FROM jobs WHERE token_hash = ? AND key = ?', (token_hash, key))
+            return cur.rowcount > 0
+        return self._safely('delete', op, False)
+
+    def status(self, token_hash: str) -> Optional[str]:
+        def op(conn):
+            row = conn.execute('SELECT status FROM jobs WHERE token_hash = ?', (token_hash,)).fetchone()
+            return row['status'] if row else None
+        return self._safely('status', op)
+
+    def result(self, token_hash: str) -> Optional[Dict[str, Any]]:
+        """The stored prediction record for a completed job"""
+        def op(conn):
+            row = conn.execute(
+                'SELECT result FROM jobs WHERE token_hash = ? AND status = ? AND updated_at >= ?',
+                (token_hash, DONE, self._clock() - self.ttl)
+            ).fetchone()
+            return json.loads(row['result']) if row and row['result'] else None
+        return self._safely('result', op)
+
+    def purge(self) -> int:
+        """Delete every job last updated more than ttl seconds ago"""
+        def op(conn):
+            cur = conn.execute('DELETE FROM jobs WHERE updated_at < ?', (self._clock() - self.ttl,))
+            return cur.rowcount
+        removed = self._safely('purge', op, 0)
+        if removed:
+            logger.info(f"Purged {removed} expired prediction jobs")
+        return removed
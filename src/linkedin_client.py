@@ -4,7 +4,8 @@ Handles all interactions with LinkedIn API including people search and profile d
 """
 import requests
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 from .auth import LinkedInAuth
 from .exceptions import SearchError, DataRetrievalError, RateLimitError
@@ -32,6 +33,41 @@ class LinkedInClient:
         self.auth = auth
         self.rate_limiter = RateLimiter()
         self.validator = InputValidator()
+        
+        # Persistent pooled session so repeat calls reuse a warm TLS connection
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'X-Restli-Protocol-Version': '2.0.0'
+        })
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        
+        # Operation -> index of the endpoint variant that last succeeded
+        self._endpoint_memo: Dict[str, int] = {}
+    
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+    
+    def _endpoint_order(self, operation: str, endpoints: List[str]) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (index, endpoint) with the last successful variant first.
+        
+        Args:
+            operation: Memo key for this family of endpoint spellings
+            endpoints: Candidate endpoints in default order
+        """
+        preferred = self._endpoint_memo.get(operation)
+        if preferred is not None and preferred < len(endpoints):
+            yield preferred, endpoints[preferred]
+        for index, endpoint in enumerate(endpoints):
+            if index != preferred:
+                yield index, endpoint
+    
+    def _remember_endpoint(self, operation: str, index: int):
+        if self._endpoint_memo.get(operation) != index:
+            logger.debug(f"Remembering endpoint variant {index} for {operation}")
+            self._endpoint_memo[operation] = index
     
     def _make_request(
         self,
@@ -57,26 +93,20 @@ class LinkedInClient:
             DataRetrievalError: If request fails
         """
         # Check and record rate limit
-        if not self.rate_limiter.check_limit():
+        if not self.rate_limiter.acquire():
             raise RateLimitError("Rate limit exceeded. Please wait before making more requests.")
         
-        self.rate_limiter.record_call()
-        
         # Get access token
         token = self.auth.get_access_token()
         
         # Prepare request
         url = f"{self.API_BASE}/{endpoint.lstrip('/')}"
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json',
-            'X-Restli-Protocol-Version': '2.0.0'
-        }
+        headers = {'Authorization': f'Bearer {token}'}
         
         try:
             logger.info(f"Making {method} request to {endpoint}")
             
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -163,21 +193,22 @@ class LinkedInClient:
             ]
             
             results = []
-            for endpoint in endpoints:
+            for index, endpoint in self._endpoint_order('search', endpoints):
                 try:
                     logger.info(f"Trying endpoint: {endpoint}")
                     response = self._make_request('GET', endpoint, params=params)
                     
                     # Extract results from response
-                    if 'elements' in response:
+                    if isinstance(response, list):
+                        results = response
+                    elif 'elements' in response:
                         results = response['elements']
-                        break
                     elif 'people' in response:
                         results = response['people']
-                        break
-                    elif isinstance(response, list):
-                        results = response
-                        break
+                    else:
+                        continue
+                    self._remember_endpoint('search', index)
+                    break
                         
                 except DataRetrievalError as e:
                     logger.debug(f"{endpoint} failed: {str(e)}")
@@ -251,21 +282,24 @@ class LinkedInClient:
                 f'people/{person_id}?projection=(education)',
             ]
             
-            for endpoint in endpoints:
+            for index, endpoint in self._endpoint_order('education', endpoints):
                 try:
                     logger.debug(f"Trying education endpoint: {endpoint}")
                     education = self._make_request('GET', endpoint)
                     
                     # Handle different response structures
-                    if 'elements' in education:
+                    if isinstance(education, list):
+                        logger.info(f"Retrieved {len(education)} education entries for {person_id}")
+                        self._remember_endpoint('education', index)
+                        return education
+                    elif 'elements' in education:
                         logger.info(f"Retrieved {len(education['elements'])} education entries for {person_id}")
+                        self._remember_endpoint('education', index)
                         return education['elements']
                     elif 'education' in education:
                         logger.info(f"Retrieved education data for {person_id}")
+                        self._remember_endpoint('education', index)
                         return education['education'] if isinstance(education['education'], list) else [education['education']]
-                    elif isinstance(education, list):
-                        logger.info(f"Retrieved {len(education)} education entries for {person_id}")
-                        return education
                         
                 except DataRetrievalError as e:
                     logger.debug(f"Endpoint {endpoint} failed: {str(e)}")
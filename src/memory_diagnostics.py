@@ -0,0 +1,131 @@
+"""
+Memory Diagnostics
+tracemalloc snapshot diffs plus sizes of the app's long-lived structures,
+for finding leaks (e.g. in the background-prediction path).
+"""
+import re
+import threading
+import tracemalloc
+import logging
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Frames from these files are allocator noise, not app allocation sites
+IGNORED_FILES = ('<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>', tracemalloc.__file__)
+
+
+class MemoryDiagnostics:
+    """
+    Each report() diffs a new tracemalloc snapshot against the previous
+    one (the baseline), so calling it twice some minutes apart shows
+    what grew in between. Tracing starts on the first report unless
+    MEMORY_TRACING started it with the process.
+
+    Tracing slows every allocation, so tracing started by a report stops
+    by itself after window seconds (MEMORY_TRACING_WINDOW_SECONDS), and
+    stop() ends it at once. A later report starts a new window.
+    """
+
+    def __init__(self, frames: int = 1, window: Optional[float] = None):
+        self.frames = frames
+        self.window = window if window is not None else config.memory_tracing_window
+        self._lock = threading.Lock()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._structures: Dict[str, Callable[[], Any]] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    def register(self, name: str, size_fn: Callable[[], Any]):
+        """Report size_fn() under name in every report"""
+        self._structures[name] = size_fn
+
+    def start(self, window: Optional[float] = None):
+        """Start tracing, stopping after window seconds if given"""
+        with self._lock:
+            if tracemalloc.is_tracing():
+                return
+            tracemalloc.start(self.frames)
+            if window:
+                self._timer = threading.Timer(window, self.stop)
+                self._timer.daemon = True
+                self._timer.start()
+        logger.warning("tracemalloc started; allocations are now traced" + (f" for {window:.0f}s" if window else ""))
+
+    def stop(self):
+        """Stop tracing and drop the baseline"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._baseline = None
+            if not tracemalloc.is_tracing():
+                return
+            tracemalloc.stop()
+        logger.warning("tracemalloc stopped")
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, name) for name in IGNORED_FILES]
+        )
+
+    def top_growth(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Largest allocation sites by growth since the last call"""
+        self.start(self.window)
+        snapshot = self._snapshot()
+        with self._lock:
+            baseline, self._baseline = self._baseline, snapshot
+        if baseline is None:
+            stats = snapshot.statistics('lineno')[:limit]
+            return [self._site(stat, stat.size, stat.count) for stat in stats]
+        stats = snapshot.compare_to(baseline, 'lineno')[:limit]
+        return [self._site(stat, stat.size_diff, stat.count_diff) for stat in stats]
+
+    @staticmethod
+    def _site(stat, size_diff: int, count_diff: int) -> Dict[str, Any]:
+        frame = stat.traceback[0]
+        return {
+            'site': f"{frame.filename}:{frame.lineno}",
+            'size_diff': size_diff,
+            'count_diff': count_diff,
+            'size': stat.size,
+            'count': stat.count
+        }
+
+    def structures(self) -> Dict[str, Any]:
+        sizes = {}
+        for name, size_fn in self._structures.items():
+            try:
+                sizes[name] = size_fn()
+            except Exception as e:
+                sizes[name] = f"error: {e}"
+        return sizes
+
+    @staticmethod
+    def threads() -> Dict[str, Any]:
+        names = Counter(re.sub(r'-\d+', '', thread.name) for thread in threading.enumerate())
+        return {'count': threading.active_count(), 'by_name': dict(names.most_common())}
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        had_baseline = self._baseline is not None and tracemalloc.is_tracing()
+        top = self.top_growth(limit)
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'traced_current': current,
+            'traced_peak': peak,
+            # Without a baseline, 'top' is the largest sites rather than growth
+            'diff': had_baseline,
+            'top': top,
+            'structures': self.structures(),
+            'threads': self.threads()
+        }
+
+    def reset(self):
+        with self._lock:
+            self._baseline = None
+
+
+diagnostics = MemoryDiagnostics()
+if config.memory_tracing:
+    diagnostics.start()
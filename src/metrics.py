@@ -0,0 +1,80 @@
+"""
+Metrics
+In-process counters and timing samples for the prediction pipeline.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, Any, Optional
+
+
+class Metrics:
+    """
+    Thread-safe counters and bounded timing windows.
+    
+    Timings keep only the most recent samples per name so memory stays
+    flat no matter how long the process runs. Samples are timestamped so
+    a percentile can be limited to the last few minutes.
+    """
+    
+    MAX_SAMPLES = 1000
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._timings: Dict[str, deque] = {}
+    
+    def incr(self, name: str, value: int = 1):
+        """Increment a counter"""
+        with self._lock:
+            self._counters[name] += value
+    
+    def observe(self, name: str, seconds: float):
+        """Record a timing sample in seconds"""
+        with self._lock:
+            samples = self._timings.get(name)
+            if samples is None:
+                samples = self._timings[name] = deque(maxlen=self.MAX_SAMPLES)
+            samples.append((self._clock(), seconds))
+    
+    def count(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+    
+    def percentile(self, name: str, pct: float, window: Optional[float] = None) -> Optional[float]:
+        """
+        Return the pct-th percentile of recent samples, or None if empty.
+        With window, only samples from the last window seconds count.
+        """
+        cutoff = self._clock() - window if window is not None else None
+        with self._lock:
+            samples = sorted(
+                seconds for observed, seconds in self._timings.get(name, ())
+                if cutoff is None or observed >= cutoff
+            )
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus p50/p95 for each timing"""
+        with self._lock:
+            counters = dict(self._counters)
+            names = list(self._timings)
+        timings = {}
+        for name in names:
+            timings[name] = {
+                'p50': self.percentile(name, 50),
+                'p95': self.percentile(name, 95),
+            }
+        return {'counters': counters, 'timings': timings}
+    
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+metrics = Metrics()
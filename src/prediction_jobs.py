@@ -0,0 +1,196 @@
+"""
+Prediction Jobs
+Background prediction threads keyed by session token hash, cancellable
+when the session is abandoned, goes idle or expires.
+"""
+import time
+import threading
+import logging
+from typing import Callable, Dict, Optional
+from .cancellation import CancelToken
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionJob:
+    """A running prediction and its cancel token."""
+
+    def __init__(self, token_hash: str, now: float, key: Optional[str] = None):
+        self.token_hash = token_hash
+        self.key = key
+        self.cancel_token = CancelToken()
+        self.started_at = now
+        self.last_activity = now
+        # Page open but hidden: not idle until the next touch or leave
+        self.held = False
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token.cancelled
+
+    def cancel(self, reason: str) -> bool:
+        return self.cancel_token.cancel(reason)
+
+
+class PredictionJobs:
+    """
+    Registry of in-flight prediction jobs.
+
+    Jobs are cancelled when:
+    - the user explicitly abandons the flow (cancel)
+    - the user's page went away and nothing replaced it (leave)
+    - no page activity has been seen for idle_timeout seconds, unless
+      the page reported itself hidden (hold): a background tab sends no
+      heartbeats but is still open
+    - the job outlives max_age
+
+    A daemon reaper thread enforces the time-based rules.
+
+    At most one job runs per session (single-flight): starting a job for
+    a session that already has one pending reuses it when the inputs key
+    matches, and cancels and replaces it when they differ.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: Optional[float] = None,
+        max_age: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.idle_timeout = idle_timeout if idle_timeout is not None else config.prediction_idle_timeout
+        self.max_age = max_age if max_age is not None else 24 * 3600
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, PredictionJob] = {}
+        self._reaper: Optional[threading.Thread] = None
+
+    def start(
+        self,
+        token_hash: str,
+        target: Callable[[CancelToken], None],
+        key: Optional[str] = None
+    ) -> PredictionJob:
+        """
+        Run target(cancel_token) in a daemon thread tracked under token_hash.
+
+        Args:
+            token_hash: Session the job belongs to
+            target: Job body; should stop early once the token is cancelled
+            key: Fingerprint of the job inputs, used for single-flight
+
+        Returns:
+            The new job, or the pending one it was deduplicated against
+        """
+        job = PredictionJob(token_hash, self._clock(), key)
+
+        def run():
+            try:
+                target(job.cancel_token)
+            finally:
+                self._finish(job)
+
+        with self._lock:
+            existing = self._jobs.get(token_hash)
+            if existing is not None and not existing.cancelled and key is not None and existing.key == key:
+                existing.last_activity = job.started_at
+                metrics.incr('prediction_jobs.deduplicated')
+                logger.info(f"Reusing pending prediction for {token_hash}")
+                return existing
+            self._jobs[token_hash] = job
+
+        if existing is not None and existing.cancel('superseded'):
+            metrics.incr('prediction_jobs.superseded')
+            logger.info(f"Superseded pending prediction for {token_hash}")
+        metrics.incr('prediction_jobs.started')
+        job.thread = threading.Thread(target=run, daemon=True)
+        job.thread.start()
+        self._ensure_reaper()
+        return job
+
+    def _finish(self, job: PredictionJob):
+        with self._lock:
+            if self._jobs.get(job.token_hash) is job:
+                del self._jobs[job.token_hash]
+
+    def get(self, token_hash: str) -> Optional[PredictionJob]:
+        with self._lock:
+            return self._jobs.get(token_hash)
+
+    def touch(self, token_hash: str):
+        """Record user activity for the session's job, if any"""
+        with self._lock:
+            job = self._jobs.get(token_hash)
+            if job is not None:
+                job.last_activity = self._clock()
+                job.held = False
+
+    def hold(self, token_hash: str):
+        """
+        The session's page was hidden (another tab, a minimised window).
+        Its job is not reaped as idle until a touch or leave; max_age
+        still applies.
+        """
+        with self._lock:
+            job = self._jobs.get(token_hash)
+            if job is not None:
+                job.held = True
+
+    def leave(self, token_hash: str, grace: float):
+        """
+        The session's page was closed or navigated away from. Its job goes
+        idle after grace seconds unless a touch (the next page, or a reload)
+        comes first.
+        """
+        with self._lock:
+            job = self._jobs.get(token_hash)
+            if job is not None:
+                job.last_activity = min(job.last_activity, self._clock() - self.idle_timeout + grace)
+                job.held = False
+
+    def cancel(self, token_hash: str, reason: str = 'abandoned') -> bool:
+        with self._lock:
+            job = self._jobs.pop(token_hash, None)
+        if job is None or not job.cancel(reason):
+            return False
+        metrics.incr(f'prediction_jobs.cancelled.{reason}')
+        logger.info(f"Cancelled prediction {token_hash}: {reason}")
+        return True
+
+    def reap(self) -> int:
+        """Cancel idle and expired jobs; returns how many were cancelled"""
+        now = self._clock()
+        stale = []
+        with self._lock:
+            for token_hash, job in self._jobs.items():
+                if now - job.started_at >= self.max_age:
+                    stale.append((token_hash, 'expired'))
+                elif not job.held and now - job.last_activity >= self.idle_timeout:
+                    stale.append((token_hash, 'idle'))
+        return sum(1 for token_hash, reason in stale if self.cancel(token_hash, reason))
+
+    def active_count(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def _ensure_reaper(self):
+        with self._lock:
+            if self._reaper is not None:
+                return
+            reaper = self._reaper = threading.Thread(target=self._reap_forever, daemon=True)
+        reaper.start()
+
+    def _reap_forever(self):
+        interval = max(1.0, min(self.idle_timeout / 4, 30.0))
+        while True:
+            time.sleep(interval)
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Prediction reaper error: {e}", exc_info=True)
+            with self._lock:
+                if not self._jobs:
+                    self._reaper = None
+                    return
@@ -0,0 +1,104 @@
+"""
+Prediction Record
+Compact per-session prediction kept in the web app's cache.
+"""
+import os
+import logging
+from typing import Dict, Any, Optional
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+RAW_SPILL_DIR = os.path.join('logs', 'predictions')
+
+
+class PredictionRecord:
+    """
+    Only the fields reveal.html renders.
+
+    The searcher's full result also carries the model's raw final text,
+    degree/field/career guesses and sources; none of that is shown, so it
+    is dropped here. With PREDICTION_DEBUG on, the raw text is written to
+    logs/predictions/ and only its path is kept.
+
+    A provisional record is the instant location-based guess stored at
+    signup; it is replaced once the model answers. tier records which
+    request profile (full / reduced / location_only) produced the answer.
+    key is the fingerprint of the inputs it was made from, so an answer
+    for superseded inputs can be told apart and dropped.
+    """
+
+    __slots__ = ('college', 'found', 'confidence', 'reasoning', 'error', 'provisional', 'tier', 'raw_path', 'key')
+
+    MAX_REASONING = 500
+
+    def __init__(
+        self,
+        college: Optional[str] = None,
+        found: bool = False,
+        confidence: int = 0,
+        reasoning: Optional[str] = None,
+        error: Optional[str] = None,
+        provisional: bool = False,
+        tier: Optional[str] = None,
+        raw_path: Optional[str] = None,
+        key: Optional[str] = None
+    ):
+        self.college = college
+        self.found = found
+        self.confidence = confidence
+        self.reasoning = reasoning
+        self.error = error
+        self.provisional = provisional
+        self.tier = tier
+        self.raw_path = raw_path
+        self.key = key
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any], token_hash: Optional[str] = None,
+                    key: Optional[str] = None) -> 'PredictionRecord':
+        """Build a record from a ClaudeSearcher result dict"""
+        reasoning = result.get('reasoning') or None
+        if reasoning and len(reasoning) > cls.MAX_REASONING:
+            reasoning = reasoning[:cls.MAX_REASONING].rstrip() + '...'
+
+        raw_path = None
+        raw = result.get('raw_response')
+        if raw and token_hash and config.prediction_debug:
+            raw_path = spill_raw_response(token_hash, raw)
+
+        try:
+            confidence = int(result.get('confidence') or 0)
+        except (TypeError, ValueError):
+            confidence = 0
+
+        return cls(
+            college=result.get('college'),
+            found=bool(result.get('found')),
+            confidence=confidence,
+            reasoning=reasoning,
+            error=result.get('error'),
+            provisional=bool(result.get('provisional')),
+            tier=result.get('tier'),
+            raw_path=raw_path,
+            key=key
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"PredictionRecord(college={self.college!r}, confidence={self.confidence}, error={self.error!r})"
+
+
+def spill_raw_response(token_hash: str, text: str) -> Optional[str]:
+    """Write raw model text to disk for debugging; returns the path"""
+    try:
+        os.makedirs(RAW_SPILL_DIR, exist_ok=True)
+        path = os.path.join(RAW_SPILL_DIR, f"{token_hash}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+    except OSError as e:
+        logger.warning(f"Could not spill raw response: {e}")
+        return None
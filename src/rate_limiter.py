@@ -3,6 +3,7 @@ Rate Limiter
 Implements rate limiting to prevent excessive API calls and control costs.
 CRITICAL: Prevents infinite loops and runaway costs with paid services.
 """
+import threading
 import time
 from collections import deque
 from datetime import datetime, timedelta
@@ -31,6 +32,9 @@ class RateLimiter:
         self.minute_calls = deque()
         self.hour_calls = deque()
         
+        # Shared by threads (web requests, background predictions)
+        self._lock = threading.RLock()
+        
         logger.info(
             f"Rate limiter initialized: "
             f"{self.max_per_minute}/min, {self.max_per_hour}/hour"
@@ -57,10 +61,10 @@ class RateLimiter:
         Returns:
             True if under limit, False if limit would be exceeded
         """
-        self._clean_old_calls()
-        
-        minute_count = len(self.minute_calls)
-        hour_count = len(self.hour_calls)
+        with self._lock:
+            self._clean_old_calls()
+            minute_count = len(self.minute_calls)
+            hour_count = len(self.hour_calls)
         
         if minute_count >= self.max_per_minute:
             logger.warning(
@@ -78,37 +82,59 @@ class RateLimiter:
     
     def record_call(self):
         """Record an API call for rate limiting"""
-        now = datetime.now()
-        self.minute_calls.append(now)
-        self.hour_calls.append(now)
+        with self._lock:
+            now = datetime.now()
+            self.minute_calls.append(now)
+            self.hour_calls.append(now)
+            minute_count = len(self.minute_calls)
+            hour_count = len(self.hour_calls)
         
         # Log every 10th call to track usage
-        if len(self.hour_calls) % 10 == 0:
+        if hour_count % 10 == 0:
             logger.info(
-                f"API usage: {len(self.minute_calls)} in last minute, "
-                f"{len(self.hour_calls)} in last hour"
+                f"API usage: {minute_count} in last minute, "
+                f"{hour_count} in last hour"
             )
     
+    def acquire(self) -> bool:
+        """
+        Check the limits and record the call in one step.
+        
+        check_limit() followed by record_call() lets concurrent callers
+        all pass the check before any of them records, overshooting the
+        limit; use this wherever more than one thread shares a limiter.
+        
+        Returns:
+            True if the call was recorded, False if the limit was reached
+        """
+        with self._lock:
+            if not self.check_limit():
+                return False
+            self.record_call()
+            return True
+    
     def wait_if_needed(self):
         """
         Block and wait if rate limit would be exceeded.
         Returns immediately if under limit.
         """
-        self._clean_old_calls()
-        
-        minute_count = len(self.minute_calls)
-        hour_count = len(self.hour_calls)
+        with self._lock:
+            self._clean_old_calls()
+            minute_count = len(self.minute_calls)
+            hour_count = len(self.hour_calls)
+            oldest_minute = self.minute_calls[0] if self.minute_calls else None
+            oldest_hour = self.hour_calls[0] if self.hour_calls else None
         
         if minute_count >= self.max_per_minute:
             # Calculate wait time until oldest call expires
-            wait_until = self.minute_calls[0] + timedelta(minutes=1)
+            wait_until = oldest_minute + timedelta(minutes=1)
             wait_seconds = (wait_until - datetime.now()).total_seconds()
             if wait_seconds > 0:
                 logger.info(f"Rate limit reached, waiting {wait_seconds:.1f} seconds...")
                 time.sleep(wait_seconds + 0.1)  # Small buffer
         
         elif hour_count >= self.max_per_hour:
-            wait_until = self.hour_calls[0] + timedelta(hours=1)
+            wait_until = oldest_hour + timedelta(hours=1)
             wait_seconds = (wait_until - datetime.now()).total_seconds()
             if wait_seconds > 0:
                 logger.info(f"Hourly limit reached, waiting {wait_seconds:.1f} seconds...")
@@ -116,13 +142,16 @@ class RateLimiter:
     
     def get_stats(self) -> dict:
         """Get current rate limit statistics"""
-        self._clean_old_calls()
+        with self._lock:
+            self._clean_old_calls()
+            minute_count = len(self.minute_calls)
+            hour_count = len(self.hour_calls)
         return {
-            'calls_last_minute': len(self.minute_calls),
-            'calls_last_hour': len(self.hour_calls),
+            'calls_last_minute': minute_count,
+            'calls_last_hour': hour_count,
             'limit_per_minute': self.max_per_minute,
             'limit_per_hour': self.max_per_hour,
-            'remaining_minute': self.max_per_minute - len(self.minute_calls),
-            'remaining_hour': self.max_per_hour - len(self.hour_calls)
+            'remaining_minute': self.max_per_minute - minute_count,
+            'remaining_hour': self.max_per_hour - hour_count
         }
 
@@ -0,0 +1,179 @@
+"""
+Request Profiler
+Opt-in profiling of single requests, for finding out why a route is slow.
+
+A request is profiled when PROFILING_ENABLED is on, it carries a valid
+X-Admin-Token, and it asks for it with an X-Profile header or a
+?__profile= query flag:
+
+    cprofile (default)  cProfile stats, logs/profiles/<name>.prof
+                        (view with snakeviz or pstats)
+    sample              stack samples in collapsed format,
+                        logs/profiles/<name>.folded (flamegraph.pl, speedscope)
+
+The result's file name is returned in the X-Profile-File header.
+"""
+import cProfile
+import glob
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qs
+from .admin import ENVIRON_KEY, check_admin_token
+from .admission import SlidingWindowLimiter
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.path.join('logs', 'profiles')
+MODES = ('cprofile', 'sample')
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer, counting collapsed stacks"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """
+    WSGI middleware; only installed when profiling is enabled.
+
+    Capped to one profiled request at a time, PROFILE_MAX_PER_HOUR
+    profiles per hour and PROFILE_MAX_FILES files on disk (oldest
+    removed). Requests that are over the cap run unprofiled.
+    """
+
+    def __init__(self, wsgi_app, directory: Optional[str] = None):
+        self.wsgi_app = wsgi_app
+        self.directory = directory or PROFILE_DIR
+        self.max_files = config.profile_max_files
+        self.sample_interval = config.profile_sample_interval
+        self._slot = threading.Semaphore(1)
+        self._limiter = SlidingWindowLimiter('profiler', config.profile_max_per_hour, 3600, max_keys=1)
+
+    def requested_mode(self, environ) -> Optional[str]:
+        mode = environ.get('HTTP_X_PROFILE')
+        if mode is None:
+            values = parse_qs(environ.get('QUERY_STRING', '')).get('__profile')
+            if values is None:
+                return None
+            mode = values[0]
+        mode = mode.strip().lower()
+        return mode if mode in MODES else MODES[0]
+
+    def __call__(self, environ, start_response):
+        mode = self.requested_mode(environ)
+        if mode is None:
+            return self.wsgi_app(environ, start_response)
+        if not check_admin_token(environ.get(ENVIRON_KEY)):
+            metrics.incr('profiler.denied')
+            return self.wsgi_app(environ, start_response)
+        if not self._slot.acquire(blocking=False):
+            metrics.incr('profiler.busy')
+            return self.wsgi_app(environ, start_response)
+        try:
+            if self._limiter.acquire('all') is not None:
+                metrics.incr('profiler.capped')
+                return self.wsgi_app(environ, start_response)
+            return self._profile(mode, environ, start_response)
+        finally:
+            self._slot.release()
+
+    def _file_name(self, environ, mode: str) -> str:
+        path = re.sub(r'[^A-Za-z0-9]+', '_', environ.get('PATH_INFO', '')).strip('_') or 'root'
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        extension = 'prof' if mode == 'cprofile' else 'folded'
+        return f"{stamp}-{environ.get('REQUEST_METHOD', 'GET')}-{path[:60]}.{extension}"
+
+    def _profile(self, mode: str, environ, start_response):
+        name = self._file_name(environ, mode)
+
+        def profiled_start_response(status, headers, exc_info=None):
+            headers.append(('X-Profile-File', name))
+            return start_response(status, headers, exc_info)
+
+        def run():
+            result = self.wsgi_app(environ, profiled_start_response)
+            try:
+                return [b''.join(result)]
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+
+        started = time.perf_counter()
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            body = profiler.runcall(run)
+        else:
+            sampler = StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+            try:
+                body = run()
+            finally:
+                sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            if mode == 'cprofile':
+                profiler.dump_stats(path)
+            else:
+                sampler.write(path)
+            self._prune()
+            metrics.incr('profiler.written')
+            logger.info(f"Profiled {environ.get('PATH_INFO')} in {elapsed * 1000:.1f} ms -> {path}")
+        except OSError as e:
+            logger.error(f"Could not write profile: {e}")
+        return body
+
+    def _prune(self):
+        files = sorted(glob.glob(os.path.join(self.directory, '*.prof')) + glob.glob(os.path.join(self.directory, '*.folded')))
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def init_app(app):
+    """Install the profiler when enabled; otherwise the app is untouched"""
+    if config.profiling_enabled and config.admin_token:
+        app.wsgi_app = RequestProfiler(app.wsgi_app)
+        logger.warning("Per-request profiling is enabled for admin requests")
@@ -0,0 +1,135 @@
+"""
+Resource Hints
+Link headers and cache policy so each step of the funnel
+(/signup -> /game/1 -> /game/2 -> /game/3) is already in the browser
+cache when the user gets there.
+
+- Funnel pages preload their stylesheet and prefetch the next page.
+  /reveal is never prefetched: it waits on the prediction and records
+  the reveal event.
+- Circuit pages preload their stylesheet and script and preconnect to
+  the font CDN.
+- Prefetchable pages are served private, no-cache: the browser may use
+  the prefetched copy for the navigation it was fetched for, but any
+  later visit goes back to the server. These pages render the session
+  token, and /game/1 creates the demo session on GET, so a copy reused
+  after the session changed (or was cleared by /abandon) would be stale.
+- Prefetch requests never write the session cookie, so a prefetch has
+  no side effects even if the user never navigates. A prefetch whose
+  GET would have changed the session is sent no-store, so the browser
+  discards it and the navigation runs the GET for real.
+- Static URLs carry a version query (file mtime and size), so versioned
+  static responses can be cached for a long time without going stale.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+from flask import request, url_for
+from .config import config
+
+# Page endpoint -> endpoint to prefetch after it
+FUNNEL_NEXT = {
+    'signup': 'game1',
+    'game1': 'game2',
+    'game2': 'game3',
+}
+FUNNEL_PAGES = ('signup', 'game1', 'game2', 'game3', 'reveal')
+FUNNEL_ASSETS = [('css/style.css', 'style')]
+
+CIRCUIT_ASSETS = [('circuitweb/styles/styles.css', 'style'), ('circuitweb/scripts/script.js', 'script')]
+CIRCUIT_PAGES = ('terms', 'privacy')
+
+# Stylesheet origin, then the font-file origin (fetched in CORS mode)
+FONT_ORIGINS = [('https://api.fontshare.com', False), ('https://cdn.fontshare.com', True)]
+
+
+def is_prefetch() -> bool:
+    """True for browser prefetches (Sec-Purpose, or the older Purpose header)"""
+    purpose = request.headers.get('Sec-Purpose') or request.headers.get('Purpose') or ''
+    return purpose.startswith('prefetch')
+
+
+def page_hints(endpoint: str) -> List[str]:
+    """Link header entries for an HTML page, in order"""
+    links = []
+    if endpoint in FUNNEL_PAGES:
+        assets = FUNNEL_ASSETS
+    elif endpoint.startswith('circuit_') or endpoint in CIRCUIT_PAGES:
+        assets = CIRCUIT_ASSETS
+        for origin, crossorigin in FONT_ORIGINS:
+            links.append(f"<{origin}>; rel=preconnect" + ('; crossorigin' if crossorigin else ''))
+    else:
+        return links
+    for filename, kind in assets:
+        links.append(f"<{url_for('static', filename=filename)}>; rel=preload; as={kind}")
+    next_page = FUNNEL_NEXT.get(endpoint)
+    if next_page:
+        links.append(f"<{url_for(next_page)}>; rel=prefetch; as=document")
+    return links
+
+
+class PrefetchSessionInterface:
+    """
+    Wraps the app's session interface so prefetch responses carry no
+    Set-Cookie (and are not reusable if they changed the session);
+    anything else is delegated.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def open_session(self, app, request):
+        return self.inner.open_session(app, request)
+
+    def save_session(self, app, session, response):
+        if is_prefetch():
+            if session.modified:
+                # Reusing this response would skip the session change
+                response.headers['Cache-Control'] = 'no-store'
+            return None
+        return self.inner.save_session(app, session, response)
+
+
+def init_app(app):
+    """Install Link headers, funnel page caching and static versioning"""
+    hints: Dict[Tuple[str, str], str] = {}
+    versions: Dict[str, Optional[str]] = {}
+
+    def static_version(filename: str) -> Optional[str]:
+        # Re-stat in debug so edited files get a new URL
+        if app.debug or filename not in versions:
+            try:
+                stat = os.stat(os.path.join(app.static_folder, filename))
+                versions[filename] = f"{int(stat.st_mtime):x}{stat.st_size:x}"
+            except OSError:
+                versions[filename] = None
+        return versions[filename]
+
+    @app.url_defaults
+    def add_static_version(endpoint, values):
+        if endpoint == 'static' and 'v' not in values and values.get('filename'):
+            version = static_version(values['filename'])
+            if version:
+                values['v'] = version
+
+    @app.after_request
+    def add_resource_hints(response):
+        endpoint = request.endpoint or ''
+        if endpoint == 'static':
+            if request.args.get('v') and response.status_code in (200, 304):
+                response.headers['Cache-Control'] = f"public, max-age={config.static_max_age}, immutable"
+            return response
+        if response.status_code != 200 or response.mimetype != 'text/html':
+            return response
+        key = (endpoint, request.script_root)
+        if key not in hints:
+            hints[key] = ', '.join(page_hints(endpoint))
+        if hints[key]:
+            response.headers['Link'] = hints[key]
+        if endpoint in FUNNEL_NEXT.values():
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    app.session_interface = PrefetchSessionInterface(app.session_interface)
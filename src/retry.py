@@ -0,0 +1,116 @@
+"""
+Retry Policy
+Exponential backoff with full jitter, bounded by an overall deadline.
+"""
+import random
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either delta-seconds or an HTTP-date
+
+    Returns:
+        Seconds to wait, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class Deadline:
+    """Monotonic time budget shared by every attempt of one operation."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class RetryPolicy:
+    """
+    Decides whether and how long to wait before the next attempt.
+
+    Delays grow as base * 2^(attempt-1) capped at max_delay, with full
+    jitter so that a burst of failing callers does not retry in lockstep.
+    A server-supplied Retry-After takes precedence over the computed delay.
+    """
+
+    RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504, 529})
+
+    # Don't start an attempt with less than this much budget left
+    MIN_ATTEMPT_SECONDS = 2.0
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ):
+        self.max_attempts = max_attempts if max_attempts is not None else config.model_max_attempts
+        self.base_delay = base_delay if base_delay is not None else config.model_retry_base_delay
+        self.max_delay = max_delay if max_delay is not None else config.model_retry_max_delay
+        self.deadline = deadline if deadline is not None else config.prediction_deadline
+
+    def start(self) -> Deadline:
+        return Deadline(self.deadline)
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        return status_code in self.RETRYABLE_STATUS
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before the attempt following `attempt` (1-based).
+
+        Args:
+            attempt: Number of attempts made so far
+            retry_after: Server-requested delay in seconds, if any
+
+        Returns:
+            Seconds to sleep
+        """
+        if retry_after is not None:
+            return retry_after
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def next_delay(self, attempt: int, deadline: Deadline, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Delay before the next attempt, or None if we should give up.
+
+        Gives up when attempts are exhausted or when sleeping would leave
+        too little of the deadline for a useful attempt.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, retry_after)
+        if deadline.remaining() - delay < self.MIN_ATTEMPT_SECONDS:
+            logger.info(f"Retry budget exhausted after {attempt} attempt(s)")
+            return None
+        return delay
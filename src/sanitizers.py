@@ -0,0 +1,37 @@
+"""
+Sanitizers
+Shared text cleaning for form input (web_app) and API output (InputValidator).
+
+Every character these drop is ASCII, and UTF-8 never uses bytes below
+0x80 inside a multi-byte sequence, so deleting them from the encoded
+bytes gives the same result as deleting them from the str. One
+bytes.translate pass is cheaper than str.replace per character, a
+generator join, or str.translate (which is slower than either on short
+fields and on non-ASCII text). surrogatepass keeps lone surrogates
+round-tripping instead of raising.
+"""
+import re
+
+# Characters dropped from form fields before they reach templates or prompts
+FORM_FIELD_CHARS = b'<>"\'&\\\x00'
+FORM_FIELD_MAX_LENGTH = 200
+
+# Control characters (below space) except newline
+CONTROL_CHARS = bytes(i for i in range(32) if i != ord('\n'))
+
+# Allow letters, spaces, hyphens, apostrophes (for names like O'Brien)
+NAME_PATTERN = re.compile(r"^[a-zA-Z\s\-']+$")
+
+
+def _delete_ascii(text: str, chars: bytes) -> str:
+    return text.encode('utf-8', 'surrogatepass').translate(None, chars).decode('utf-8', 'surrogatepass')
+
+
+def sanitize_form_field(text: str) -> str:
+    """Drop markup/escape characters, strip, and cap at FORM_FIELD_MAX_LENGTH"""
+    return _delete_ascii(text, FORM_FIELD_CHARS).strip()[:FORM_FIELD_MAX_LENGTH]
+
+
+def strip_control_chars(text: str) -> str:
+    """Drop control characters other than newline, then strip"""
+    return _delete_ascii(text, CONTROL_CHARS).strip()
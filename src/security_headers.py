@@ -0,0 +1,83 @@
+"""
+Security Headers
+Headers every response gets, built once at startup and appended to the
+WSGI header list in one step, instead of assigned one by one through
+werkzeug's validating Headers object on every response.
+
+Paths can override the set: static files skip the HTML-only headers
+(frame, XSS and content policies), which do nothing for CSS, JS or images.
+Headers a route sets itself are left alone.
+"""
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+from .config import config
+
+Header = Tuple[str, str]
+
+# Only meaningful on documents
+HTML_ONLY = frozenset({'x-frame-options', 'x-xss-protection', 'content-security-policy'})
+
+
+def build_headers(content_security_policy: str) -> List[Header]:
+    return [
+        ('X-Content-Type-Options', 'nosniff'),
+        ('X-Frame-Options', 'DENY'),
+        ('X-XSS-Protection', '1; mode=block'),
+        ('Content-Security-Policy', content_security_policy),
+    ]
+
+
+class HeaderSet:
+    """Validated headers plus their lower-cased names"""
+
+    __slots__ = ('headers', 'names')
+
+    def __init__(self, headers: Sequence[Header]):
+        for name, value in headers:
+            if '\n' in value or '\r' in value:
+                raise ValueError(f"Header {name} contains a newline")
+        self.headers = tuple(headers)
+        self.names: FrozenSet[str] = frozenset(name.lower() for name, _ in headers)
+
+
+class SecurityHeadersMiddleware:
+    """
+    WSGI middleware appending the header set for the request path.
+    The first matching prefix in `overrides` wins; otherwise `headers`.
+    """
+
+    def __init__(self, wsgi_app, headers: Sequence[Header], overrides: Dict[str, Sequence[Header]] = None):
+        self.wsgi_app = wsgi_app
+        self.default = HeaderSet(headers)
+        self.overrides = [(prefix, HeaderSet(override)) for prefix, override in (overrides or {}).items()]
+
+    def header_set(self, path: str) -> HeaderSet:
+        for prefix, header_set in self.overrides:
+            if path.startswith(prefix):
+                return header_set
+        return self.default
+
+    def apply(self, path: str, response_headers: List[Header]) -> List[Header]:
+        header_set = self.header_set(path)
+        present = {name.lower() for name, _ in response_headers}
+        if present.isdisjoint(header_set.names):
+            response_headers.extend(header_set.headers)
+        else:
+            response_headers.extend(header for header in header_set.headers if header[0].lower() not in present)
+        return response_headers
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+
+        def secured_start_response(status, response_headers, exc_info=None):
+            return start_response(status, self.apply(path, response_headers), exc_info)
+
+        return self.wsgi_app(environ, secured_start_response)
+
+
+def init_app(app) -> SecurityHeadersMiddleware:
+    """Install the middleware; static files get only the non-HTML headers"""
+    headers = build_headers(config.content_security_policy)
+    static_headers = [header for header in headers if header[0].lower() not in HTML_ONLY]
+    middleware = SecurityHeadersMiddleware(app.wsgi_app, headers, {f"{app.static_url_path}/": static_headers})
+    app.wsgi_app = middleware
+    return middleware
@@ -0,0 +1,128 @@
+"""
+Server Timing
+Request-scoped timer whose spans are reported in the Server-Timing
+response header (visible in browser devtools).
+
+Any module can time work with span('name') or add_span('name', seconds);
+both are no-ops outside a timed request, e.g. in background threads.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from flask.sessions import SecureCookieSessionInterface
+
+# Extra (name, seconds) spans measured before the WSGI app runs, e.g. by the ASGI layer
+ENVIRON_SPANS = 'server_timing.spans'
+
+
+class RequestTimer:
+    """Accumulated span durations for one request"""
+
+    __slots__ = ('started', 'spans', '_open')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self._open: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def start(self, name: str):
+        self._open[name] = time.perf_counter()
+
+    def stop(self, name: str):
+        started = self._open.pop(name, None)
+        if started is not None:
+            self.add(name, time.perf_counter() - started)
+
+    def header(self) -> str:
+        total = time.perf_counter() - self.started
+        parts = [f"total;dur={total * 1000:.2f}"]
+        parts.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items())
+        return ', '.join(parts)
+
+
+_current: ContextVar[Optional[RequestTimer]] = ContextVar('request_timer', default=None)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current.get()
+
+
+def add_span(name: str, seconds: float):
+    timer = _current.get()
+    if timer is not None:
+        timer.add(name, seconds)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """
+    WSGI middleware that opens a RequestTimer around the app and appends
+    the Server-Timing header when the response starts, after the handler,
+    template rendering and session save have all run.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        timer = RequestTimer()
+        for name, seconds in environ.get(ENVIRON_SPANS, ()):
+            timer.add(name, seconds)
+        token = _current.set(timer)
+
+        def timed_start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+            headers.append(('Server-Timing', timer.header()))
+            return start_response(status, headers, exc_info)
+
+        try:
+            return self.wsgi_app(environ, timed_start_response)
+        finally:
+            _current.reset(token)
+
+
+class TimedSessionInterface(SecureCookieSessionInterface):
+    """Signed-cookie sessions with load/save reported as spans"""
+
+    def open_session(self, app, request):
+        with span('session-load'):
+            return super().open_session(app, request)
+
+    def save_session(self, app, session, response):
+        with span('session-save'):
+            return super().save_session(app, session, response)
+
+
+def init_app(app):
+    """Install the middleware, session timing and template render spans"""
+    from flask import before_render_template, template_rendered
+
+    def render_started(sender, template, context, **extra):
+        timer = _current.get()
+        if timer is not None:
+            timer.start('render')
+
+    def render_finished(sender, template, context, **extra):
+        timer = _current.get()
+        if timer is not None:
+            timer.stop('render')
+
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
+    app.session_interface = TimedSessionInterface()
+    app.wsgi_app = ServerTimingMiddleware(app.wsgi_app)
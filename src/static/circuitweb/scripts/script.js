@@ -2,17 +2,12 @@
 
 // API Configuration
 const API_CONFIG = {
-    // Use the working API at vdp-peach.vercel.app
-    baseUrl: 'https://vdp-peach.vercel.app/api',
-    
-    // Your API token
-    token: '3a9a704ebb4540ee1f948caa7fc801b33db26de4631d3bb2b5073ce2b6cb7cea',
+    // Same-origin proxy; the server holds the analysis API token
+    baseUrl: '/api',
     
     // Common headers for all API requests
     getHeaders: function(isFormData = false) {
-        const headers = {
-            'Authorization': `Bearer ${this.token}`
-        };
+        const headers = {};
         
         if (!isFormData) {
             headers['Content-Type'] = 'application/json';
@@ -59,10 +54,7 @@ async function makeAPIRequest(endpoint, options = {}) {
 async function analyzeTextDirect(text) {
     const response = await fetch(`${API_CONFIG.baseUrl}/analyze-text`, {
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${API_CONFIG.token}`
-        },
+        headers: API_CONFIG.getHeaders(),
         body: JSON.stringify({ text })
     });
     
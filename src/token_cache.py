@@ -0,0 +1,112 @@
+"""
+Token Cache
+Encrypted on-disk storage for OAuth tokens so CLI runs can reuse them.
+SECURITY: Tokens are encrypted with Fernet and the file is owner-only.
+"""
+import base64
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from .config import config
+from .exceptions import AuthenticationError
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    Fernet-encrypted JSON token file with an advisory lock for
+    coordinating concurrent CLI processes.
+
+    The key comes from TOKEN_CACHE_KEY when set, otherwise it is derived
+    from the LinkedIn client secret with HKDF. With neither configured
+    there is no key, and construction raises AuthenticationError.
+    """
+
+    INFO = b'linkedin-token-cache-v1'
+
+    def __init__(self, path: Optional[str] = None, secret: Optional[str] = None):
+        self.path = path or config.token_cache_path
+        self.lock_path = f"{self.path}.lock"
+        if secret is None:
+            secret = config.token_cache_key or getattr(config, 'client_secret', None)
+        if not secret:
+            raise AuthenticationError("No token cache key: set TOKEN_CACHE_KEY or LINKEDIN_CLIENT_SECRET")
+        self._fernet = Fernet(self._derive_key(secret))
+
+    @classmethod
+    def _derive_key(cls, secret: str) -> bytes:
+        hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=cls.INFO)
+        return base64.urlsafe_b64encode(hkdf.derive(secret.encode()))
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read and decrypt the cached token.
+
+        Returns:
+            Token data, or None if missing, unreadable or not decryptable
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                blob = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read token cache: {e}")
+            return None
+
+        try:
+            return json.loads(self._fernet.decrypt(blob))
+        except (InvalidToken, ValueError):
+            logger.warning("Token cache could not be decrypted; ignoring it")
+            return None
+
+    def save(self, data: Dict[str, Any]):
+        """Encrypt and atomically replace the cache file (mode 0600)"""
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        blob = self._fernet.encrypt(json.dumps(data).encode())
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.token-')
+        try:
+            os.chmod(tmp_path, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Exclusive lock across processes (no-op where fcntl is unavailable)"""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(self.lock_path) or '.', mode=0o700, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
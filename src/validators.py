@@ -3,10 +3,10 @@ Input Validation
 Validates and sanitizes all user inputs to prevent injection attacks.
 SECURITY PRINCIPLE: Never trust user input.
 """
-import re
 import logging
 from typing import Optional
 from .exceptions import ValidationError
+from .sanitizers import NAME_PATTERN, strip_control_chars
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,7 @@ class InputValidator:
     """
     
     # Allow letters, spaces, hyphens, apostrophes (for names like O'Brien)
-    NAME_PATTERN = re.compile(r"^[a-zA-Z\s\-']+$")
+    NAME_PATTERN = NAME_PATTERN
     
     # Age should be reasonable (13-120)
     MIN_AGE = 13
@@ -117,9 +117,7 @@ class InputValidator:
             return ""
         
         # Remove any control characters
-        text = ''.join(char for char in text if ord(char) >= 32 or char == '\n')
-        
-        return text.strip()
+        return strip_control_chars(text)
     
     @staticmethod
     def validate_search_limit(limit: int) -> int:
@@ -4,12 +4,26 @@ import logging
 import secrets
 import threading
 import hashlib
+import time
 from datetime import datetime, timedelta, date
+from itertools import islice
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable
 
-from .ai_search import ClaudeSearcher as DeepSeekSearcher
+from .admin import HEADER as ADMIN_HEADER, check_admin_token
+from .admission import SlidingWindowLimiter
+from .analyze_proxy import AnalyzeProxy
+from .ai_search import ClaudeSearcher as DeepSeekSearcher, model_breaker
 from .config import config
+from .degradation import choose_tier
+from .event_log import events
+from .job_queue import JobQueue, PENDING, RUNNING
+from .memory_diagnostics import diagnostics
+from .metrics import metrics
+from .prediction_jobs import PredictionJobs
+from .prediction_record import PredictionRecord
+from .sanitizers import sanitize_form_field as sanitize
+from . import request_profiler, resource_hints, security_headers, server_timing
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -18,21 +32,59 @@ app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', secrets.token_hex(32))
 app.config['SESSION_TYPE'] = 'filesystem'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
+# Largest request body any route reads: the audio upload cap. Unlike a Content-Length
+# check it also bounds chunked uploads, which carry no length to check up front.
+app.config['MAX_CONTENT_LENGTH'] = config.analyze_max_upload
+# How often open game and reveal pages POST /activity (templates/session_activity.html)
+app.config['SESSION_ACTIVITY_INTERVAL_MS'] = int(config.session_activity_interval * 1000)
+
+# WSGI environ flags set by the ASGI entry point (src/asgi_app.py)
+STREAM_FLAG = 'web_app.reveal_stream'  # reveal.html follows /reveal/stream instead of polling
+WAITED_FLAG = 'web_app.reveal_waited'  # /reveal's prediction wait already ran, off-thread
+if config.server_timing:
+    server_timing.init_app(app)
+request_profiler.init_app(app)
+resource_hints.init_app(app)
+secure_headers = security_headers.init_app(app)
 
 # Prediction cache
 MAX_CACHE = 1000
-predictions_cache: Dict[str, Dict[str, Any]] = {}
+predictions_cache: Dict[str, PredictionRecord] = {}
 cache_lock = threading.Lock()
+# Called with a token hash whenever its prediction is stored or finalised
+prediction_listeners: List[Callable[[str], None]] = []
 
+# Per-client limits on requests that start a model call
+ip_admission = SlidingWindowLimiter('ip', config.admission_max_per_ip, config.admission_window, config.admission_max_clients)
+session_admission = SlidingWindowLimiter('session', config.admission_max_per_session, config.admission_window, config.admission_max_clients)
 
-def get_api_key():
-    return os.getenv('ANTHROPIC_API_KEY')
+# Upstream analyze-text calls per client (cache hits are free)
+analyze_admission = SlidingWindowLimiter('analyze', config.analyze_max_per_ip, config.admission_window, config.admission_max_clients)
+
+# Emotion-analysis API used by the circuit pages' demos
+analyze_proxy = AnalyzeProxy()
+
+# In-flight predictions, cancelled on abandon or idle; a job past its queue
+# lease would be claimed again by the recovery loop, so it is cancelled too
+prediction_jobs = PredictionJobs(max_age=config.job_queue_lease)
+
+# Durable record of the same jobs, so a restart resumes instead of losing them
+job_queue = JobQueue()
 
+diagnostics.register('predictions_cache', lambda: len(predictions_cache))
+diagnostics.register('prediction_jobs', prediction_jobs.active_count)
+diagnostics.register('ip_admission', ip_admission.stats)
+diagnostics.register('session_admission', session_admission.stats)
+diagnostics.register('event_buffer', lambda: events.pending())
+diagnostics.register('prediction_listeners', lambda: len(prediction_listeners))
+diagnostics.register('analyze_cache', lambda: analyze_proxy.cache_size())
 
-def sanitize(text: str) -> str:
-    for char in ['<', '>', '"', "'", '&', '\\', '\x00']:
-        text = text.replace(char, '')
-    return text.strip()[:200]
+# Fields /log-result accepts from the games
+LOG_RESULT_FIELDS = ('game', 'score', 'correct', 'attempts', 'duration_ms', 'result')
+
+
+def get_api_key():
+    return os.getenv('ANTHROPIC_API_KEY')
 
 
 def hash_token(token: str) -> str:
@@ -46,71 +98,287 @@ def calculate_age(dob: date) -> int:
 
 def cleanup_cache():
     with cache_lock:
-        if len(predictions_cache) > MAX_CACHE:
-            items = list(predictions_cache.items())
-            for key, _ in items[:100]:
-                del predictions_cache[key]
+        _evict_oldest()
+
+
+def _evict_oldest():
+    """Drop the 100 oldest entries once over MAX_CACHE; caller holds cache_lock"""
+    if len(predictions_cache) > MAX_CACHE:
+        for key in list(islice(predictions_cache, 100)):
+            del predictions_cache[key]
 
 
 def store_prediction(token_hash: str, prediction: Dict[str, Any]):
-    cleanup_cache()
+    record = PredictionRecord.from_result(prediction, token_hash)
+    # Evict and insert under one lock hold, or concurrent stores all pass
+    # the size check first and the cache grows past MAX_CACHE
     with cache_lock:
-        predictions_cache[token_hash] = prediction
+        _evict_oldest()
+        predictions_cache[token_hash] = record
+    notify_prediction(token_hash)
+
 
+def notify_prediction(token_hash: str):
+    """Tell waiters (the ASGI reveal wait and stream) that a prediction changed"""
+    for listener in prediction_listeners:
+        try:
+            listener(token_hash)
+        except Exception as e:
+            logger.error(f"Prediction listener failed: {e}")
 
-def get_prediction(token_hash: str) -> Optional[Dict[str, Any]]:
+
+def cached_prediction(token_hash: str) -> Optional[PredictionRecord]:
+    """This process's answer for the session, without touching the queue"""
     with cache_lock:
         return predictions_cache.get(token_hash)
 
 
-def start_background_prediction(token_hash: str, name: str, age: int, location: str):
-    def run():
+def get_prediction(token_hash: str) -> Optional[PredictionRecord]:
+    record = cached_prediction(token_hash)
+    # A provisional answer with no job here is being finished by another worker
+    if record is None or (record.provisional and prediction_jobs.get(token_hash) is None):
+        # Finished by another worker, or before a restart
+        with server_timing.span('store-db'):
+            stored = job_queue.result(token_hash)
+        if stored is not None:
+            stored_record = PredictionRecord(**stored)
+            with cache_lock:
+                _evict_oldest()
+                record = predictions_cache.get(token_hash)
+                if record is None or (record.provisional and not _superseded(stored_record, record.key)):
+                    record = predictions_cache[token_hash] = stored_record
+    return record
+
+
+def _superseded(current: Optional[PredictionRecord], key: Optional[str]) -> bool:
+    """True if current is an answer for other inputs than key"""
+    return key is not None and current is not None and current.key is not None and current.key != key
+
+
+def upgrade_prediction(token_hash: str, prediction: Dict[str, Any], key: Optional[str] = None) -> bool:
+    """Replace the provisional answer with the model's.
+    
+    If the model failed, keep the provisional guess as the final answer
+    rather than swapping a usable guess for an error.
+    
+    key is the inputs fingerprint the job ran with. If the session's answer
+    now belongs to other inputs (the job was superseded after its last
+    cancel check), nothing is written and False is returned; the check and
+    the write share one cache_lock hold.
+    """
+    record = PredictionRecord.from_result(prediction, token_hash, key)
+    with cache_lock:
+        current = predictions_cache.get(token_hash)
+        if _superseded(current, key):
+            return False
+        if prediction.get('error') and current is not None and current.provisional:
+            current.provisional = False
+        else:
+            _evict_oldest()
+            predictions_cache[token_hash] = record
+    notify_prediction(token_hash)
+    return True
+
+
+def settle_prediction(token_hash: str) -> bool:
+    """Keep the provisional answer as the final one; False if there is none"""
+    with cache_lock:
+        current = predictions_cache.get(token_hash)
+        settled = current is not None and current.provisional
+        if settled:
+            current.provisional = False
+    if settled:
+        notify_prediction(token_hash)
+    return settled
+
+
+def persist_prediction(token_hash: str, key: str):
+    """Mark the queued job done with the answer now in the cache"""
+    with cache_lock:
+        record = predictions_cache.get(token_hash)
+    if record is not None and not _superseded(record, key):
+        job_queue.complete(token_hash, key, record.to_dict())
+
+
+def prediction_key(name: str, age: int, location: str) -> str:
+    """Fingerprint of the inputs a prediction was made from"""
+    return hash_token(f"{name}|{age}|{location}".lower())
+
+
+def start_background_prediction(token_hash: str, name: str, age: int, location: str,
+                                claimed_key: Optional[str] = None):
+    """Run a prediction in a background thread, recorded in the durable job queue.
+    
+    claimed_key is set when the caller already claimed the queued job (restart recovery).
+    """
+    key = claimed_key or prediction_key(name, age, location)
+
+    def run(cancel_token):
+        started = time.monotonic()
+        # Queue writes happen here rather than on the request thread
+        if claimed_key is None:
+            payload = {'name': name, 'age': age, 'location': location}
+            if not job_queue.enqueue_claimed(token_hash, key, payload):
+                # Another worker process holds or finished this job; get_prediction reads its result back
+                logger.info(f"Prediction for {token_hash} is running elsewhere")
+                return
         try:
             api_key = get_api_key()
             if not api_key:
                 logger.error("No API key!")
-                store_prediction(token_hash, {
+                if upgrade_prediction(token_hash, {
                     'college': 'API key not set',
                     'career': 'Unknown',
                     'personality': 'Unknown',
                     'confidence': 0,
                     'error': 'ANTHROPIC_API_KEY not set'
-                })
+                }, key):
+                    record_prediction_event(token_hash, started)
+                    persist_prediction(token_hash, key)
                 return
             
             logger.info(f"Starting prediction for {name}...")
-            searcher = DeepSeekSearcher(api_key)
-            result = searcher.search_person(name, age, location)
-            store_prediction(token_hash, result)
-            logger.info(f"Prediction complete: {result.get('college')}, confidence: {result.get('confidence')}")
+            searcher = DeepSeekSearcher(api_key, cancel_token=cancel_token)
+            result = searcher.search_person(name, age, location, tier=choose_tier(prediction_jobs.active_count()))
+            if cancel_token.cancelled:
+                logger.info(f"Prediction for {token_hash} cancelled ({cancel_token.reason})")
+                if cancel_token.reason != 'superseded':
+                    job_queue.delete(token_hash, key)
+                return
+            if not upgrade_prediction(token_hash, result, key):
+                logger.info(f"Prediction for {token_hash} superseded before it was stored")
+                return
+            record_prediction_event(token_hash, started)
+            persist_prediction(token_hash, key)
+            logger.info(f"Prediction complete: {result.get('college')}, confidence: {result.get('confidence')}, tier: {result.get('tier')}")
             
         except Exception as e:
             logger.error(f"Prediction error: {e}", exc_info=True)
-            store_prediction(token_hash, {
+            upgrade_prediction(token_hash, {
                 'college': 'Error',
                 'career': 'Unknown', 
                 'personality': 'Unknown',
                 'confidence': 0,
                 'error': str(e)
-            })
+            }, key)
+            record_prediction_event(token_hash, started)
+            # Leave it to the recovery loop to retry
+            job_queue.fail(token_hash, key)
     
-    thread = threading.Thread(target=run, daemon=True)
-    thread.start()
-
-
-@app.after_request
-def security_headers(response):
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    response.headers['Content-Security-Policy'] = (
-        "default-src 'self'; "
-        "script-src 'self' 'unsafe-inline'; "
-        "style-src 'self' 'unsafe-inline' https://api.fontshare.com; "
-        "font-src 'self' https://cdn.fontshare.com; "
-        "connect-src 'self' http://ip-api.com"
+    pending = prediction_jobs.get(token_hash)
+    if claimed_key is None and pending is not None and pending.key == key and not pending.cancelled:
+        # Already running here; the queue would report it as running "elsewhere"
+        prediction_jobs.touch(token_hash)
+        metrics.incr('prediction_jobs.deduplicated')
+        logger.info(f"Reusing pending prediction for {token_hash}")
+        return
+    # New inputs for this session (or no job behind the answer); an older answer must not be shown
+    replace = pending is None or pending.key != key
+    provisional = PredictionRecord.from_result(
+        DeepSeekSearcher.provisional_prediction(name, age, location), token_hash, key
     )
-    return response
+    # One lock hold, so a superseded job's answer cannot land between the check and the store
+    with cache_lock:
+        stored = replace or token_hash not in predictions_cache
+        if stored:
+            _evict_oldest()
+            predictions_cache[token_hash] = provisional
+    if stored:
+        notify_prediction(token_hash)
+    prediction_jobs.start(token_hash, run, key=key)
+
+
+def recover_queued_predictions():
+    """Run jobs left pending, or orphaned by a dead worker, then purge expired ones"""
+    job_queue.purge()
+    while prediction_jobs.active_count() < config.tier_reduced_queue_depth:
+        job = job_queue.claim()
+        if job is None:
+            break
+        payload = job['payload']
+        logger.info(f"Resuming queued prediction for {job['token_hash']} (attempt {job['attempts']})")
+        metrics.incr('job_queue.resumed')
+        start_background_prediction(
+            job['token_hash'], payload.get('name', ''), payload.get('age', 0), payload.get('location', ''),
+            claimed_key=job['key']
+        )
+
+
+def _recovery_loop():
+    while True:
+        try:
+            recover_queued_predictions()
+        except Exception as e:
+            logger.error(f"Job recovery error: {e}", exc_info=True)
+        time.sleep(config.job_queue_poll_interval)
+
+
+_recovery_started = False
+_recovery_lock = threading.Lock()
+
+
+@app.before_request
+def ensure_job_recovery():
+    """Start the queue recovery thread with the first request this process serves"""
+    global _recovery_started
+    if _recovery_started:
+        return
+    with _recovery_lock:
+        if _recovery_started:
+            return
+        _recovery_started = True
+    threading.Thread(target=_recovery_loop, name='job-recovery', daemon=True).start()
+
+
+def record_prediction_event(token_hash: str, started: float):
+    prediction = get_prediction(token_hash)
+    events.emit(
+        'prediction',
+        s=token_hash,
+        seconds=round(time.monotonic() - started, 3),
+        confidence=prediction.confidence if prediction else None,
+        tier=prediction.tier if prediction else None,
+        error=bool(prediction and prediction.error)
+    )
+
+
+def log_event(event: str, **fields):
+    """Record a funnel event for the current session (in-memory enqueue only)"""
+    token = session.get('session_token')
+    events.emit(event, s=hash_token(token) if token else None, **fields)
+
+
+def client_ip() -> str:
+    if config.trust_proxy_headers and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or 'unknown'
+
+
+def admission_retry_after(token_hash: Optional[str] = None) -> Optional[int]:
+    """Seconds the client must wait before starting another prediction, or None.
+    
+    token_hash is the session to charge, if not the request's current one.
+    """
+    retry_after = ip_admission.acquire(client_ip())
+    token = session.get('session_token')
+    if token_hash is None and token:
+        token_hash = hash_token(token)
+    if retry_after is None and token_hash:
+        retry_after = session_admission.acquire(token_hash)
+        if retry_after is not None:
+            # Refused by the session limit, so the request must not use up the IP's quota
+            ip_admission.release(client_ip())
+    if retry_after is None:
+        return None
+    logger.warning(f"Admission denied for {client_ip()}, retry in {retry_after:.0f}s")
+    return max(1, int(retry_after + 0.999))
+
+
+def touch_session():
+    """Mark the current session's prediction as still wanted"""
+    token = session.get('session_token')
+    if token:
+        prediction_jobs.touch(hash_token(token))
 
 
 @app.route('/')
@@ -222,9 +490,21 @@ def signup():
         # Combine name
         full_name = f"{first_name} {last_name}"
         
-        # Generate session token
-        session_token = secrets.token_urlsafe(32)
+        # Reuse the session token on resubmit so the prediction is single-flight
+        session_token = session.get('session_token') or secrets.token_urlsafe(32)
         token_hash = hash_token(session_token)
+        key = prediction_key(full_name, age, location)
+        
+        # A resubmit of inputs already running or answered starts no model call,
+        # so it is not charged against the admission limits
+        pending = prediction_jobs.get(token_hash)
+        existing = get_prediction(token_hash) if session.get('prediction_key') == key else None
+        duplicate = (pending is not None and pending.key == key) or (existing is not None and not existing.provisional)
+        if not duplicate:
+            retry_after = admission_retry_after(token_hash)
+            if retry_after:
+                flash('Too many attempts. Please wait a few minutes and try again.', 'error')
+                return render_template('signup.html'), 429, {'Retry-After': str(retry_after)}
         
         session['user_data'] = {
             'name': full_name,
@@ -237,9 +517,15 @@ def signup():
         session['games_completed'] = 0
         session.permanent = True
         
-        # Start prediction in background
-        start_background_prediction(token_hash, full_name, age, location)
+        # Start prediction in background, unless this exact one is already running or answered
+        if duplicate:
+            metrics.incr('prediction_jobs.deduplicated')
+            logger.info(f"Reusing prediction for {token_hash}")
+        else:
+            start_background_prediction(token_hash, full_name, age, location)
+        session['prediction_key'] = key
         
+        log_event('signup', age=age)
         logger.info(f"User signed up: {full_name}, age {age}")
         return redirect(url_for('game1'))
         
@@ -267,13 +553,16 @@ def game1():
         session['session_token'] = secrets.token_urlsafe(16)
         session['games_completed'] = 0
         session.permanent = True
+    touch_session()
     return render_template('game1.html', game_num=1, session_token=session.get('session_token', ''))
 
 
 @app.route('/game/1/complete', methods=['POST'])
 def game1_complete():
+    touch_session()
     session['games_completed'] = 1
     session.modified = True
+    log_event('game_complete', game=1)
     return redirect(url_for('game2'))
 
 
@@ -281,13 +570,16 @@ def game1_complete():
 def game2():
     if 'user_data' not in session:
         return redirect(url_for('game1'))
+    touch_session()
     return render_template('game2.html', game_num=2, session_token=session.get('session_token', ''))
 
 
 @app.route('/game/2/complete', methods=['POST'])
 def game2_complete():
+    touch_session()
     session['games_completed'] = 2
     session.modified = True
+    log_event('game_complete', game=2)
     return redirect(url_for('game3'))
 
 
@@ -295,13 +587,16 @@ def game2_complete():
 def game3():
     if 'user_data' not in session:
         return redirect(url_for('game1'))
+    touch_session()
     return render_template('game3.html', game_num=3, session_token=session.get('session_token', ''))
 
 
 @app.route('/game/3/complete', methods=['POST'])
 def game3_complete():
+    touch_session()
     session['games_completed'] = 3
     session.modified = True
+    log_event('game_complete', game=3)
     return redirect(url_for('reveal'))
 
 
@@ -315,34 +610,120 @@ def reveal():
     token_hash = hash_token(session.get('session_token', ''))
     first_name = user_data.get('first_name', user_data.get('name', 'User').split()[0])
     
-    # Wait for prediction (max 5 seconds)
-    import time
-    prediction = None
-    for _ in range(10):
+    touch_session()
+    
+    # Signup stores an instant provisional answer, so this normally returns at once;
+    # only sessions that skipped signup wait (max 5 seconds). Under ASGI that wait
+    # already happened before this request reached a thread, so look once.
+    if request.environ.get(WAITED_FLAG):
         prediction = get_prediction(token_hash)
-        if prediction:
-            break
-        time.sleep(0.5)
+    else:
+        started = time.monotonic()
+        prediction = None
+        for _ in range(10):
+            prediction = get_prediction(token_hash)
+            if prediction:
+                break
+            time.sleep(0.5)
+        waited = time.monotonic() - started
+        metrics.observe('reveal.wait_seconds', waited)
+        server_timing.add_span('reveal-wait', waited)
     
     if not prediction:
-        prediction = {
-            'college': 'Demo Mode - No prediction available',
-            'career': 'Unknown',
-            'personality': 'Unknown',
-            'confidence': 0
-        }
+        prediction = PredictionRecord(college='Demo Mode - No prediction available')
+    log_event('reveal', confidence=prediction.confidence, tier=prediction.tier, provisional=prediction.provisional)
     
     return render_template('reveal.html',
                          prediction=prediction,
                          user_name=first_name,
-                         session_token=session.get('session_token', ''))
+                         session_token=session.get('session_token', ''),
+                         reveal_stream=bool(request.environ.get(STREAM_FLAG)))
+
+
+@app.route('/reveal/status')
+def reveal_status():
+    """Polled by reveal.html while a provisional answer is showing"""
+    token = session.get('session_token', '')
+    touch_session()
+    return jsonify(prediction_status(hash_token(token)))
+
+
+def prediction_status(token_hash: str) -> Dict[str, Any]:
+    """Body of /reveal/status (and the ASGI stream); needs an app context"""
+    prediction = get_prediction(token_hash)
+    if prediction is None:
+        return {'provisional': False, 'pending': False, 'html': None}
+    # Only a provisional answer can still change; the queue covers jobs run by other workers
+    provisional = prediction.provisional
+    pending = provisional and (
+        prediction_jobs.get(token_hash) is not None or job_queue.status(token_hash) in (PENDING, RUNNING)
+    )
+    if provisional and not pending:
+        # The job was cancelled or ended without an answer: nothing will replace the guess
+        settle_prediction(token_hash)
+        provisional = prediction.provisional = False
+    return {
+        'provisional': provisional,
+        'pending': pending,
+        'html': None if provisional else render_template('prediction_card.html', prediction=prediction)
+    }
 
 
 @app.route('/submit-feedback', methods=['POST'])
 def submit_feedback():
+    """Yes/no answer to "were we right?" from reveal.html"""
+    if request.is_json:
+        correct = bool((request.get_json(silent=True) or {}).get('correct'))
+    else:
+        correct = request.form.get('correct', '').lower() in ('1', 'true', 'yes')
+    token = session.get('session_token')
+    prediction = get_prediction(hash_token(token)) if token else None
+    log_event(
+        'feedback',
+        correct=correct,
+        confidence=prediction.confidence if prediction else None,
+        tier=prediction.tier if prediction else None,
+        provisional=prediction.provisional if prediction else None
+    )
+    if request.is_json:
+        return '', 204
     return redirect(url_for('complete'))
 
 
+@app.route('/activity', methods=['POST'])
+def session_activity():
+    """Heartbeat from open game and reveal pages; ?hidden=1 when the page is hidden"""
+    token = session.get('session_token')
+    if request.args.get('hidden'):
+        if token:
+            prediction_jobs.hold(hash_token(token))
+    else:
+        touch_session()
+    return '', 204
+
+
+@app.route('/abandon', methods=['POST'])
+def abandon():
+    """User left the flow; stop their prediction and drop the session.
+    
+    With ?pagehide=1 (the beacon pages send when unloaded) the prediction
+    is only released: it is cancelled unless the next page or a reload
+    reports activity within two heartbeats, and the session is kept.
+    """
+    token = session.get('session_token')
+    if request.args.get('pagehide'):
+        if token:
+            prediction_jobs.leave(hash_token(token), 2 * config.session_activity_interval)
+        return '', 204
+    if token:
+        prediction_jobs.cancel(hash_token(token), 'abandoned')
+        job_queue.delete(hash_token(token))
+    session.clear()
+    if request.is_json:
+        return '', 204
+    return redirect(url_for('circuit_index'))
+
+
 @app.route('/complete')
 def complete():
     return render_template('complete.html')
@@ -350,17 +731,89 @@ def complete():
 
 @app.route('/log-result', methods=['POST'])
 def log_result():
+    """Client-reported game outcome; only known numeric/short fields are kept"""
+    data = request.get_json(silent=True) or {}
+    fields = {}
+    for name in LOG_RESULT_FIELDS:
+        value = data.get(name)
+        if not isinstance(value, (bool, int, float, str)):
+            continue
+        fields[name] = sanitize(value)[:50] if isinstance(value, str) else value
+    log_event('game_result', **fields)
     return jsonify({'status': 'ok'})
 
 
+def analyze_retry_after() -> Optional[int]:
+    """Seconds the client must wait before another upstream analysis, or None"""
+    retry_after = analyze_admission.acquire(client_ip())
+    if retry_after is None:
+        return None
+    return max(1, int(retry_after + 0.999))
+
+
+@app.route('/api/analyze-text', methods=['POST'])
+def api_analyze_text():
+    """Emotion analysis for the circuit demos, via the server-side proxy"""
+    if not analyze_proxy.configured:
+        return jsonify({'success': False, 'error': 'Analysis is not configured'}), 503
+    text = (request.get_json(silent=True) or {}).get('text')
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({'success': False, 'error': 'Enter text to analyze'}), 400
+    if len(text) > config.analyze_max_text:
+        return jsonify({'success': False, 'error': f"Text is limited to {config.analyze_max_text} characters"}), 400
+    
+    if not analyze_proxy.is_cached(text):
+        retry_after = analyze_retry_after()
+        if retry_after:
+            return jsonify({'success': False, 'error': 'Too many requests'}), 429, {'Retry-After': str(retry_after)}
+    status, body = analyze_proxy.analyze_text(text)
+    return jsonify(body), status
+
+
+@app.route('/api/analyze-audio', methods=['POST'])
+def api_analyze_audio():
+    """Audio uploads for the voice demo; forwarded uncached"""
+    if not analyze_proxy.configured:
+        return jsonify({'success': False, 'error': 'Analysis is not configured'}), 503
+    too_large = jsonify({'success': False, 'error': 'Upload is too large'}), 413
+    if (request.content_length or 0) > config.analyze_max_upload:
+        return too_large
+    # A chunked upload has no Content-Length; MAX_CONTENT_LENGTH stops the read at the cap
+    data = request.get_data()
+    if request.content_length is None and len(data) >= config.analyze_max_upload:
+        return too_large
+    retry_after = analyze_retry_after()
+    if retry_after:
+        return jsonify({'success': False, 'error': 'Too many requests'}), 429, {'Retry-After': str(retry_after)}
+    status, body, content_type = analyze_proxy.forward('analyze-audio', data, request.content_type)
+    return body, status, {'Content-Type': content_type}
+
+
 @app.route('/health')
 def health():
     return jsonify({
         'status': 'healthy',
-        'api_key_set': bool(get_api_key())
+        'api_key_set': bool(get_api_key()),
+        'model_api_circuit': model_breaker.snapshot(),
+        'active_predictions': prediction_jobs.active_count(),
+        'metrics': metrics.snapshot()
     })
 
 
+@app.route('/admin/memory')
+def admin_memory():
+    """tracemalloc growth since the previous call, plus known structure sizes; ?stop=1 ends tracing"""
+    if not check_admin_token(request.headers.get(ADMIN_HEADER)):
+        return jsonify({'error': 'Not found'}), 404
+    if request.args.get('stop'):
+        diagnostics.stop()
+        return jsonify({'tracing': False})
+    if request.args.get('reset'):
+        diagnostics.reset()
+    limit = min(request.args.get('top', 20, type=int), 100)
+    return jsonify(diagnostics.report(limit))
+
+
 @app.route('/test')
 def test_page():
     return render_template('test_search.html')
@@ -368,6 +821,10 @@ def test_page():
 
 @app.route('/api/test-search', methods=['POST'])
 def api_test_search():
+    retry_after = admission_retry_after()
+    if retry_after:
+        return jsonify({'error': 'Too many requests'}), 429, {'Retry-After': str(retry_after)}
+    
     data = request.get_json()
     name = data.get('name', '')
     age = data.get('age')
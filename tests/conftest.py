@@ -0,0 +1,51 @@
+"""
+Shared fixtures.
+
+The job queue and event log default to paths under the working
+directory, and web_app opens both at import. Point them at a scratch
+directory before any test module imports web_app, so a test run never
+writes data/prediction_jobs.db or logs/events into the tree (or lets
+the recovery thread resume jobs from a real queue).
+"""
+import os
+import shutil
+import tempfile
+import pytest
+
+_scratch = tempfile.mkdtemp(prefix='blackmagic-tests-')
+os.environ['JOB_QUEUE_PATH'] = os.path.join(_scratch, 'prediction_jobs.db')
+os.environ['EVENT_LOG_DIR'] = os.path.join(_scratch, 'events')
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_scratch, ignore_errors=True)
+
+
+@pytest.fixture
+def isolated_store(tmp_path, monkeypatch):
+    """A fresh job queue, event sink and prediction cache for one test"""
+    from src import web_app
+    from src.event_log import EventSink
+    from src.job_queue import JobQueue
+
+    monkeypatch.setattr(web_app, 'job_queue', JobQueue(str(tmp_path / 'jobs.db')))
+    monkeypatch.setattr(web_app, 'events', EventSink(str(tmp_path / 'events')))
+    monkeypatch.setattr(web_app, 'prediction_listeners', [])
+    web_app.predictions_cache.clear()
+    yield
+    web_app.predictions_cache.clear()
+
+
+class FakeClock:
+    """Monotonic-clock stand-in; advance it by adding to .now"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
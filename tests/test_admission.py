@@ -0,0 +1,138 @@
+"""
+Tests for per-client admission control.
+"""
+import time
+import pytest
+from src import web_app
+from src.admission import SlidingWindowLimiter
+
+
+class TestSlidingWindowLimiter:
+    """Test sliding-window admission"""
+    
+    def test_admits_up_to_limit(self, clock):
+        limiter = SlidingWindowLimiter('test', limit=3, window=60, clock=clock)
+        
+        assert [limiter.acquire('a') for _ in range(3)] == [None, None, None]
+        assert limiter.acquire('a') == 60
+    
+    def test_keys_are_independent(self, clock):
+        limiter = SlidingWindowLimiter('test', limit=1, window=60, clock=clock)
+        
+        assert limiter.acquire('a') is None
+        assert limiter.acquire('b') is None
+        assert limiter.acquire('a') is not None
+    
+    def test_window_slides(self, clock):
+        limiter = SlidingWindowLimiter('test', limit=2, window=60, clock=clock)
+        limiter.acquire('a')
+        clock.now += 30
+        limiter.acquire('a')
+        
+        assert limiter.acquire('a') == pytest.approx(30)
+        clock.now += 30
+        assert limiter.acquire('a') is None
+    
+    def test_idle_keys_evicted(self, clock):
+        limiter = SlidingWindowLimiter('test', limit=2, window=60, clock=clock)
+        for key in ('a', 'b', 'c'):
+            limiter.acquire(key)
+        
+        clock.now += 61
+        limiter.acquire('d')
+        assert len(limiter) == 1
+    
+    def test_key_count_capped(self, clock):
+        limiter = SlidingWindowLimiter('test', limit=2, window=60, max_keys=100, clock=clock)
+        for i in range(1000):
+            limiter.acquire(f'client-{i}')
+        
+        assert len(limiter) == 100
+    
+    def test_release_returns_latest_slot(self, clock):
+        limiter = SlidingWindowLimiter('test', limit=2, window=60, clock=clock)
+        limiter.acquire('a')
+        limiter.acquire('a')
+        limiter.release('a')
+        limiter.release('missing')
+        
+        assert limiter.acquire('a') is None
+        assert limiter.acquire('a') is not None
+    
+    def test_stats(self, clock):
+        limiter = SlidingWindowLimiter('test', limit=3, window=60, clock=clock)
+        for key in ('a', 'a', 'b'):
+            limiter.acquire(key)
+        
+        assert limiter.stats() == {'keys': 2, 'entries': 3}
+
+
+class TestAdmissionRoutes:
+    """429 and Retry-After from the routes that start model calls"""
+    
+    SIGNUP = {
+        'first_name': 'Jane', 'last_name': 'Doe', 'dob': '1999-07-04',
+        'location': 'Austin, TX', 'agree_terms': 'on', 'confirm_age': 'on'
+    }
+    
+    @pytest.fixture
+    def limits(self, isolated_store, clock, monkeypatch):
+        monkeypatch.delenv('ANTHROPIC_API_KEY', raising=False)
+        monkeypatch.setattr(web_app, 'ip_admission', SlidingWindowLimiter('ip', 1000, 600, clock=clock))
+        monkeypatch.setattr(web_app, 'session_admission', SlidingWindowLimiter('session', 2, 600, clock=clock))
+        return clock
+    
+    def wait_for_jobs(self):
+        deadline = time.monotonic() + 5
+        while web_app.prediction_jobs.active_count() and time.monotonic() < deadline:
+            time.sleep(0.01)
+    
+    def test_duplicate_signups_are_free(self, limits):
+        client = web_app.app.test_client()
+        for _ in range(4):
+            assert client.post('/signup', data=self.SIGNUP).status_code == 302
+            self.wait_for_jobs()
+        # A typo fix is the session's second model call
+        response = client.post('/signup', data=dict(self.SIGNUP, location='Austin, Texas'))
+        assert response.status_code == 302
+        self.wait_for_jobs()
+        
+        response = client.post('/signup', data=dict(self.SIGNUP, location='Dallas, TX'))
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '600'
+        with client.session_transaction() as sess:
+            assert sess['user_data']['location'] == 'Austin, Texas'
+    
+    def test_retry_after_counts_down(self, limits):
+        client = web_app.app.test_client()
+        for location in ('Austin, TX', 'Boston, MA'):
+            client.post('/signup', data=dict(self.SIGNUP, location=location))
+            self.wait_for_jobs()
+        limits.now += 400
+        
+        response = client.post('/signup', data=dict(self.SIGNUP, location='Denver, CO'))
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '200'
+    
+    def test_session_refusal_does_not_use_ip_quota(self, limits):
+        client = web_app.app.test_client()
+        for location in ('Austin, TX', 'Boston, MA'):
+            client.post('/signup', data=dict(self.SIGNUP, location=location))
+            self.wait_for_jobs()
+        for _ in range(3):
+            assert client.post('/signup', data=dict(self.SIGNUP, location='Denver, CO')).status_code == 429
+        
+        # Only the two admitted signups count against the address
+        assert web_app.ip_admission.stats()['entries'] == 2
+    
+    def test_test_search_limited_per_ip(self, limits, monkeypatch):
+        monkeypatch.setattr(web_app, 'ip_admission', SlidingWindowLimiter('ip', 2, 600, clock=limits))
+        client = web_app.app.test_client()
+        for _ in range(2):
+            # Admitted; fails later for want of an API key
+            assert client.post('/api/test-search', json={'name': 'Jane Doe'}).status_code == 500
+        
+        response = client.post('/api/test-search', json={'name': 'Jane Doe'})
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '600'
+        assert response.get_json() == {'error': 'Too many requests'}
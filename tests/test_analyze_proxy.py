@@ -0,0 +1,171 @@
+"""
+Tests for the analyze-text proxy.
+"""
+import io
+import threading
+import time
+from unittest.mock import Mock
+import pytest
+import requests
+from werkzeug.test import EnvironBuilder
+from src import web_app
+from src.admission import SlidingWindowLimiter
+from src.analyze_proxy import AnalyzeProxy
+
+
+def upstream_response(status=200, body=None):
+    response = Mock()
+    response.status_code = status
+    response.json.return_value = body if body is not None else {'success': True, 'result': {'emotion_analysis': {}}}
+    return response
+
+
+def make_proxy(clock, **kwargs):
+    proxy = AnalyzeProxy(base_url='https://analyze.test/api', token='secret', ttl=60, max_entries=3,
+                         timeout=5, clock=clock, **kwargs)
+    proxy.session = Mock()
+    proxy.session.post.return_value = upstream_response()
+    return proxy
+
+
+class TestAnalyzeProxy:
+    """Caching, coalescing and error mapping"""
+
+    def test_token_sent_upstream(self):
+        proxy = AnalyzeProxy(base_url='https://analyze.test/api', token='secret')
+        assert proxy.session.headers['Authorization'] == 'Bearer secret'
+        assert proxy.configured
+        assert not AnalyzeProxy(token='').configured
+
+    def test_repeat_text_served_from_cache(self, clock):
+        proxy = make_proxy(clock)
+        assert proxy.analyze_text('hello')[0] == 200
+        assert proxy.analyze_text('hello')[0] == 200
+        assert proxy.session.post.call_count == 1
+        args, kwargs = proxy.session.post.call_args
+        assert args[0] == 'https://analyze.test/api/analyze-text'
+        assert kwargs['json'] == {'text': 'hello'}
+
+    def test_cache_expires(self, clock):
+        proxy = make_proxy(clock)
+        proxy.analyze_text('hello')
+        clock.now += 61
+        assert not proxy.is_cached('hello')
+        proxy.analyze_text('hello')
+        assert proxy.session.post.call_count == 2
+
+    def test_cache_size_bounded_lru(self, clock):
+        proxy = make_proxy(clock)
+        for text in ('a', 'b', 'c'):
+            proxy.analyze_text(text)
+        proxy.analyze_text('a')  # most recently used
+        proxy.analyze_text('d')
+        assert proxy.cache_size() == 3
+        assert proxy.is_cached('a')
+        assert not proxy.is_cached('b')
+
+    def test_errors_not_cached(self, clock):
+        proxy = make_proxy(clock)
+        proxy.session.post.return_value = upstream_response(500, {'success': False, 'error': 'boom'})
+        assert proxy.analyze_text('hello') == (500, {'success': False, 'error': 'boom'})
+        assert not proxy.is_cached('hello')
+
+    def test_upstream_auth_failure_is_bad_gateway(self, clock):
+        proxy = make_proxy(clock)
+        proxy.session.post.return_value = upstream_response(401, {'message': 'bad token'})
+        assert proxy.analyze_text('hello')[0] == 502
+
+    def test_network_error(self, clock):
+        proxy = make_proxy(clock)
+        proxy.session.post.side_effect = requests.ConnectionError('down')
+        status, body = proxy.analyze_text('hello')
+        assert status == 502 and body['success'] is False
+
+    def test_non_json_response(self, clock):
+        proxy = make_proxy(clock)
+        proxy.session.post.return_value.json.side_effect = ValueError('not json')
+        assert proxy.analyze_text('hello')[0] == 502
+
+    def test_concurrent_identical_requests_share_one_call(self, clock):
+        proxy = make_proxy(clock)
+        release = threading.Event()
+
+        def slow_post(*args, **kwargs):
+            release.wait(5)
+            return upstream_response()
+
+        proxy.session.post.side_effect = slow_post
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(proxy.analyze_text('same'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert [status for status, _ in results] == [200] * 8
+        assert proxy.session.post.call_count == 1
+
+
+class TestAnalyzeRoutes:
+    """The /api/analyze-* routes"""
+
+    @pytest.fixture
+    def proxy(self, clock, monkeypatch):
+        proxy = make_proxy(clock)
+        monkeypatch.setattr(web_app, 'analyze_proxy', proxy)
+        monkeypatch.setattr(web_app, 'analyze_admission', SlidingWindowLimiter('analyze', 2, 600))
+        return proxy
+
+    def test_proxies_text(self, proxy):
+        response = web_app.app.test_client().post('/api/analyze-text', json={'text': 'I am happy'})
+        assert response.status_code == 200
+        assert response.get_json()['success'] is True
+
+    def test_rejects_empty_and_long_text(self, proxy):
+        client = web_app.app.test_client()
+        assert client.post('/api/analyze-text', json={'text': '  '}).status_code == 400
+        assert client.post('/api/analyze-text', json={}).status_code == 400
+        assert client.post('/api/analyze-text', json={'text': 'x' * 100_000}).status_code == 400
+        proxy.session.post.assert_not_called()
+
+    def test_unconfigured(self, monkeypatch):
+        monkeypatch.setattr(web_app, 'analyze_proxy', AnalyzeProxy(token=''))
+        assert web_app.app.test_client().post('/api/analyze-text', json={'text': 'hi'}).status_code == 503
+
+    def test_cache_hits_skip_admission(self, proxy):
+        client = web_app.app.test_client()
+        for _ in range(5):
+            assert client.post('/api/analyze-text', json={'text': 'same'}).status_code == 200
+        assert client.post('/api/analyze-text', json={'text': 'other'}).status_code == 200
+        response = client.post('/api/analyze-text', json={'text': 'third'})
+        assert response.status_code == 429
+        assert 'Retry-After' in response.headers
+
+    def test_audio_forwarded(self, proxy):
+        upstream = Mock(status_code=200, content=b'{"success": true}', headers={'Content-Type': 'application/json'})
+        proxy.session.post.return_value = upstream
+        response = web_app.app.test_client().post('/api/analyze-audio', data=b'RIFF', content_type='audio/wav')
+        assert response.status_code == 200
+        args, kwargs = proxy.session.post.call_args
+        assert args[0] == 'https://analyze.test/api/analyze-audio'
+        assert kwargs['data'] == b'RIFF'
+        assert kwargs['headers'] == {'Content-Type': 'audio/wav'}
+
+    @pytest.mark.parametrize('chunked', [False, True])
+    def test_audio_over_cap_rejected(self, proxy, monkeypatch, chunked):
+        monkeypatch.setitem(web_app.app.config, 'MAX_CONTENT_LENGTH', 1024)
+        monkeypatch.setattr(web_app.config, 'analyze_max_upload', 1024)
+        body = b'RIFF' + b'\0' * 4096
+        if chunked:
+            # No Content-Length, as a server passes on a chunked upload: only the read limit can stop it
+            environ = EnvironBuilder('/api/analyze-audio', method='POST', input_stream=io.BytesIO(body),
+                                     content_type='audio/wav', headers={'Transfer-Encoding': 'chunked'}).get_environ()
+            del environ['CONTENT_LENGTH']
+            environ['wsgi.input_terminated'] = True
+            response = web_app.app.response_class.from_app(web_app.app, environ, buffered=True)
+        else:
+            response = web_app.app.test_client().post('/api/analyze-audio', data=body, content_type='audio/wav')
+        assert response.status_code == 413
+        assert response.get_json()['error'] == 'Upload is too large'
+        proxy.session.post.assert_not_called()
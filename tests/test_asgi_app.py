@@ -0,0 +1,224 @@
+"""
+Tests for the ASGI entry point.
+"""
+import asyncio
+import json
+import threading
+import pytest
+from src import web_app
+from src.asgi_app import AsgiApp, build_environ
+
+
+pytestmark = pytest.mark.usefixtures('isolated_store')
+
+
+def session_cookie():
+    """Signed session cookie and token hash from a real Flask response"""
+    client = web_app.app.test_client()
+    client.get('/game/1')
+    cookie = client.get_cookie('session')
+    with client.session_transaction() as sess:
+        token = sess['session_token']
+    return f"session={cookie.value}", web_app.hash_token(token)
+
+
+def http_scope(path, method='GET', cookie=None, body_type=None):
+    headers = [(b'host', b'testserver')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    if body_type:
+        headers.append((b'content-type', body_type.encode()))
+    return {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+        'headers': headers, 'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+        'scheme': 'http', 'http_version': '1.1', 'root_path': ''
+    }
+
+
+async def call(app, scope, body=b'', disconnect_after=None):
+    messages = []
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        if disconnect_after is not None:
+            await asyncio.sleep(disconnect_after)
+        else:
+            await asyncio.sleep(3600)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    status = messages[0]['status']
+    body = b''.join(m.get('body', b'') for m in messages[1:])
+    return status, dict(messages[0]['headers']), body
+
+
+class TestAsgiApp:
+    """Test the WSGI bridge, reveal wait and status stream"""
+
+    def test_build_environ(self):
+        scope = http_scope('/café', cookie='a=b')
+        scope['query_string'] = b'x=1'
+        environ = build_environ(scope, b'')
+
+        assert environ['PATH_INFO'] == '/café'.encode('utf-8').decode('latin-1')
+        assert environ['QUERY_STRING'] == 'x=1'
+        assert environ['HTTP_COOKIE'] == 'a=b'
+
+    def test_plain_routes_go_to_flask(self):
+        app = AsgiApp(web_app.app, threads=2)
+        status, headers, body = asyncio.run(call(app, http_scope('/terms')))
+
+        assert status == 200
+        assert headers[b'x-content-type-options'] == b'nosniff'
+        assert b'<html' in body.lower()
+
+    def test_post_body_reaches_flask(self):
+        app = AsgiApp(web_app.app, threads=2)
+        status, _, body = asyncio.run(call(
+            app, http_scope('/log-result', 'POST', body_type='application/json'), body=b'{"game": 1}'
+        ))
+
+        assert status == 200
+        assert json.loads(body) == {'status': 'ok'}
+
+    def test_chunked_body_read_up_to_limit(self, monkeypatch):
+        monkeypatch.setitem(web_app.app.config, 'MAX_CONTENT_LENGTH', 1024)
+        app = AsgiApp(web_app.app, threads=2)
+        received = []
+
+        async def receive():
+            received.append(1)
+            return {'type': 'http.request', 'body': b'x' * 512, 'more_body': True}
+
+        body = asyncio.run(app._read_body(receive))
+        environ = build_environ(http_scope('/api/analyze-audio', 'POST', body_type='audio/wav'), body)
+
+        assert len(received) == 3
+        assert 'CONTENT_LENGTH' not in environ
+        assert environ['wsgi.input_terminated'] is True
+
+    def test_stream_emits_final_prediction(self):
+        cookie, token_hash = session_cookie()
+        web_app.store_prediction(token_hash, {'college': 'Guess U', 'confidence': 10, 'provisional': True})
+        job = web_app.prediction_jobs.start(token_hash, lambda cancel: cancel.wait(5))
+        app = AsgiApp(web_app.app, threads=2)
+
+        async def scenario():
+            def finish():
+                web_app.upgrade_prediction(token_hash, {'college': 'Model U', 'confidence': 80})
+                job.cancel('test')
+            asyncio.get_running_loop().call_later(0.2, threading.Thread(target=finish).start)
+            return await call(app, http_scope('/reveal/stream', cookie=cookie))
+
+        status, headers, body = asyncio.run(scenario())
+
+        assert status == 200
+        assert headers[b'content-type'] == b'text/event-stream'
+        event, data = body.decode().strip().split('\n')
+        assert event == 'event: prediction'
+        payload = json.loads(data[len('data: '):])
+        assert payload['provisional'] is False
+        assert 'Model U' in payload['html']
+        assert len(app.waiters) == 0
+
+    def test_idle_stream_reads_store_only_at_deadline(self, monkeypatch):
+        cookie, token_hash = session_cookie()
+        web_app.store_prediction(token_hash, {'college': 'Guess U', 'provisional': True})
+        job = web_app.prediction_jobs.start(token_hash, lambda cancel: cancel.wait(5))
+        app = AsgiApp(web_app.app, threads=2)
+        app.STREAM_TIMEOUT = 0.5
+        reads = []
+        status = app._status
+        monkeypatch.setattr(app, '_status', lambda token_hash: reads.append(1) or status(token_hash))
+
+        _, _, body = asyncio.run(call(app, http_scope('/reveal/stream', cookie=cookie)))
+        job.cancel('test')
+
+        # Once on connect and once at the deadline; nothing in between without a wake-up
+        assert len(reads) == 2
+        assert json.loads(body.decode().strip().split('\n')[1][len('data: '):])['pending'] is True
+
+    def test_stream_stops_on_disconnect(self):
+        cookie, token_hash = session_cookie()
+        web_app.store_prediction(token_hash, {'college': 'Guess U', 'provisional': True})
+        job = web_app.prediction_jobs.start(token_hash, lambda cancel: cancel.wait(5))
+        app = AsgiApp(web_app.app, threads=2)
+
+        status, _, body = asyncio.run(asyncio.wait_for(
+            call(app, http_scope('/reveal/stream', cookie=cookie), disconnect_after=0.2), 2
+        ))
+        job.cancel('test')
+
+        assert status == 200
+        assert body == b''
+        assert len(app.waiters) == 0
+
+    def test_reveal_waits_for_prediction(self):
+        cookie, token_hash = session_cookie()
+        app = AsgiApp(web_app.app, threads=2)
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.2, lambda: threading.Thread(
+                target=web_app.store_prediction, args=(token_hash, {'college': 'Late U', 'confidence': 50})
+            ).start())
+            started = loop.time()
+            result = await call(app, http_scope('/reveal', cookie=cookie))
+            return result, loop.time() - started
+
+        (status, _, body), elapsed = asyncio.run(scenario())
+
+        assert status == 200
+        assert b'Late U' in body
+        assert elapsed < 1.5
+
+    def test_reveal_without_prediction_waits_once(self):
+        cookie, _ = session_cookie()
+        app = AsgiApp(web_app.app, threads=2)
+        app.REVEAL_WAIT = 0.3
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await call(app, http_scope('/reveal', cookie=cookie))
+            return result, loop.time() - started
+
+        (status, _, body), elapsed = asyncio.run(scenario())
+
+        # Flask's own 5 second polling loop is skipped after the async wait
+        assert status == 200
+        assert b'Demo Mode' in body
+        assert elapsed < 1.5
+
+    def test_reveal_page_follows_stream_under_asgi(self):
+        cookie, token_hash = session_cookie()
+        web_app.store_prediction(token_hash, {'college': 'Guess U', 'provisional': True})
+        app = AsgiApp(web_app.app, threads=2)
+
+        _, _, body = asyncio.run(call(app, http_scope('/reveal', cookie=cookie)))
+        assert b'/reveal/stream' in body
+        with web_app.app.test_client() as client:
+            client.set_cookie('session', cookie.split('=', 1)[1])
+            assert b'/reveal/stream' not in client.get('/reveal').data
+
+    def test_lifespan(self):
+        app = AsgiApp(web_app.app, threads=1)
+        incoming = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(app({'type': 'lifespan'}, receive, send))
+
+        assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
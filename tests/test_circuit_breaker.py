@@ -0,0 +1,102 @@
+"""
+Tests for the model API circuit breaker.
+"""
+import pytest
+from unittest.mock import Mock, patch
+from src.circuit_breaker import CircuitBreaker
+from src.ai_search import ClaudeSearcher
+from src.retry import RetryPolicy
+
+
+class TestCircuitBreaker:
+    """Test state transitions"""
+    
+    def test_starts_closed(self):
+        breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=10)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request() is True
+    
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=10)
+        for _ in range(3):
+            breaker.record_failure()
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+    
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=10)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_half_open_allows_single_probe(self, clock):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        
+        clock.now += 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+    
+    def test_probe_success_closes(self, clock):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now += 10
+        breaker.allow_request()
+        breaker.record_success()
+        
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request() is True
+    
+    def test_probe_failure_reopens(self, clock):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now += 10
+        breaker.allow_request()
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.snapshot()['retry_in'] == 10
+    
+    def test_abandoned_probe_is_replaced(self, clock):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now += 10
+        assert breaker.allow_request() is True
+        
+        clock.now += 10
+        assert breaker.allow_request() is True
+
+
+class TestSearcherWithOpenCircuit:
+    """Test that an open circuit short-circuits to the location fallback"""
+    
+    @patch('src.ai_search.requests.post')
+    def test_open_circuit_skips_api(self, mock_post):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        searcher = ClaudeSearcher('key', RetryPolicy(deadline=60), breaker)
+        
+        result = searcher.search_person('Jane Doe', 25, 'Austin, TX')
+        
+        mock_post.assert_not_called()
+        assert result['college'] == 'University of Texas at Austin'
+        assert result['confidence'] == 10
+    
+    @patch('src.ai_search.time.sleep')
+    @patch('src.ai_search.requests.post')
+    def test_circuit_opening_stops_retries(self, mock_post, mock_sleep):
+        response = Mock(status_code=503, headers={}, text='')
+        mock_post.return_value = response
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+        searcher = ClaudeSearcher('key', RetryPolicy(max_attempts=5, base_delay=0.01, deadline=60), breaker)
+        
+        result = searcher.search_person('Jane Doe', 25, 'Austin, TX')
+        
+        assert mock_post.call_count == 2
+        assert result['error'] == 'AI service temporarily unavailable'
+        assert breaker.state == CircuitBreaker.OPEN
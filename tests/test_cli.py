@@ -0,0 +1,46 @@
+"""
+Tests for the command line interface.
+"""
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from src.cli import cli
+from src.config import config
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    # setup_logging writes logs/ under the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, 'token_cache_path', str(tmp_path / 'token.bin'))
+    return CliRunner()
+
+
+class TestSearchWithoutCredentials:
+    """search and test_connection with no token cache key and no saved token"""
+    
+    def test_search_prints_auth_guidance(self, runner):
+        with patch.object(config, 'token_cache_key', None):
+            result = runner.invoke(cli, ['search', '--name', 'Jane Doe', '--age', '25'])
+        
+        assert result.exit_code == 1
+        assert 'Authentication Required' in result.output
+        assert 'Not authenticated' in result.output
+        assert 'Unexpected error' not in result.output
+    
+    def test_search_with_key_but_no_saved_token(self, runner):
+        with patch.object(config, 'token_cache_key', 'test-key'), \
+             patch('src.auth.LinkedInAuth') as auth:
+            auth.return_value.load_cached_token.return_value = False
+            result = runner.invoke(cli, ['search', '--name', 'Jane Doe', '--age', '25'])
+        
+        assert result.exit_code == 1
+        assert 'Authentication Required' in result.output
+        assert 'Unexpected error' not in result.output
+    
+    def test_connection_requires_auth(self, runner):
+        with patch.object(config, 'token_cache_key', None):
+            result = runner.invoke(cli, ['test-connection'])
+        
+        assert result.exit_code == 0
+        assert "run 'auth' command first" in result.output
@@ -0,0 +1,200 @@
+"""
+Concurrency stress tests for state shared between request threads.
+
+Each test hammers one structure from many threads and then checks its
+invariants (no lost writes, limits never exceeded, bounded size). Each
+also measures ops/sec and fails below a floor, so a lock held too long
+shows up here first. Floors are set well below what a laptop does and
+can be scaled with STRESS_MIN_RATE_SCALE (0 disables them).
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from src import web_app
+from src.admission import SlidingWindowLimiter
+from src.config import config
+from src.rate_limiter import RateLimiter
+
+THREADS = 16
+RATE_SCALE = float(os.getenv('STRESS_MIN_RATE_SCALE', '1'))
+
+
+def hammer(worker, threads=THREADS):
+    """Run worker(index) on every thread at once; return elapsed seconds"""
+    barrier = threading.Barrier(threads + 1)
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            worker(index)
+        except Exception as e:
+            errors.append(e)
+
+    pool = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    assert not errors, errors
+    return elapsed
+
+
+def check_rate(record_property, name, ops, elapsed, floor):
+    rate = ops / elapsed
+    record_property(f"{name}_ops_per_second", round(rate))
+    print(f"{name}: {rate:,.0f} ops/s")
+    assert rate >= floor * RATE_SCALE, f"{name} ran at {rate:,.0f} ops/s, floor {floor * RATE_SCALE:,.0f}"
+
+
+@pytest.fixture
+def rate_limits(monkeypatch):
+    # RateLimiter reads the LinkedIn call limits, which this config may not define
+    monkeypatch.setattr(config, 'max_api_calls_per_minute', 50, raising=False)
+    monkeypatch.setattr(config, 'max_api_calls_per_hour', 200, raising=False)
+
+
+def prediction(index):
+    return {'college': f"College {index}", 'career': 'Analyst', 'personality': 'curious', 'confidence': index % 100}
+
+
+class TestPredictionCacheStress:
+    """store_prediction / get_prediction / cleanup_cache from many threads"""
+
+    def test_no_lost_writes(self, isolated_store, record_property):
+        per_thread = 50
+
+        def worker(index):
+            for i in range(per_thread):
+                token_hash = f"t{index}-{i}"
+                web_app.store_prediction(token_hash, prediction(i))
+                record = web_app.get_prediction(token_hash)
+                assert record is not None and record.college == f"College {i}"
+
+        elapsed = hammer(worker)
+        assert len(web_app.predictions_cache) == THREADS * per_thread
+        check_rate(record_property, 'cache_store_get', THREADS * per_thread * 2, elapsed, 2000)
+
+    def test_size_stays_bounded(self, isolated_store, monkeypatch, record_property):
+        monkeypatch.setattr(web_app, 'MAX_CACHE', 200)
+        per_thread = 300
+        sizes = []
+
+        def worker(index):
+            for i in range(per_thread):
+                web_app.store_prediction(f"t{index}-{i}", prediction(i))
+                if i % 10 == 0:
+                    web_app.cleanup_cache()
+                    sizes.append(len(web_app.predictions_cache))
+
+        elapsed = hammer(worker)
+        # Eviction runs before each insert, so at most one entry over the cap
+        assert max(sizes) <= web_app.MAX_CACHE + 1
+        assert len(web_app.predictions_cache) <= web_app.MAX_CACHE + 1
+        check_rate(record_property, 'cache_store_evict', THREADS * per_thread, elapsed, 2000)
+
+    def test_upgrade_last_writer_wins(self, isolated_store):
+        web_app.store_prediction('shared', dict(prediction(0), provisional=True))
+
+        def worker(index):
+            for i in range(100):
+                web_app.upgrade_prediction('shared', prediction(index))
+
+        hammer(worker)
+        record = web_app.get_prediction('shared')
+        assert record.college in {f"College {i}" for i in range(THREADS)}
+        assert not record.provisional
+
+
+class TestRateLimiterStress:
+    """RateLimiter shared by threads"""
+
+    def test_acquire_never_exceeds_limit(self, rate_limits, record_property):
+        limiter = RateLimiter()
+        granted = []
+        attempts = 200
+
+        def worker(index):
+            for _ in range(attempts):
+                if limiter.acquire():
+                    granted.append(index)
+
+        elapsed = hammer(worker)
+        assert len(granted) == limiter.max_per_minute
+        assert len(limiter.minute_calls) == limiter.max_per_minute
+        assert len(limiter.hour_calls) == limiter.max_per_minute
+        check_rate(record_property, 'rate_limiter_acquire', THREADS * attempts, elapsed, 5000)
+
+    def test_record_call_loses_nothing(self, rate_limits, record_property):
+        limiter = RateLimiter()
+        per_thread = 500
+
+        def worker(index):
+            for _ in range(per_thread):
+                limiter.record_call()
+                limiter.check_limit()
+
+        elapsed = hammer(worker)
+        assert len(limiter.minute_calls) == THREADS * per_thread
+        assert len(limiter.hour_calls) == THREADS * per_thread
+        check_rate(record_property, 'rate_limiter_record_check', THREADS * per_thread * 2, elapsed, 5000)
+
+    def test_expired_calls_cleaned_concurrently(self, rate_limits):
+        limiter = RateLimiter()
+        old = datetime.now() - timedelta(hours=2)
+        limiter.minute_calls.extend([old] * 1000)
+        limiter.hour_calls.extend([old] * 1000)
+
+        def worker(index):
+            for _ in range(50):
+                limiter.check_limit()
+                limiter.get_stats()
+
+        hammer(worker)
+        assert len(limiter.minute_calls) == 0
+        assert len(limiter.hour_calls) == 0
+
+
+class TestSessionFlowStress:
+    """Concurrent users through signup -> games -> reveal"""
+
+    def test_concurrent_funnels(self, isolated_store, monkeypatch, record_property):
+        monkeypatch.delenv('ANTHROPIC_API_KEY', raising=False)
+        monkeypatch.setattr(web_app, 'ip_admission', SlidingWindowLimiter('ip', 10 ** 6, 600))
+        users = 4
+        token_hashes = []
+
+        def worker(index):
+            for user in range(users):
+                client = web_app.app.test_client()
+                first_name = f"Stress{index}x{user}"
+                response = client.post('/signup', data={
+                    'first_name': first_name, 'last_name': 'User', 'dob': '2000-01-15',
+                    'location': 'Austin, TX', 'agree_terms': 'on', 'confirm_age': 'on'
+                })
+                assert response.status_code == 302
+                for game in (1, 2, 3):
+                    assert client.post(f"/game/{game}/complete").status_code == 302
+                response = client.get('/reveal')
+                assert response.status_code == 200
+                assert first_name in response.get_data(as_text=True)
+                with client.session_transaction() as sess:
+                    assert sess['games_completed'] == 3
+                    token_hashes.append(web_app.hash_token(sess['session_token']))
+
+        elapsed = hammer(worker)
+        deadline = time.monotonic() + 10
+        while web_app.prediction_jobs.active_count() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert web_app.prediction_jobs.active_count() == 0
+        assert len(set(token_hashes)) == THREADS * users
+        for token_hash in token_hashes:
+            record = web_app.get_prediction(token_hash)
+            assert record is not None and not record.provisional
+        check_rate(record_property, 'session_funnel', THREADS * users, elapsed, 20)
@@ -95,3 +95,13 @@ class TestConfig:
         config = Config()
         assert config.is_production() is False
 
+    
+    @patch.dict(os.environ, {
+        'LINKEDIN_CLIENT_ID': 'test_id',
+        'LINKEDIN_CLIENT_SECRET': 'test_secret',
+        'ANTHROPIC_API_URL': 'http://127.0.0.1:8787/v1/messages'
+    })
+    def test_anthropic_api_url_override(self):
+        """Test pointing the model API at a local stand-in"""
+        config = Config()
+        assert config.anthropic_api_url == 'http://127.0.0.1:8787/v1/messages'
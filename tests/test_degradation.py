@@ -0,0 +1,122 @@
+"""
+Tests for load-adaptive degradation tiers.
+"""
+import pytest
+from unittest.mock import Mock, patch
+from src.degradation import LATENCY_WINDOW, TierSelector, UpstreamHeadroom, choose_tier, FULL, REDUCED, LOCATION_ONLY
+from src.ai_search import ClaudeSearcher
+from src.circuit_breaker import CircuitBreaker
+from src.metrics import Metrics
+from src.retry import RetryPolicy
+
+
+@pytest.fixture
+def selector():
+    return TierSelector(
+        reduced_queue_depth=10, location_queue_depth=30,
+        reduced_p95=40, location_p95=70,
+        reduced_headroom=0.2, location_headroom=0.05
+    )
+
+
+class TestTierSelector:
+    """Test tier choice from load signals"""
+    
+    def test_idle_is_full(self, selector):
+        assert selector.choose(0, None, None) is FULL
+        assert selector.choose(5, 10.0, 0.9) is FULL
+    
+    def test_queue_depth(self, selector):
+        assert selector.choose(10, None, None) is REDUCED
+        assert selector.choose(30, None, None) is LOCATION_ONLY
+    
+    def test_latency(self, selector):
+        assert selector.choose(0, 45.0, None) is REDUCED
+        assert selector.choose(0, 80.0, None) is LOCATION_ONLY
+    
+    def test_headroom(self, selector):
+        assert selector.choose(0, None, 0.15) is REDUCED
+        assert selector.choose(0, None, 0.01) is LOCATION_ONLY
+    
+    def test_worst_signal_wins(self, selector):
+        assert selector.choose(12, 80.0, 0.9) is LOCATION_ONLY
+
+
+class TestUpstreamHeadroom:
+    """Test rate-limit header parsing"""
+    
+    def test_minimum_across_limits(self):
+        headroom = UpstreamHeadroom()
+        headroom.update({
+            'anthropic-ratelimit-requests-remaining': '40',
+            'anthropic-ratelimit-requests-limit': '50',
+            'anthropic-ratelimit-tokens-remaining': '1000',
+            'anthropic-ratelimit-tokens-limit': '10000',
+        })
+        assert headroom.fraction() == pytest.approx(0.1)
+    
+    def test_unknown_without_headers(self):
+        headroom = UpstreamHeadroom()
+        headroom.update({})
+        assert headroom.fraction() is None
+
+
+class TestChooseTier:
+    """Test the live signals feeding the selector"""
+    
+    @pytest.fixture
+    def latency(self, clock, selector):
+        metrics = Metrics(clock=clock)
+        with patch('src.degradation.metrics', metrics), \
+             patch('src.degradation.tier_selector', selector), \
+             patch('src.degradation.upstream_headroom', UpstreamHeadroom()):
+            yield metrics
+    
+    def test_recovers_once_slow_samples_age_out(self, latency, clock):
+        for _ in range(50):
+            latency.observe('model_api.attempt_seconds', 80.0)
+        assert choose_tier(0) is LOCATION_ONLY
+        
+        # Location-only predictions add no samples; the old ones still expire
+        clock.now += LATENCY_WINDOW - 1
+        assert choose_tier(0) is LOCATION_ONLY
+        clock.now += 2
+        assert choose_tier(0) is FULL
+    
+    def test_only_recent_samples_count(self, latency, clock):
+        for _ in range(50):
+            latency.observe('model_api.attempt_seconds', 80.0)
+        clock.now += LATENCY_WINDOW + 1
+        for _ in range(10):
+            latency.observe('model_api.attempt_seconds', 45.0)
+        
+        assert choose_tier(0) is REDUCED
+        assert latency.percentile('model_api.attempt_seconds', 95) == 80.0
+
+
+class TestSearchPersonTiers:
+    """Test that the tier shapes the request and is recorded"""
+    
+    def _searcher(self):
+        return ClaudeSearcher('key', RetryPolicy(max_attempts=1, deadline=60), CircuitBreaker('test'))
+    
+    @patch('src.ai_search.requests.post')
+    def test_reduced_tier_payload(self, mock_post):
+        mock_post.return_value = Mock(status_code=200, headers={}, json=Mock(return_value={
+            'content': [{'type': 'text', 'text': '{"college": "UCLA", "confidence": 50}'}]
+        }))
+        
+        result = self._searcher().search_person('Jane Doe', 25, 'Los Angeles', tier=REDUCED)
+        
+        payload = mock_post.call_args.kwargs['json']
+        assert payload['max_tokens'] == REDUCED.max_tokens
+        assert payload['tools'][0]['max_uses'] == REDUCED.max_web_searches
+        assert result['tier'] == 'reduced'
+    
+    @patch('src.ai_search.requests.post')
+    def test_location_only_skips_api(self, mock_post):
+        result = self._searcher().search_person('Jane Doe', 25, 'Seattle', tier=LOCATION_ONLY)
+        
+        mock_post.assert_not_called()
+        assert result['college'] == 'University of Washington'
+        assert result['tier'] == 'location_only'
@@ -0,0 +1,148 @@
+"""
+Tests for the buffered event log.
+"""
+import glob
+import json
+import os
+import time
+import pytest
+from src import web_app
+from src.event_log import EventSink
+
+
+def read_events(directory):
+    records = []
+    for path in sorted(glob.glob(os.path.join(directory, 'events*.jsonl'))):
+        with open(path) as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+class TestEventSink:
+    """Test buffering, flushing and rotation"""
+
+    def test_emit_only_buffers(self, tmp_path):
+        sink = EventSink(str(tmp_path), flush_size=100, flush_interval=60)
+        sink.emit('signup', s='abc')
+
+        assert sink.pending() == 1
+        assert not os.path.exists(sink.active_path)
+        sink.close()
+
+    def test_flush_writes_compact_json_lines(self, tmp_path):
+        sink = EventSink(str(tmp_path), flush_size=100, flush_interval=60)
+        sink.emit('feedback', s='abc', correct=True, confidence=80)
+        sink.flush()
+
+        with open(sink.active_path) as f:
+            line = f.readline()
+        assert ', ' not in line
+        record = json.loads(line)
+        assert record['e'] == 'feedback'
+        assert record['correct'] is True
+        assert record['confidence'] == 80
+        assert 't' in record
+        sink.close()
+
+    def test_close_flushes_pending(self, tmp_path):
+        sink = EventSink(str(tmp_path), flush_size=100, flush_interval=60)
+        for i in range(5):
+            sink.emit('game_complete', game=i)
+        sink.close()
+
+        assert [r['game'] for r in read_events(str(tmp_path))] == [0, 1, 2, 3, 4]
+
+    def test_writer_flushes_at_size(self, tmp_path):
+        sink = EventSink(str(tmp_path), flush_size=3, flush_interval=60)
+        for i in range(3):
+            sink.emit('reveal', n=i)
+
+        deadline = 50
+        while sink.pending() and deadline:
+            time.sleep(0.05)
+            deadline -= 1
+        assert sink.pending() == 0
+        sink.close()
+        assert len(read_events(str(tmp_path))) == 3
+
+    def test_rotates_by_size(self, tmp_path):
+        sink = EventSink(str(tmp_path), flush_size=100, flush_interval=60, max_bytes=200)
+        for i in range(10):
+            sink.emit('signup', s='x' * 40, n=i)
+            sink.flush()
+        sink.close()
+
+        rotated = glob.glob(os.path.join(str(tmp_path), 'events-*.jsonl'))
+        assert rotated
+        assert all(os.path.getsize(p) <= 200 for p in rotated)
+        assert sorted(r['n'] for r in read_events(str(tmp_path))) == list(range(10))
+
+    def test_drops_when_buffer_full(self, tmp_path):
+        sink = EventSink(str(tmp_path), flush_size=100, flush_interval=60, max_buffer=2)
+        for _ in range(5):
+            sink.emit('signup')
+
+        assert sink.pending() == 2
+        sink.close()
+
+    def test_emit_after_close_is_ignored(self, tmp_path):
+        sink = EventSink(str(tmp_path), flush_size=100, flush_interval=60)
+        sink.close()
+        sink.emit('signup')
+
+        assert sink.pending() == 0
+
+
+class TestEventRoutes:
+    """/log-result and /submit-feedback through the Flask test client"""
+
+    @pytest.fixture
+    def client(self, isolated_store):
+        client = web_app.app.test_client()
+        client.get('/game/1')
+        return client
+
+    def recorded(self, event):
+        web_app.events.flush()
+        return [record for record in read_events(web_app.events.directory) if record['e'] == event]
+
+    def test_log_result_keeps_allowed_fields(self, client):
+        response = client.post('/log-result', json={
+            'game': 2, 'score': 87.5, 'correct': True, 'result': '<b>win</b>',
+            'user_agent': 'Mozilla/5.0', 'nested': {'score': 1}, 'attempts': [1, 2]
+        })
+
+        assert response.get_json() == {'status': 'ok'}
+        [record] = self.recorded('game_result')
+        assert record['game'] == 2 and record['score'] == 87.5 and record['correct'] is True
+        assert record['result'] == 'bwin/b'
+        assert 'user_agent' not in record and 'nested' not in record and 'attempts' not in record
+
+    def test_log_result_truncates_strings(self, client):
+        client.post('/log-result', json={'result': 'x' * 500})
+        [record] = self.recorded('game_result')
+        assert record['result'] == 'x' * 50
+
+    def test_log_result_without_body(self, client):
+        assert client.post('/log-result', data='not json').status_code == 200
+        [record] = self.recorded('game_result')
+        assert not set(record) & set(web_app.LOG_RESULT_FIELDS)
+
+    def test_feedback_json(self, client):
+        with client.session_transaction() as sess:
+            token_hash = web_app.hash_token(sess['session_token'])
+        web_app.store_prediction(token_hash, {'college': 'Rice University', 'confidence': 62, 'tier': 'full'})
+
+        assert client.post('/submit-feedback', json={'correct': True}).status_code == 204
+        [record] = self.recorded('feedback')
+        assert record['s'] == token_hash
+        assert record['correct'] is True
+        assert record['confidence'] == 62 and record['tier'] == 'full' and record['provisional'] is False
+
+    def test_feedback_form_redirects(self, client):
+        response = client.post('/submit-feedback', data={'correct': 'no'})
+
+        assert response.status_code == 302
+        [record] = self.recorded('feedback')
+        assert record['correct'] is False
+        assert record['confidence'] is None
@@ -0,0 +1,113 @@
+"""
+Tests for streaming funnel analytics.
+"""
+import gzip
+import json
+import os
+import pytest
+from src.funnel_analytics import (
+    LatencyHistogram, FunnelStats, confidence_band, log_files, parse_events, summarize
+)
+
+
+def write_log(path, records, extra=''):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+        f.write(extra)
+
+
+SESSION = [
+    {'e': 'signup', 's': 'a'},
+    {'e': 'game_complete', 's': 'a', 'game': 1},
+    {'e': 'game_complete', 's': 'a', 'game': 2},
+    {'e': 'prediction', 's': 'a', 'seconds': 12.0, 'confidence': 80},
+    {'e': 'game_complete', 's': 'a', 'game': 3},
+    {'e': 'reveal', 's': 'a', 'confidence': 80},
+    {'e': 'feedback', 's': 'a', 'correct': True, 'confidence': 80},
+]
+
+
+class TestLatencyHistogram:
+    """Test approximate percentiles"""
+
+    def test_percentiles_within_bucket_error(self):
+        hist = LatencyHistogram()
+        for i in range(1, 101):
+            hist.add(float(i))
+
+        assert hist.percentile(50) == pytest.approx(50, rel=0.07)
+        assert hist.percentile(99) == pytest.approx(99, rel=0.07)
+
+    def test_empty(self):
+        assert LatencyHistogram().percentile(50) is None
+
+    def test_merge_equals_combined(self):
+        a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i in range(50):
+            a.add(i * 0.5)
+            both.add(i * 0.5)
+        for i in range(50):
+            b.add(30 + i)
+            both.add(30 + i)
+        a.merge(b)
+
+        assert a.counts == both.counts
+        assert a.percentile(90) == both.percentile(90)
+
+
+class TestFunnel:
+    """Test log parsing and summaries"""
+
+    def test_confidence_bands(self):
+        assert confidence_band(0) == '0-24'
+        assert confidence_band(50) == '50-74'
+        assert confidence_band(100) == '75-100'
+        assert confidence_band(None) == 'unknown'
+
+    def test_skips_bad_lines(self):
+        lines = ['{"e":"signup"}\n', '\n', '{"e":"sig', '[1,2]', '{"no_event":1}']
+        assert [r['e'] for r in parse_events(lines)] == ['signup']
+
+    def test_log_files_order(self, tmp_path):
+        for name in ('events.jsonl', 'events-20240102.jsonl', 'events-20240101.jsonl.gz'):
+            (tmp_path / name).write_text('')
+
+        assert [os.path.basename(p) for p in log_files(str(tmp_path))] == [
+            'events-20240101.jsonl.gz', 'events-20240102.jsonl', 'events.jsonl'
+        ]
+
+    def test_summary(self, tmp_path):
+        write_log(str(tmp_path / 'events-1.jsonl.gz'), SESSION)
+        write_log(str(tmp_path / 'events.jsonl'), [
+            {'e': 'signup', 's': 'b'},
+            {'e': 'game_complete', 's': 'b', 'game': 1},
+            {'e': 'prediction', 's': 'b', 'seconds': 30.0, 'error': True},
+            {'e': 'feedback', 's': 'b', 'correct': False, 'confidence': 10},
+        ], extra='{"e":"trunc')
+
+        summary = summarize(log_files(str(tmp_path))).to_dict()
+
+        counts = {step['stage']: step['count'] for step in summary['funnel']}
+        assert counts == {'signup': 2, 'game1': 2, 'game2': 1, 'game3': 1, 'reveal': 1}
+        assert summary['funnel'][2]['from_previous'] == 0.5
+        assert summary['prediction_latency']['count'] == 2
+        assert summary['prediction_latency']['errors'] == 1
+        bands = {b['band']: (b['correct'], b['total']) for b in summary['accuracy_by_confidence']}
+        assert bands == {'0-24': (0, 1), '75-100': (1, 1)}
+
+    def test_process_pool_matches_serial(self, tmp_path):
+        for i in range(3):
+            write_log(str(tmp_path / f'events-{i}.jsonl'), SESSION)
+        paths = log_files(str(tmp_path))
+
+        assert summarize(paths, workers=2).to_dict() == summarize(paths).to_dict()
+
+    def test_merge(self):
+        a, b = FunnelStats(), FunnelStats()
+        for record in SESSION:
+            a.add(record)
+            b.add(record)
+
+        assert a.merge(b).stages['signup'] == 2
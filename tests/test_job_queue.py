@@ -0,0 +1,314 @@
+"""
+Tests for the durable prediction job queue.
+"""
+import threading
+import time
+import pytest
+from src.job_queue import DONE, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / 'jobs.db'), ttl=3600, lease=120, max_attempts=3, clock=clock)
+
+
+PAYLOAD = {'name': 'Jane Doe', 'age': 20, 'location': 'Boston'}
+
+
+class TestJobQueue:
+    """Test enqueue, claim, completion and expiry"""
+
+    def test_claim_returns_payload(self, queue):
+        assert queue.enqueue('s1', 'k1', PAYLOAD)
+        job = queue.claim()
+
+        assert job == {'token_hash': 's1', 'key': 'k1', 'payload': PAYLOAD, 'attempts': 1}
+        assert queue.status('s1') == 'running'
+        assert queue.claim() is None
+
+    def test_same_key_is_not_requeued(self, queue):
+        queue.enqueue('s1', 'k1', PAYLOAD)
+        queue.claim()
+
+        assert not queue.enqueue('s1', 'k1', PAYLOAD)
+        assert queue.status('s1') == 'running'
+
+    def test_new_key_replaces_job(self, queue):
+        queue.enqueue('s1', 'k1', PAYLOAD)
+        queue.claim()
+
+        assert queue.enqueue('s1', 'k2', PAYLOAD)
+        assert queue.claim()['key'] == 'k2'
+        # The superseded run cannot complete the replacement
+        assert not queue.complete('s1', 'k1', {'college': 'Old'})
+
+    def test_enqueue_claimed_leaves_nothing_to_claim(self, queue, clock):
+        assert queue.enqueue_claimed('s1', 'k1', PAYLOAD)
+
+        assert queue.status('s1') == 'running'
+        assert queue.claim() is None
+        # Same job under a live lease: held by someone else
+        assert not queue.enqueue_claimed('s1', 'k1', PAYLOAD)
+        clock.now += 121
+        assert queue.enqueue_claimed('s1', 'k1', PAYLOAD)
+        queue.complete('s1', 'k1', {'college': 'MIT'})
+        assert not queue.enqueue_claimed('s1', 'k1', PAYLOAD)
+        assert queue.enqueue_claimed('s1', 'k2', PAYLOAD)
+
+    def test_complete_stores_result_and_drops_inputs(self, queue):
+        queue.enqueue('s1', 'k1', PAYLOAD)
+        queue.claim()
+
+        assert queue.complete('s1', 'k1', {'college': 'MIT'})
+        assert queue.result('s1') == {'college': 'MIT'}
+        with queue._connect() as conn:
+            assert conn.execute('SELECT payload FROM jobs').fetchone()[0] is None
+
+    def test_expired_lease_is_reclaimed(self, queue, clock):
+        queue.enqueue('s1', 'k1', PAYLOAD)
+        queue.claim()
+        clock.now += 60
+        assert queue.claim() is None
+
+        clock.now += 61
+        job = queue.claim()
+        assert job['token_hash'] == 's1'
+        assert job['attempts'] == 2
+
+    def test_fail_retries_until_max_attempts(self, queue):
+        queue.enqueue('s1', 'k1', PAYLOAD)
+        for _ in range(3):
+            assert queue.claim() is not None
+            queue.fail('s1', 'k1')
+
+        assert queue.status('s1') == 'failed'
+        assert queue.claim() is None
+
+    def test_claim_specific_session(self, queue):
+        queue.enqueue('s1', 'k1', PAYLOAD)
+        queue.enqueue('s2', 'k2', PAYLOAD)
+
+        assert queue.claim('s2')['token_hash'] == 's2'
+
+    def test_purge_after_ttl(self, queue, clock):
+        queue.enqueue('s1', 'k1', PAYLOAD)
+        queue.claim()
+        queue.complete('s1', 'k1', {'college': 'MIT'})
+        clock.now += 3601
+
+        assert queue.result('s1') is None
+        assert queue.purge() == 1
+        assert queue.status('s1') is None
+
+    def test_survives_reopen(self, tmp_path, clock):
+        path = str(tmp_path / 'jobs.db')
+        JobQueue(path, clock=clock).enqueue('s1', 'k1', PAYLOAD)
+
+        assert JobQueue(path, clock=clock).claim()['token_hash'] == 's1'
+
+    def test_concurrent_claims_are_exclusive(self, queue):
+        for i in range(20):
+            queue.enqueue(f's{i}', 'k', PAYLOAD)
+        claimed = []
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                job = queue.claim()
+                if job is None:
+                    return
+                with lock:
+                    claimed.append(job['token_hash'])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(claimed) == sorted(f's{i}' for i in range(20))
+
+    def test_thread_reuses_its_connection(self, queue):
+        with queue._connect() as first:
+            assert first.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        queue.enqueue('s1', 'k1', PAYLOAD)
+        queue.claim()
+        with queue._connect() as again:
+            assert again is first
+
+        other = []
+
+        def connect():
+            with queue._connect() as conn:
+                other.append(conn)
+
+        thread = threading.Thread(target=connect)
+        thread.start()
+        thread.join()
+        assert other[0] is not first
+
+    def test_connection_dropped_after_error(self, queue):
+        with queue._connect() as first:
+            pass
+        with pytest.raises(RuntimeError):
+            with queue._connect():
+                raise RuntimeError('boom')
+        with queue._connect() as second:
+            assert second is not first
+        assert queue.status('s1') is None
+
+    def test_unwritable_path_degrades(self, tmp_path):
+        blocker = tmp_path / 'file'
+        blocker.write_text('')
+        queue = JobQueue(str(blocker / 'jobs.db'))
+
+        assert queue.enqueue('s1', 'k1', PAYLOAD) is False
+        assert queue.claim() is None
+
+
+class TestWebAppPredictions:
+    """start_background_prediction against the queue"""
+
+    @pytest.fixture
+    def blocked_model(self, isolated_store, monkeypatch):
+        """Model calls block until released; yields (release event, call list)"""
+        from src import web_app
+        from src.prediction_jobs import PredictionJobs
+        release, calls = threading.Event(), []
+
+        def search_person(self, name, age, location, tier=None):
+            calls.append(name)
+            release.wait(5)
+            return {'college': 'Rice University', 'career': 'Analyst', 'personality': 'curious', 'confidence': 60}
+
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+        monkeypatch.setattr(web_app.DeepSeekSearcher, 'search_person', search_person)
+        monkeypatch.setattr(web_app, 'prediction_jobs', PredictionJobs(idle_timeout=60, max_age=3600))
+        yield release, calls
+        release.set()
+
+    def wait_for_jobs(self):
+        from src import web_app
+        deadline = time.monotonic() + 5
+        while web_app.prediction_jobs.active_count() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_resubmits_while_running_are_deduplicated(self, blocked_model):
+        from src import web_app
+        from src.metrics import metrics
+        release, calls = blocked_model
+        before = metrics.count('prediction_jobs.deduplicated')
+        for _ in range(4):
+            web_app.start_background_prediction('t1', 'Jane Doe', 25, 'Austin, TX')
+
+        assert metrics.count('prediction_jobs.deduplicated') - before == 3
+        release.set()
+        self.wait_for_jobs()
+        assert calls == ['Jane Doe']
+        assert web_app.get_prediction('t1').college == 'Rice University'
+        assert web_app.job_queue.status('t1') == DONE
+
+    def test_request_thread_does_no_queue_io(self, blocked_model, monkeypatch):
+        from src import web_app
+        release, calls = blocked_model
+        request_thread = threading.current_thread()
+        operations = []
+        safely = web_app.job_queue._safely
+
+        def spy(operation, fn, default=None):
+            if threading.current_thread() is request_thread:
+                operations.append(operation)
+            return safely(operation, fn, default)
+
+        monkeypatch.setattr(web_app.job_queue, '_safely', spy)
+        client = web_app.app.test_client()
+        signup = {
+            'first_name': 'Jane', 'last_name': 'Doe', 'dob': '1999-07-04',
+            'location': 'Austin, TX', 'agree_terms': 'on', 'confirm_age': 'on'
+        }
+        client.post('/signup', data=signup)
+        client.post('/signup', data=signup)
+        assert client.get('/reveal/status').get_json()['pending'] is True
+        assert operations == []
+
+        release.set()
+        self.wait_for_jobs()
+        assert client.get('/reveal/status').get_json()['provisional'] is False
+        assert operations == []
+        assert web_app.job_queue.status(web_app.hash_token(self.session_token(client))) == DONE
+
+    def test_recovery_cannot_take_a_job_being_started(self, blocked_model, monkeypatch):
+        from src import web_app
+        release, calls = blocked_model
+        from src.metrics import metrics
+        enqueue_claimed = web_app.job_queue.enqueue_claimed
+        resumed = metrics.count('job_queue.resumed')
+
+        def then_recover(*args):
+            held = enqueue_claimed(*args)
+            # The recovery loop runs right after the row is written
+            web_app.recover_queued_predictions()
+            return held
+
+        monkeypatch.setattr(web_app.job_queue, 'enqueue_claimed', then_recover)
+        web_app.start_background_prediction('t1', 'Jane Doe', 25, 'Austin, TX')
+        release.set()
+        self.wait_for_jobs()
+
+        assert metrics.count('job_queue.resumed') == resumed
+        assert calls == ['Jane Doe']
+        assert web_app.get_prediction('t1').college == 'Rice University'
+        assert web_app.job_queue.status('t1') == DONE
+
+    @staticmethod
+    def session_token(client):
+        with client.session_transaction() as sess:
+            return sess['session_token']
+
+    def test_result_from_another_worker_replaces_provisional(self, isolated_store):
+        from src import web_app
+        web_app.store_prediction('t1', web_app.DeepSeekSearcher.provisional_prediction('Jane Doe', 25, 'Austin, TX'))
+        web_app.job_queue.enqueue('t1', 'k1', PAYLOAD)
+        web_app.job_queue.claim('t1')
+        assert web_app.get_prediction('t1').provisional
+
+        web_app.job_queue.complete('t1', 'k1', {'college': 'Rice University', 'confidence': 60})
+        record = web_app.get_prediction('t1')
+        assert record.college == 'Rice University' and not record.provisional
+
+    def test_superseded_answer_not_stored(self, isolated_store):
+        from src import web_app
+        from src.prediction_record import PredictionRecord
+        # New inputs (k2) started after the k1 job passed its last cancel check
+        web_app.predictions_cache['t1'] = PredictionRecord(college='Guess U', provisional=True, key='k2')
+        web_app.job_queue.enqueue_claimed('t1', 'k1', PAYLOAD)
+
+        assert web_app.upgrade_prediction('t1', {'college': 'Old U', 'confidence': 70}, 'k1') is False
+        assert web_app.upgrade_prediction('t1', {'college': 'Error', 'error': 'timeout'}, 'k1') is False
+        web_app.persist_prediction('t1', 'k1')
+        record = web_app.get_prediction('t1')
+        assert record.college == 'Guess U' and record.provisional
+        assert web_app.job_queue.status('t1') == 'running'
+
+        assert web_app.upgrade_prediction('t1', {'college': 'Rice University', 'confidence': 60}, 'k2') is True
+        assert web_app.get_prediction('t1').college == 'Rice University'
+
+    def test_duplicate_signups_counted(self, blocked_model, monkeypatch):
+        from src import web_app
+        from src.admission import SlidingWindowLimiter
+        from src.metrics import metrics
+        release, calls = blocked_model
+        monkeypatch.setattr(web_app, 'ip_admission', SlidingWindowLimiter('ip', 1000, 600))
+        monkeypatch.setattr(web_app, 'session_admission', SlidingWindowLimiter('session', 1000, 600))
+        client = web_app.app.test_client()
+        before = metrics.count('prediction_jobs.deduplicated')
+        for _ in range(4):
+            assert client.post('/signup', data={
+                'first_name': 'Jane', 'last_name': 'Doe', 'dob': '1999-07-04',
+                'location': 'Austin, TX', 'agree_terms': 'on', 'confirm_age': 'on'
+            }).status_code == 302
+
+        assert metrics.count('prediction_jobs.deduplicated') - before == 3
+        release.set()
+        self.wait_for_jobs()
+        assert calls == ['Jane Doe']
@@ -0,0 +1,68 @@
+"""
+Tests for LinkedIn client connection reuse and endpoint memo.
+"""
+import pytest
+from unittest.mock import Mock, patch
+from src.linkedin_client import LinkedInClient
+
+
+def _response(status_code, body=None):
+    response = Mock()
+    response.status_code = status_code
+    response.text = ''
+    response.json.return_value = body if body is not None else {}
+    return response
+
+
+@pytest.fixture
+def client():
+    auth = Mock()
+    auth.get_access_token.return_value = 'token'
+    with patch('src.linkedin_client.RateLimiter') as limiter:
+        limiter.return_value.acquire.return_value = True
+        client = LinkedInClient(auth)
+    client.session = Mock()
+    return client
+
+
+class TestLinkedInClientSession:
+    """Test pooled session use and endpoint resolution"""
+    
+    def test_requests_use_persistent_session(self, client):
+        client.session.request.return_value = _response(200, {'id': 'abc'})
+        
+        client.get_my_profile()
+        client.get_my_profile()
+        
+        assert client.session.request.call_count == 2
+        headers = client.session.request.call_args.kwargs['headers']
+        assert headers == {'Authorization': 'Bearer token'}
+    
+    def test_education_endpoint_remembered(self, client):
+        calls = []
+        
+        def request(method, url, **kwargs):
+            calls.append(url)
+            if url.endswith('?projection=(education)'):
+                return _response(200, {'education': [{'schoolName': 'Rice'}]})
+            return _response(404)
+        
+        client.session.request.side_effect = request
+        
+        assert client.get_my_education() == [{'schoolName': 'Rice'}]
+        assert len(calls) == 4
+        
+        calls.clear()
+        assert client.get_my_education() == [{'schoolName': 'Rice'}]
+        assert len(calls) == 1
+        assert calls[0].endswith('people/me?projection=(education)')
+    
+    def test_falls_back_when_remembered_endpoint_fails(self, client):
+        client._endpoint_memo['education'] = 3
+        client.session.request.side_effect = [
+            _response(500),
+            _response(200, {'elements': [{'schoolName': 'UCLA'}]}),
+        ]
+        
+        assert client.get_my_education() == [{'schoolName': 'UCLA'}]
+        assert client._endpoint_memo['education'] == 0
@@ -0,0 +1,106 @@
+"""
+Tests for tracemalloc-based memory diagnostics.
+"""
+import time
+import tracemalloc
+import pytest
+from src.config import config
+from src.memory_diagnostics import MemoryDiagnostics
+
+LEAK = []
+
+
+def leaky_function():
+    LEAK.extend(bytearray(1000) for _ in range(500))
+
+
+@pytest.fixture
+def diagnostics():
+    was_tracing = tracemalloc.is_tracing()
+    diagnostics = MemoryDiagnostics()
+    yield diagnostics
+    LEAK.clear()
+    if not was_tracing:
+        diagnostics.stop()
+
+
+class TestMemoryDiagnostics:
+    """Test snapshot diffs and structure reporting"""
+
+    def test_diff_finds_growth_site(self, diagnostics):
+        first = diagnostics.report()
+        assert first['diff'] is False
+
+        leaky_function()
+        report = diagnostics.report(limit=5)
+
+        assert report['diff'] is True
+        top = report['top'][0]
+        assert 'test_memory_diagnostics.py' in top['site']
+        assert top['size_diff'] >= 500 * 1000
+
+    def test_tracing_stops_after_window(self):
+        if tracemalloc.is_tracing():
+            pytest.skip('tracing already on for this process')
+        diagnostics = MemoryDiagnostics(window=0.1)
+        diagnostics.report()
+        assert tracemalloc.is_tracing()
+
+        deadline = time.monotonic() + 2
+        while tracemalloc.is_tracing() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert not tracemalloc.is_tracing()
+        assert diagnostics.report()['diff'] is False
+        diagnostics.stop()
+
+    def test_structures(self, diagnostics):
+        diagnostics.register('cache', lambda: 3)
+        diagnostics.register('broken', lambda: 1 / 0)
+
+        structures = diagnostics.report()['structures']
+        assert structures['cache'] == 3
+        assert structures['broken'].startswith('error')
+
+    def test_threads(self, diagnostics):
+        threads = diagnostics.threads()
+
+        assert threads['count'] >= 1
+        assert threads['by_name']['MainThread'] == 1
+
+
+class TestMemoryEndpoint:
+    """Test the admin-only endpoint"""
+
+    def test_hidden_without_admin_token(self, monkeypatch):
+        from src import web_app
+        monkeypatch.setattr(config, 'admin_token', 'secret')
+
+        response = web_app.app.test_client().get('/admin/memory', headers={'X-Admin-Token': 'nope'})
+
+        assert response.status_code == 404
+
+    def test_report_with_admin_token(self, monkeypatch, diagnostics):
+        from src import web_app
+        monkeypatch.setattr(config, 'admin_token', 'secret')
+        monkeypatch.setattr(web_app, 'diagnostics', diagnostics)
+        diagnostics.register('predictions_cache', lambda: len(web_app.predictions_cache))
+
+        response = web_app.app.test_client().get('/admin/memory?top=3', headers={'X-Admin-Token': 'secret'})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['top']) <= 3
+        assert 'predictions_cache' in data['structures']
+
+    def test_stop_ends_tracing(self, monkeypatch, diagnostics):
+        from src import web_app
+        monkeypatch.setattr(config, 'admin_token', 'secret')
+        monkeypatch.setattr(web_app, 'diagnostics', diagnostics)
+        client = web_app.app.test_client()
+        client.get('/admin/memory', headers={'X-Admin-Token': 'secret'})
+        assert tracemalloc.is_tracing()
+
+        response = client.get('/admin/memory?stop=1', headers={'X-Admin-Token': 'secret'})
+
+        assert response.get_json() == {'tracing': False}
+        assert not tracemalloc.is_tracing()
@@ -0,0 +1,312 @@
+"""
+Tests for cancellable prediction jobs.
+"""
+import socket
+import threading
+import time
+import pytest
+import requests
+from src import web_app
+from src.cancellation import CancelToken, AbortableAdapter
+from src.prediction_jobs import PredictionJobs
+
+
+def _blocking_job(started, finished):
+    def target(cancel_token):
+        started.set()
+        cancel_token.wait(5)
+        finished.append(cancel_token.reason)
+    return target
+
+
+class TestCancelToken:
+    """Test cancel token semantics"""
+    
+    def test_cancel_once(self):
+        token = CancelToken()
+        assert token.cancel('idle') is True
+        assert token.cancel('abandoned') is False
+        assert token.reason == 'idle'
+    
+    def test_callbacks_run_on_cancel(self):
+        token = CancelToken()
+        calls = []
+        token.on_cancel(lambda: calls.append(1))
+        token.cancel()
+        token.on_cancel(lambda: calls.append(2))
+        
+        assert calls == [1, 2]
+
+
+class TestAbortableAdapter:
+    """Test that abort unblocks an in-flight request"""
+    
+    def test_abort_unblocks_waiting_request(self):
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        accepted = []
+        threading.Thread(target=lambda: accepted.append(server.accept()), daemon=True).start()
+        
+        adapter = AbortableAdapter()
+        http = requests.Session()
+        http.mount('http://', adapter)
+        threading.Timer(0.2, adapter.abort).start()
+        
+        started = time.monotonic()
+        with pytest.raises(requests.exceptions.ConnectionError):
+            http.post(f"http://127.0.0.1:{server.getsockname()[1]}/", json={}, timeout=10)
+        
+        assert time.monotonic() - started < 5
+        server.close()
+
+
+class TestPredictionJobs:
+    """Test job registry cancellation rules"""
+    
+    def test_explicit_cancel(self):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600)
+        started, finished = threading.Event(), []
+        job = jobs.start('abc', _blocking_job(started, finished))
+        started.wait(1)
+        
+        assert jobs.cancel('abc', 'abandoned') is True
+        job.thread.join(1)
+        
+        assert finished == ['abandoned']
+        assert jobs.active_count() == 0
+    
+    def test_idle_jobs_reaped(self, clock):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600, clock=clock)
+        started, finished = threading.Event(), []
+        job = jobs.start('abc', _blocking_job(started, finished))
+        started.wait(1)
+        
+        clock.now += 30
+        jobs.touch('abc')
+        clock.now += 59
+        assert jobs.reap() == 0
+        
+        clock.now += 1
+        assert jobs.reap() == 1
+        job.thread.join(1)
+        assert finished == ['idle']
+    
+    def test_left_job_reaped_after_grace(self, clock):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600, clock=clock)
+        started, finished = threading.Event(), []
+        job = jobs.start('abc', _blocking_job(started, finished))
+        started.wait(1)
+        
+        jobs.leave('abc', grace=20)
+        clock.now += 19
+        assert jobs.reap() == 0
+        clock.now += 1
+        assert jobs.reap() == 1
+        job.thread.join(1)
+        assert finished == ['idle']
+    
+    def test_touch_after_leave_keeps_job(self, clock):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600, clock=clock)
+        job = jobs.start('abc', _blocking_job(threading.Event(), []))
+        
+        jobs.leave('abc', grace=20)
+        clock.now += 10
+        jobs.touch('abc')
+        clock.now += 30
+        assert jobs.reap() == 0
+        jobs.cancel('abc')
+        job.thread.join(1)
+    
+    def test_held_job_not_idle_until_touched(self, clock):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600, clock=clock)
+        job = jobs.start('abc', _blocking_job(threading.Event(), []))
+        
+        jobs.hold('abc')
+        clock.now += 600
+        assert jobs.reap() == 0
+        jobs.touch('abc')
+        clock.now += 60
+        assert jobs.reap() == 1
+        job.thread.join(1)
+    
+    def test_held_job_still_expires(self, clock):
+        jobs = PredictionJobs(idle_timeout=60, max_age=100, clock=clock)
+        job = jobs.start('abc', _blocking_job(threading.Event(), []))
+        
+        jobs.hold('abc')
+        clock.now += 100
+        assert jobs.reap() == 1
+        job.thread.join(1)
+        assert job.cancel_token.reason == 'expired'
+    
+    def test_expired_jobs_reaped(self, clock):
+        jobs = PredictionJobs(idle_timeout=60, max_age=100, clock=clock)
+        started, finished = threading.Event(), []
+        job = jobs.start('abc', _blocking_job(started, finished))
+        started.wait(1)
+        
+        for _ in range(4):
+            clock.now += 25
+            jobs.touch('abc')
+        
+        assert jobs.reap() == 1
+        job.thread.join(1)
+        assert finished == ['expired']
+    
+    def test_finished_job_removed(self):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600)
+        job = jobs.start('abc', lambda cancel_token: None)
+        job.thread.join(1)
+        
+        assert jobs.get('abc') is None
+        assert jobs.cancel('abc') is False
+
+
+class TestSingleFlight:
+    """Test per-session dedup of prediction jobs"""
+    
+    def test_same_key_reuses_pending_job(self):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600)
+        started, finished = threading.Event(), []
+        first = jobs.start('abc', _blocking_job(started, finished), key='k1')
+        second = jobs.start('abc', _blocking_job(threading.Event(), finished), key='k1')
+        
+        assert second is first
+        assert jobs.active_count() == 1
+        jobs.cancel('abc')
+        first.thread.join(1)
+        assert finished == ['abandoned']
+    
+    def test_different_key_supersedes(self):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600)
+        started, finished = threading.Event(), []
+        first = jobs.start('abc', _blocking_job(started, finished), key='k1')
+        started.wait(1)
+        second = jobs.start('abc', _blocking_job(threading.Event(), []), key='k2')
+        first.thread.join(1)
+        
+        assert second is not first
+        assert finished == ['superseded']
+        assert jobs.get('abc') is second
+        jobs.cancel('abc')
+    
+    def test_concurrent_starts_run_once(self):
+        jobs = PredictionJobs(idle_timeout=60, max_age=3600)
+        runs = []
+        release = threading.Event()
+        
+        def target(cancel_token):
+            runs.append(1)
+            release.wait(2)
+        
+        barrier = threading.Barrier(8)
+        
+        def submit():
+            barrier.wait()
+            jobs.start('abc', target, key='same')
+        
+        threads = [threading.Thread(target=submit) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        release.set()
+        jobs.get('abc').thread.join(2)
+        
+        assert len(runs) == 1
+
+
+class TestAbandonRoutes:
+    """/abandon and /activity from the game and reveal pages"""
+    
+    @pytest.fixture
+    def jobs(self, isolated_store, clock, monkeypatch):
+        jobs = PredictionJobs(idle_timeout=45, max_age=3600, clock=clock)
+        monkeypatch.setattr(web_app, 'prediction_jobs', jobs)
+        monkeypatch.setattr(web_app.config, 'session_activity_interval', 15)
+        return jobs
+    
+    @pytest.fixture
+    def player(self, jobs):
+        """A client on /game/1 with a running prediction; (client, token hash, job)"""
+        client = web_app.app.test_client()
+        client.get('/game/1')
+        with client.session_transaction() as sess:
+            token_hash = web_app.hash_token(sess['session_token'])
+        web_app.job_queue.enqueue(token_hash, 'k1', {'name': 'Demo User'})
+        job = jobs.start(token_hash, _blocking_job(threading.Event(), []), key='k1')
+        yield client, token_hash, job
+        jobs.cancel(token_hash)
+        job.thread.join(1)
+    
+    def test_pages_send_beacons(self, jobs):
+        html = web_app.app.test_client().get('/game/1').get_data(as_text=True)
+        assert "sendBeacon" in html
+        assert '/abandon?pagehide=1' in html
+        assert '/activity' in html
+        assert '/activity?hidden=1' in html
+    
+    def test_abandon_cancels_and_clears_session(self, jobs, player):
+        client, token_hash, job = player
+        response = client.post('/abandon', json={})
+        
+        assert response.status_code == 204
+        assert job.cancel_token.reason == 'abandoned'
+        assert jobs.get(token_hash) is None
+        assert web_app.job_queue.status(token_hash) is None
+        with client.session_transaction() as sess:
+            assert 'session_token' not in sess
+    
+    def test_abandon_form_post_redirects(self, jobs, player):
+        client, _, job = player
+        response = client.post('/abandon')
+        
+        assert response.status_code == 302
+        assert job.cancelled
+    
+    def test_pagehide_releases_after_grace(self, jobs, clock, player):
+        client, token_hash, job = player
+        assert client.post('/abandon?pagehide=1').status_code == 204
+        
+        assert not job.cancelled
+        with client.session_transaction() as sess:
+            assert web_app.hash_token(sess['session_token']) == token_hash
+        clock.now += 29
+        assert jobs.reap() == 0
+        clock.now += 1
+        assert jobs.reap() == 1
+        assert job.cancel_token.reason == 'idle'
+    
+    def test_next_page_activity_keeps_prediction(self, jobs, clock, player):
+        client, token_hash, job = player
+        client.post('/abandon?pagehide=1')
+        clock.now += 10
+        assert client.post('/activity').status_code == 204
+        
+        clock.now += 40
+        assert jobs.reap() == 0
+        assert not job.cancelled
+    
+    def test_heartbeats_hold_off_idle(self, jobs, clock, player):
+        client, _, job = player
+        for _ in range(6):
+            clock.now += 15
+            client.post('/activity')
+            assert jobs.reap() == 0
+        
+        clock.now += 45
+        assert jobs.reap() == 1
+        assert job.cancel_token.reason == 'idle'
+    
+    def test_hidden_tab_keeps_prediction(self, jobs, clock, player):
+        client, _, job = player
+        assert client.post('/activity?hidden=1').status_code == 204
+        
+        clock.now += 300
+        assert jobs.reap() == 0
+        # Back in view: heartbeats resume and the idle rule applies again
+        client.post('/activity')
+        clock.now += 45
+        assert jobs.reap() == 1
+        assert job.cancel_token.reason == 'idle'
@@ -0,0 +1,148 @@
+"""
+Tests for the compact prediction record.
+"""
+import os
+import pytest
+from unittest.mock import patch
+from src.prediction_record import PredictionRecord
+from src.config import config
+
+
+RESULT = {
+    'found': True,
+    'college': 'Rice University',
+    'degree': 'BS',
+    'field': 'Economics',
+    'career': 'Analyst',
+    'personality': 'curious',
+    'confidence': 62,
+    'source': 'https://example.com',
+    'reasoning': 'Found a matching alumni listing.',
+    'raw_response': 'x' * 5000
+}
+
+
+class TestPredictionRecord:
+    """Test conversion from searcher results"""
+    
+    def test_keeps_reveal_fields(self):
+        record = PredictionRecord.from_result(RESULT)
+        
+        assert record.college == 'Rice University'
+        assert record.found is True
+        assert record.confidence == 62
+        assert record.reasoning == 'Found a matching alumni listing.'
+        assert record.error is None
+    
+    def test_drops_raw_response(self):
+        record = PredictionRecord.from_result(RESULT, 'abc')
+        
+        assert record.raw_path is None
+        assert not hasattr(record, '__dict__')
+        assert 'raw_response' not in record.to_dict()
+    
+    def test_long_reasoning_truncated(self):
+        record = PredictionRecord.from_result(dict(RESULT, reasoning='y' * 2000))
+        assert len(record.reasoning) <= PredictionRecord.MAX_REASONING + 3
+    
+    def test_error_result(self):
+        record = PredictionRecord.from_result({'college': None, 'confidence': 0, 'error': 'Rate limit'})
+        
+        assert record.error == 'Rate limit'
+        assert record.found is False
+    
+    def test_debug_spills_raw_to_disk(self, tmp_path):
+        with patch.object(config, 'prediction_debug', True), \
+             patch('src.prediction_record.RAW_SPILL_DIR', str(tmp_path)):
+            record = PredictionRecord.from_result(RESULT, 'abc')
+        
+        assert record.raw_path == os.path.join(str(tmp_path), 'abc.txt')
+        with open(record.raw_path) as f:
+            assert f.read() == RESULT['raw_response']
+
+
+class TestProvisionalPrediction:
+    """Test the instant location-based answer stored at signup"""
+    
+    def test_known_city(self):
+        from src.ai_search import ClaudeSearcher
+        record = PredictionRecord.from_result(ClaudeSearcher.provisional_prediction('Jane Doe', 25, 'Austin, TX'))
+        
+        assert record.provisional is True
+        assert record.college == 'University of Texas at Austin'
+        assert record.confidence == 10
+    
+    def test_unknown_city(self):
+        from src.ai_search import ClaudeSearcher
+        result = ClaudeSearcher.provisional_prediction('Jane Doe', 25, 'Springfield')
+        
+        assert result['college'] == 'Local university near Springfield'
+        assert result['provisional'] is True
+
+
+class TestRevealStatusRoute:
+    """/reveal/status as polled by reveal.html while the provisional answer shows"""
+    
+    @pytest.fixture
+    def player(self, isolated_store):
+        """A client with a provisional answer and a queued model job; (client, token hash)"""
+        from src import web_app
+        from src.ai_search import ClaudeSearcher
+        client = web_app.app.test_client()
+        client.get('/game/1')
+        with client.session_transaction() as sess:
+            token_hash = web_app.hash_token(sess['session_token'])
+        web_app.store_prediction(token_hash, ClaudeSearcher.provisional_prediction('Jane Doe', 25, 'Austin, TX'))
+        web_app.job_queue.enqueue(token_hash, 'k1', {'name': 'Jane Doe'})
+        return client, token_hash
+    
+    def test_provisional_while_pending(self, player):
+        client, _ = player
+        status = client.get('/reveal/status').get_json()
+        
+        assert status == {'provisional': True, 'pending': True, 'html': None}
+    
+    def test_final_answer_swapped_in(self, player):
+        from src import web_app
+        client, token_hash = player
+        web_app.upgrade_prediction(token_hash, RESULT)
+        status = client.get('/reveal/status').get_json()
+        
+        assert status['provisional'] is False
+        assert 'Rice University' in status['html']
+    
+    def test_model_error_keeps_provisional_guess(self, player):
+        from src import web_app
+        client, token_hash = player
+        web_app.upgrade_prediction(token_hash, {'college': 'Error', 'confidence': 0, 'error': 'Rate limit'})
+        status = client.get('/reveal/status').get_json()
+        
+        assert status['provisional'] is False
+        assert 'University of Texas at Austin' in status['html']
+        assert 'Rate limit' not in status['html']
+    
+    def test_cancelled_job_settles_guess(self, player, monkeypatch):
+        from src import web_app
+        client, token_hash = player
+        job = web_app.prediction_jobs.start(token_hash, lambda cancel_token: cancel_token.wait(5))
+        assert client.get('/reveal/status').get_json()['pending'] is True
+        # Reaped while idle; the job drops its queue row as it stops
+        web_app.prediction_jobs.cancel(token_hash, 'idle')
+        job.thread.join(1)
+        web_app.job_queue.delete(token_hash)
+        status = client.get('/reveal/status').get_json()
+        
+        assert status['provisional'] is False and status['pending'] is False
+        assert 'University of Texas at Austin' in status['html']
+        assert 'Still searching' not in status['html']
+        # Settled in the cache, so later reads stay off the queue
+        monkeypatch.setattr(web_app.job_queue, '_safely', lambda *args, **kwargs: pytest.fail('queue read'))
+        assert client.get('/reveal/status').get_json()['provisional'] is False
+        assert 'Still searching' not in client.get('/reveal').get_data(as_text=True)
+    
+    def test_no_prediction(self, isolated_store):
+        from src import web_app
+        client = web_app.app.test_client()
+        client.get('/game/1')
+        
+        assert client.get('/reveal/status').get_json() == {'provisional': False, 'pending': False, 'html': None}
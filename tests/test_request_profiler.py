@@ -0,0 +1,96 @@
+"""
+Tests for the opt-in request profiler.
+"""
+import os
+import pstats
+import time
+import pytest
+from src.config import config
+from src.request_profiler import RequestProfiler
+
+TOKEN = 'secret-admin-token'
+
+
+def slow_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    deadline = time.perf_counter() + 0.03
+    while time.perf_counter() < deadline:
+        sum(range(100))
+    return [b'ok']
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'admin_token', TOKEN)
+    monkeypatch.setattr(config, 'profile_max_per_hour', 2)
+    monkeypatch.setattr(config, 'profile_max_files', 50)
+    monkeypatch.setattr(config, 'profile_sample_interval', 0.001)
+    return RequestProfiler(slow_app, directory=str(tmp_path))
+
+
+def call(app, **environ):
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured['headers'] = dict(headers)
+
+    environ.setdefault('REQUEST_METHOD', 'GET')
+    environ.setdefault('PATH_INFO', '/reveal')
+    body = b''.join(app(environ, start_response))
+    return body, captured['headers']
+
+
+class TestRequestProfiler:
+    """Test gating, caps and output files"""
+
+    def test_unflagged_requests_pass_through(self, profiler, tmp_path):
+        body, headers = call(profiler, HTTP_X_ADMIN_TOKEN=TOKEN)
+
+        assert body == b'ok'
+        assert 'X-Profile-File' not in headers
+        assert os.listdir(tmp_path) == []
+
+    def test_requires_admin_token(self, profiler, tmp_path):
+        _, headers = call(profiler, HTTP_X_PROFILE='1', HTTP_X_ADMIN_TOKEN='wrong')
+
+        assert 'X-Profile-File' not in headers
+        assert os.listdir(tmp_path) == []
+
+    def test_cprofile_output(self, profiler, tmp_path):
+        body, headers = call(profiler, HTTP_X_PROFILE='cprofile', HTTP_X_ADMIN_TOKEN=TOKEN)
+
+        assert body == b'ok'
+        name = headers['X-Profile-File']
+        assert name.endswith('-GET-reveal.prof')
+        stats = pstats.Stats(str(tmp_path / name))
+        assert any(func[2] == 'slow_app' for func in stats.stats)
+
+    def test_sampled_flamegraph_via_query_flag(self, profiler, tmp_path):
+        _, headers = call(profiler, QUERY_STRING='__profile=sample', HTTP_X_ADMIN_TOKEN=TOKEN)
+
+        name = headers['X-Profile-File']
+        assert name.endswith('.folded')
+        lines = (tmp_path / name).read_text().splitlines()
+        assert lines
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+        assert any('slow_app' in line for line in lines)
+
+    def test_hourly_cap(self, profiler, tmp_path):
+        for _ in range(3):
+            call(profiler, HTTP_X_PROFILE='1', HTTP_X_ADMIN_TOKEN=TOKEN)
+
+        assert len(os.listdir(tmp_path)) == 2
+
+    def test_old_files_pruned(self, profiler, tmp_path):
+        profiler.max_files = 1
+        profiler._limiter.limit = 10
+        for _ in range(3):
+            call(profiler, HTTP_X_PROFILE='1', HTTP_X_ADMIN_TOKEN=TOKEN)
+
+        assert len(os.listdir(tmp_path)) == 1
+
+    def test_disabled_without_admin_token(self, profiler, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, 'admin_token', None)
+        _, headers = call(profiler, HTTP_X_PROFILE='1', HTTP_X_ADMIN_TOKEN='')
+
+        assert 'X-Profile-File' not in headers
@@ -0,0 +1,78 @@
+"""
+Tests for funnel resource hints and cache headers.
+"""
+import pytest
+from src import resource_hints, web_app
+
+
+@pytest.fixture
+def client():
+    return web_app.app.test_client()
+
+
+def links(response):
+    return [part.strip() for part in response.headers.get('Link', '').split(',') if part.strip()]
+
+
+class TestLinkHeaders:
+    """Preload, prefetch and preconnect hints"""
+
+    @pytest.mark.parametrize('path,next_path', [('/signup', '/game/1'), ('/game/1', '/game/2'), ('/game/2', '/game/3')])
+    def test_funnel_prefetches_next_page(self, client, path, next_path):
+        client.get('/game/1')
+        response = client.get(path)
+        assert f"<{next_path}>; rel=prefetch; as=document" in links(response)
+        assert any('/static/css/style.css?v=' in link and 'rel=preload; as=style' in link for link in links(response))
+
+    def test_reveal_never_prefetched(self, client):
+        client.get('/game/1')
+        assert not any('rel=prefetch' in link for link in links(client.get('/game/3')))
+        with web_app.app.test_request_context():
+            assert not any('rel=prefetch' in link for link in resource_hints.page_hints('reveal'))
+
+    def test_circuit_pages_preconnect_to_font_cdn(self, client):
+        hints = links(client.get('/circuit'))
+        assert '<https://api.fontshare.com>; rel=preconnect' in hints
+        assert '<https://cdn.fontshare.com>; rel=preconnect; crossorigin' in hints
+        assert any('circuitweb/scripts/script.js?v=' in link and 'as=script' in link for link in hints)
+
+    def test_no_hints_on_json(self, client):
+        assert 'Link' not in client.get('/health').headers
+
+
+class TestCaching:
+    """Cache-Control for prefetched pages and static files"""
+
+    def test_game_pages_always_revalidate(self, client):
+        for path in ('/game/1', '/game/2', '/game/3'):
+            assert client.get(path).headers['Cache-Control'] == 'private, no-cache'
+        assert 'Cache-Control' not in client.get('/signup').headers
+
+    def test_prefetch_does_not_write_session(self, client):
+        response = client.get('/game/1', headers={'Sec-Purpose': 'prefetch'})
+        assert response.status_code == 200
+        assert 'Set-Cookie' not in response.headers
+        assert client.get_cookie('session') is None
+        # An ordinary navigation still creates the session
+        assert 'Set-Cookie' in client.get('/game/1').headers
+
+    def test_prefetch_that_skipped_session_change_not_reusable(self, client):
+        # With no session, GET /game/1 would create one; the prefetch must not stand in for it
+        assert client.get('/game/1', headers={'Sec-Purpose': 'prefetch'}).headers['Cache-Control'] == 'no-store'
+        client.get('/game/1')
+        response = client.get('/game/2', headers={'Sec-Purpose': 'prefetch'})
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    def test_versioned_static_is_immutable(self, client):
+        with web_app.app.test_request_context():
+            url = web_app.url_for('static', filename='css/style.css')
+        assert '?v=' in url
+        response = client.get(url)
+        assert response.status_code == 200
+        assert 'immutable' in response.headers['Cache-Control']
+        response.close()
+
+    def test_unversioned_static_revalidates(self, client):
+        response = client.get('/static/css/style.css')
+        assert 'immutable' not in response.headers.get('Cache-Control', '')
+        response.close()
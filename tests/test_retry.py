@@ -0,0 +1,116 @@
+"""
+Tests for the model API retry policy.
+"""
+import pytest
+from unittest.mock import Mock, patch
+import requests
+from src.retry import RetryPolicy, Deadline, parse_retry_after
+from src.ai_search import ClaudeSearcher
+from src.metrics import metrics
+from src.circuit_breaker import CircuitBreaker
+
+
+def _response(status_code, body=None, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.text = ''
+    response.json.return_value = body or {}
+    return response
+
+
+OK_BODY = {
+    'content': [{
+        'type': 'text',
+        'text': '{"college": "Rice University", "confidence": 60}'
+    }]
+}
+
+
+class TestParseRetryAfter:
+    """Test Retry-After header parsing"""
+    
+    def test_seconds(self):
+        assert parse_retry_after('3') == 3.0
+    
+    def test_missing(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('') is None
+    
+    def test_garbage(self):
+        assert parse_retry_after('soon') is None
+    
+    def test_http_date_in_past(self):
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+
+class TestRetryPolicy:
+    """Test backoff and give-up decisions"""
+    
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=5.0, deadline=100)
+        for attempt in range(1, 10):
+            delay = policy.backoff(attempt)
+            assert 0 <= delay <= min(5.0, 2 ** (attempt - 1))
+    
+    def test_retry_after_takes_precedence(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, deadline=100)
+        assert policy.backoff(1, retry_after=7.0) == 7.0
+    
+    def test_gives_up_after_max_attempts(self):
+        policy = RetryPolicy(max_attempts=2, base_delay=0, deadline=100)
+        assert policy.next_delay(1, policy.start()) is not None
+        assert policy.next_delay(2, policy.start()) is None
+    
+    def test_gives_up_when_deadline_too_close(self):
+        policy = RetryPolicy(max_attempts=5, base_delay=0, deadline=100)
+        assert policy.next_delay(1, Deadline(1.0)) is None
+        assert policy.next_delay(1, Deadline(100), retry_after=99.0) is None
+
+
+class TestSearchPersonRetry:
+    """Test that search_person retries transient failures"""
+    
+    def setup_method(self):
+        metrics.reset()
+    
+    @patch('src.ai_search.time.sleep')
+    @patch('src.ai_search.requests.post')
+    def test_retries_429_then_succeeds(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            _response(429, headers={'retry-after': '1'}),
+            _response(500),
+            _response(200, OK_BODY),
+        ]
+        searcher = ClaudeSearcher('key', RetryPolicy(max_attempts=4, base_delay=0.01, deadline=60), CircuitBreaker('test', failure_threshold=10))
+        
+        result = searcher.search_person('Jane Doe', 25, 'Houston')
+        
+        assert result['college'] == 'Rice University'
+        assert mock_post.call_count == 3
+        mock_sleep.assert_any_call(1.0)
+        assert metrics.count('model_api.attempt.http_429') == 1
+        assert metrics.count('model_api.attempt.http_500') == 1
+        assert metrics.count('model_api.attempt.ok') == 1
+    
+    @patch('src.ai_search.time.sleep')
+    @patch('src.ai_search.requests.post')
+    def test_gives_up_with_error_result(self, mock_post, mock_sleep):
+        mock_post.side_effect = requests.exceptions.ConnectionError()
+        searcher = ClaudeSearcher('key', RetryPolicy(max_attempts=3, base_delay=0.01, deadline=60), CircuitBreaker('test', failure_threshold=10))
+        
+        result = searcher.search_person('Jane Doe', 25, 'Houston')
+        
+        assert result['error'] == 'Could not connect to AI service'
+        assert mock_post.call_count == 3
+        assert metrics.count('model_api.gave_up') == 1
+    
+    @patch('src.ai_search.requests.post')
+    def test_auth_error_not_retried(self, mock_post):
+        mock_post.return_value = _response(401)
+        searcher = ClaudeSearcher('key', RetryPolicy(max_attempts=3, deadline=60), CircuitBreaker('test', failure_threshold=10))
+        
+        result = searcher.search_person('Jane Doe', 25, 'Houston')
+        
+        assert 'Invalid API key' in result['error']
+        assert mock_post.call_count == 1
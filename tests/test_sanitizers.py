@@ -0,0 +1,81 @@
+"""
+Tests for the shared sanitizers.
+SECURITY: These must drop exactly what the replace/generator versions did.
+"""
+import random
+import pytest
+from src import web_app
+from src.sanitizers import FORM_FIELD_MAX_LENGTH, NAME_PATTERN, sanitize_form_field, strip_control_chars
+from src.validators import InputValidator
+
+
+def reference_form_field(text):
+    """web_app.sanitize before the translate table"""
+    for char in ['<', '>', '"', "'", '&', '\\', '\x00']:
+        text = text.replace(char, '')
+    return text.strip()[:200]
+
+
+def reference_control_chars(text):
+    """InputValidator.sanitize_output before the translate table"""
+    return ''.join(char for char in text if ord(char) >= 32 or char == '\n').strip()
+
+
+def random_texts(count=500, seed=7):
+    rng = random.Random(seed)
+    alphabet = [chr(i) for i in range(0, 128)] + ['é', 'ß', '漢', ' ', ' ', '\U0001f600']
+    for _ in range(count):
+        yield ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 400)))
+
+
+class TestFormField:
+    """sanitize_form_field (web_app.sanitize)"""
+
+    def test_drops_markup_characters(self):
+        assert sanitize_form_field('<b>"Tom" & \'Jerry\'\\\x00</b>') == 'bTom  Jerry/b'
+
+    def test_strips_then_caps_length(self):
+        text = '  ' + 'a' * 300
+        assert sanitize_form_field(text) == 'a' * FORM_FIELD_MAX_LENGTH
+
+    def test_cap_counts_after_removal(self):
+        assert sanitize_form_field('<' * 500 + 'abc') == 'abc'
+
+    def test_web_app_uses_it(self):
+        assert web_app.sanitize is sanitize_form_field
+
+    @pytest.mark.security
+    def test_matches_reference(self):
+        for text in random_texts():
+            assert sanitize_form_field(text) == reference_form_field(text)
+
+
+class TestControlChars:
+    """strip_control_chars (InputValidator.sanitize_output)"""
+
+    def test_keeps_newlines(self):
+        assert strip_control_chars('a\x00b\tc\nd\x1f') == 'abc\nd'
+
+    def test_keeps_unicode(self):
+        assert strip_control_chars(' Zoë 漢字 ') == 'Zoë 漢字'
+        assert strip_control_chars('a\ud800\x01b') == 'a\ud800b'
+
+    def test_validator_uses_it(self):
+        text = 'Head\x07line\n'
+        assert InputValidator.sanitize_output(text) == strip_control_chars(text) == 'Headline'
+
+    @pytest.mark.security
+    def test_matches_reference(self):
+        for text in random_texts():
+            assert strip_control_chars(text) == reference_control_chars(text)
+
+
+class TestNamePattern:
+    """The compiled name pattern shared with InputValidator"""
+
+    def test_shared(self):
+        assert InputValidator.NAME_PATTERN is NAME_PATTERN
+
+    def test_accepts_and_rejects(self):
+        assert NAME_PATTERN.match("Mary-Jane O'Connor")
+        assert not NAME_PATTERN.match('Robert<script>')
@@ -0,0 +1,77 @@
+"""
+Tests for precomputed security headers.
+SECURITY: Every HTML response must carry the frame and content policies.
+"""
+import pytest
+from src import web_app
+from src.config import config
+from src.security_headers import HeaderSet, SecurityHeadersMiddleware, build_headers
+
+
+def wsgi_headers(middleware, path, route_headers):
+    captured = {}
+
+    def app(environ, start_response):
+        start_response('200 OK', list(route_headers))
+        return [b'']
+
+    def start_response(status, headers, exc_info=None):
+        captured['headers'] = headers
+
+    middleware.wsgi_app = app
+    middleware({'PATH_INFO': path}, start_response)
+    return captured['headers']
+
+
+class TestSecurityHeaders:
+    """Header sets and per-path overrides"""
+
+    @pytest.fixture
+    def middleware(self):
+        headers = build_headers("default-src 'self'")
+        return SecurityHeadersMiddleware(None, headers, {'/static/': headers[:1]})
+
+    def test_html_gets_full_set(self, middleware):
+        headers = dict(wsgi_headers(middleware, '/circuit', [('Content-Type', 'text/html')]))
+        assert headers['X-Content-Type-Options'] == 'nosniff'
+        assert headers['X-Frame-Options'] == 'DENY'
+        assert headers['Content-Security-Policy'] == "default-src 'self'"
+
+    def test_static_skips_html_only_headers(self, middleware):
+        headers = dict(wsgi_headers(middleware, '/static/css/style.css', [('Content-Type', 'text/css')]))
+        assert headers['X-Content-Type-Options'] == 'nosniff'
+        assert 'X-Frame-Options' not in headers
+        assert 'Content-Security-Policy' not in headers
+
+    def test_route_headers_win(self, middleware):
+        headers = wsgi_headers(middleware, '/circuit', [('content-security-policy', "default-src 'none'")])
+        policies = [value for name, value in headers if name.lower() == 'content-security-policy']
+        assert policies == ["default-src 'none'"]
+        assert ('X-Frame-Options', 'DENY') in headers
+
+    def test_rejects_header_injection(self):
+        with pytest.raises(ValueError):
+            HeaderSet([('Content-Security-Policy', "default-src 'self'\r\nSet-Cookie: x=1")])
+
+
+class TestAppHeaders:
+    """Headers on real responses"""
+
+    def test_page_headers(self):
+        response = web_app.app.test_client().get('/circuit')
+        assert response.headers['X-Frame-Options'] == 'DENY'
+        assert response.headers['X-XSS-Protection'] == '1; mode=block'
+        assert response.headers['Content-Security-Policy'] == config.content_security_policy
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+
+    def test_static_headers(self):
+        response = web_app.app.test_client().get('/static/css/style.css')
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+        assert 'Content-Security-Policy' not in response.headers
+        assert 'X-Frame-Options' not in response.headers
+        response.close()
+
+    def test_error_responses_covered(self):
+        response = web_app.app.test_client().get('/no-such-page')
+        assert response.status_code == 404
+        assert response.headers['X-Frame-Options'] == 'DENY'
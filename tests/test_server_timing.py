@@ -0,0 +1,70 @@
+"""
+Tests for Server-Timing headers.
+"""
+import re
+from flask import Flask, render_template_string, session
+from src import server_timing
+from src.server_timing import RequestTimer, ServerTimingMiddleware, add_span, span
+
+
+def parse(header):
+    return {name: float(dur) for name, dur in re.findall(r'([\w-]+);dur=([\d.]+)', header)}
+
+
+def make_app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    server_timing.init_app(app)
+
+    @app.route('/page')
+    def page():
+        session['seen'] = True
+        with span('work'):
+            add_span('store', 0.002)
+        return render_template_string('<p>{{ x }}</p>', x=1)
+
+    return app
+
+
+class TestServerTiming:
+    """Test the request timer and Flask integration"""
+
+    def test_timer_accumulates_spans(self):
+        timer = RequestTimer()
+        timer.add('db', 0.001)
+        timer.add('db', 0.002)
+        timer.start('render')
+        timer.stop('render')
+        timer.stop('never-started')
+
+        spans = parse(timer.header())
+        assert spans['db'] == 3.0
+        assert set(spans) == {'total', 'db', 'render'}
+
+    def test_spans_are_noops_outside_a_request(self):
+        with span('ignored'):
+            add_span('ignored', 1.0)
+
+        assert server_timing.current_timer() is None
+
+    def test_flask_response_header(self):
+        response = make_app().test_client().get('/page')
+
+        spans = parse(response.headers['Server-Timing'])
+        assert {'total', 'session-load', 'session-save', 'render', 'work', 'store'} <= set(spans)
+        assert spans['store'] == 2.0
+        assert spans['total'] >= spans['render']
+
+    def test_environ_spans_are_included(self):
+        def inner(environ, start_response):
+            start_response('200 OK', [])
+            return [b'']
+
+        headers = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            headers.update(response_headers)
+
+        ServerTimingMiddleware(inner)({server_timing.ENVIRON_SPANS: [('wait', 0.5)]}, start_response)
+
+        assert parse(headers['Server-Timing'])['wait'] == 500.0
@@ -0,0 +1,124 @@
+"""
+Tests for the encrypted OAuth token cache.
+SECURITY: Tokens on disk must be unreadable without the key.
+"""
+import os
+import stat
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from src.token_cache import TokenCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TokenCache(path=str(tmp_path / 'token.bin'), secret='test-secret')
+
+
+@pytest.fixture
+def auth_factory():
+    from src.config import config
+    with patch.object(config, 'client_id', 'test_id', create=True), \
+         patch.object(config, 'client_secret', 'test_secret', create=True), \
+         patch.object(config, 'redirect_uri', 'http://localhost:8000/callback', create=True), \
+         patch('src.auth.RateLimiter') as limiter:
+        limiter.return_value.acquire.return_value = True
+        from src.auth import LinkedInAuth
+        yield LinkedInAuth
+
+
+def _token_response(token, expires_in=3600, refresh_token=None):
+    response = Mock(status_code=200)
+    response.json.return_value = {'access_token': token, 'expires_in': expires_in, 'refresh_token': refresh_token}
+    return response
+
+
+class TestTokenCache:
+    """Test encrypted storage"""
+    
+    def test_round_trip(self, cache):
+        cache.save({'access_token': 'abc', 'expires_at': '2030-01-01T00:00:00'})
+        assert cache.load() == {'access_token': 'abc', 'expires_at': '2030-01-01T00:00:00'}
+    
+    def test_file_is_encrypted_and_private(self, cache):
+        cache.save({'access_token': 'super-secret-token'})
+        
+        with open(cache.path, 'rb') as f:
+            assert b'super-secret-token' not in f.read()
+        assert stat.S_IMODE(os.stat(cache.path).st_mode) == 0o600
+    
+    def test_wrong_key_ignored(self, cache):
+        cache.save({'access_token': 'abc'})
+        other = TokenCache(path=cache.path, secret='other-secret')
+        assert other.load() is None
+    
+    def test_missing_file(self, cache):
+        assert cache.load() is None
+    
+    def test_clear(self, cache):
+        cache.save({'access_token': 'abc'})
+        cache.clear()
+        assert cache.load() is None
+
+
+    def test_no_key_configured(self, tmp_path):
+        from src.config import config
+        from src.exceptions import AuthenticationError
+        with patch.object(config, 'token_cache_key', None):
+            with pytest.raises(AuthenticationError, match='TOKEN_CACHE_KEY'):
+                TokenCache(path=str(tmp_path / 'token.bin'))
+    
+    def test_key_from_client_secret(self, tmp_path):
+        from src.config import config
+        with patch.object(config, 'token_cache_key', None), \
+             patch.object(config, 'client_secret', 'test_secret', create=True):
+            TokenCache(path=str(tmp_path / 'token.bin')).save({'access_token': 'abc'})
+        
+        secret_cache = TokenCache(path=str(tmp_path / 'token.bin'), secret='test_secret')
+        assert secret_cache.load() == {'access_token': 'abc'}
+
+
+class TestAuthWithTokenCache:
+    """Test that later processes reuse the cached token"""
+    
+    @patch('src.auth.requests.post')
+    def test_exchange_saves_and_new_instance_loads(self, mock_post, cache, auth_factory):
+        mock_post.return_value = _token_response('token-1')
+        auth_factory(token_cache=cache).exchange_code_for_token('code')
+        
+        second = auth_factory(token_cache=cache)
+        assert second.get_access_token() == 'token-1'
+        assert mock_post.call_count == 1
+    
+    @patch('src.auth.requests.post')
+    def test_proactive_refresh_near_expiry(self, mock_post, cache, auth_factory):
+        cache.save({
+            'access_token': 'old',
+            'expires_at': (datetime.now() + timedelta(minutes=10)).isoformat(),
+            'refresh_token': 'refresh-1'
+        })
+        mock_post.return_value = _token_response('new', refresh_token='refresh-2')
+        
+        auth = auth_factory(token_cache=cache)
+        assert auth.get_access_token() == 'new'
+        assert mock_post.call_args.kwargs['data']['grant_type'] == 'refresh_token'
+        assert cache.load()['refresh_token'] == 'refresh-2'
+    
+    @patch('src.auth.requests.post')
+    def test_failed_refresh_keeps_valid_token(self, mock_post, cache, auth_factory):
+        cache.save({
+            'access_token': 'old',
+            'expires_at': (datetime.now() + timedelta(minutes=10)).isoformat(),
+            'refresh_token': 'refresh-1'
+        })
+        mock_post.return_value = Mock(status_code=400, text='invalid_grant')
+        
+        assert auth_factory(token_cache=cache).get_access_token() == 'old'
+    
+    def test_revoke_clears_cache(self, cache, auth_factory):
+        cache.save({'access_token': 'abc', 'expires_at': '2030-01-01T00:00:00'})
+        auth = auth_factory(token_cache=cache)
+        auth.load_cached_token()
+        auth.revoke_token()
+        
+        assert cache.load() is None